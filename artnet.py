@@ -1,4 +1,5 @@
-"""ArtDMX packet format — the ONE place the wire bytes are defined.
+"""Art-Net packet formats (ArtDMX, ArtSync, ArtPoll/ArtPollReply) — the ONE
+place the wire bytes are defined.
 
 Used by artnet_output_manager.py (production unicast to the room nodes),
 sim/virtual_dmx.py (the BlenderDMX mirror) and tools/artnet_check.py (the
@@ -7,8 +8,13 @@ node-side parser (sim/esphome/components/artnet_dmx) mirrors this layout.
 """
 
 ARTNET_PORT = 6454
+MAX_CHANNELS = 512
 _HEADER = b'Art-Net\x00'
 _OP_DMX = b'\x00\x50'      # OpDmx, little-endian
+_OP_SYNC = b'\x00\x52'     # OpSync
+_OP_POLL = b'\x00\x20'     # OpPoll
+_OP_POLL_REPLY = b'\x00\x21'  # OpPollReply
+POLL_REPLY_LEN = 239       # Art-Net 4 ArtPollReply size
 _PROTOCOL = b'\x00\x0e'    # protocol version 14
 
 
@@ -35,3 +41,92 @@ def parse_artdmx(packet):
         return None
     length = int.from_bytes(packet[16:18], 'big')
     return packet[12], int.from_bytes(packet[14:16], 'little'), packet[18:18 + length]
+
+
+class ArtDmxBuffer:
+    """A preallocated ArtDMX packet of fixed length, patched in place per send
+    (sequence byte + channel data) instead of rebuilt by build_artdmx.
+
+    ``length`` is rounded up to the even 2..512 the spec requires. A short
+    packet carries channels 1..length only — receivers keep the rest of their
+    universe as-is, so a node that only drives ch 1-16 needs 16 bytes, not 512.
+    """
+
+    def __init__(self, universe, length=MAX_CHANNELS):
+        self.length = min(MAX_CHANNELS, max(2, length + (length & 1)))
+        self.packet = bytearray(build_artdmx(0, universe, b'', pad_to=self.length))
+        self._data = memoryview(self.packet)[18:]
+
+    def fill(self, sequence, frame):
+        """Copy the leading channels of ``frame`` in; returns the packet."""
+        n = min(self.length, len(frame))
+        self.packet[12] = sequence & 0xFF
+        self._data[:n] = memoryview(frame)[:n]
+        return self.packet
+
+
+def build_artsync():
+    """ArtSync: nodes holding for sync present their buffered ArtDMX now.
+    Aux1/Aux2 are transmitted as zero."""
+    return _HEADER + _OP_SYNC + _PROTOCOL + bytes([0x00, 0x00])
+
+
+def is_artsync(packet):
+    return len(packet) >= 14 and packet[:8] == _HEADER and packet[8:10] == _OP_SYNC
+
+
+def build_artpoll():
+    """ArtPoll: "every node, tell me who you are". Flags 0 = reply once per
+    poll (no unsolicited replies), diagnostics off."""
+    return _HEADER + _OP_POLL + _PROTOCOL + bytes([0x00, 0x00])
+
+
+def is_artpoll(packet):
+    return len(packet) >= 12 and packet[:8] == _HEADER and packet[8:10] == _OP_POLL
+
+
+def build_artpollreply(ip, short_name, long_name='', firmware=0, universe=0,
+                       good_output=0x80, node_report=''):
+    """ArtPollReply for a one-port output node (the room nodes, and the fake
+    node in tools/artnet_check.py). ``universe`` is the 15-bit port-address the
+    port outputs; good_output bit 7 = "DMX data being output"."""
+    reply = bytearray(POLL_REPLY_LEN)
+    reply[0:10] = _HEADER + _OP_POLL_REPLY
+    reply[10:14] = bytes(int(octet) for octet in ip.split('.'))
+    reply[14:16] = ARTNET_PORT.to_bytes(2, 'little')
+    reply[16:18] = int(firmware).to_bytes(2, 'big')              # VersInfo
+    reply[18] = (universe >> 8) & 0x7F                           # NetSwitch
+    reply[19] = (universe >> 4) & 0x0F                           # SubSwitch
+    reply[26:44] = short_name.encode()[:17].ljust(18, b'\x00')
+    reply[44:108] = (long_name or short_name).encode()[:63].ljust(64, b'\x00')
+    reply[108:172] = node_report.encode()[:63].ljust(64, b'\x00')
+    reply[172:174] = (1).to_bytes(2, 'big')                      # NumPorts
+    reply[174] = 0x80                                            # port 0: DMX512 output
+    reply[182] = good_output & 0xFF                              # GoodOutput[0]
+    reply[190] = universe & 0x0F                                 # SwOut[0]
+    reply[200] = 0x00                                            # Style: StNode
+    return bytes(reply)
+
+
+def parse_artpollreply(packet):
+    """Return a dict describing the replying node, or None if not an
+    ArtPollReply. ``universes`` lists the port-address of each output port."""
+    if len(packet) < 207 or packet[:8] != _HEADER or packet[8:10] != _OP_POLL_REPLY:
+        return None
+
+    def text(raw):
+        return raw.split(b'\x00', 1)[0].decode(errors='replace')
+
+    num_ports = min(4, int.from_bytes(packet[172:174], 'big'))
+    net, sub = packet[18] & 0x7F, packet[19] & 0x0F
+    return {
+        'ip': '.'.join(str(b) for b in packet[10:14]),
+        'firmware': int.from_bytes(packet[16:18], 'big'),
+        'short_name': text(packet[26:44]),
+        'long_name': text(packet[44:108]),
+        'node_report': text(packet[108:172]),
+        'num_ports': num_ports,
+        'good_output': list(packet[182:182 + num_ports]),
+        'universes': [(net << 8) | (sub << 4) | (packet[190 + i] & 0x0F)
+                      for i in range(num_ports)],
+    }
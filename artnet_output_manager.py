@@ -1,129 +1,599 @@
 """Art-Net unicast to the per-room ESP32 DMX nodes (wiring-guides/dmx-over-wifi.md).
 
 Sibling of dmx_interface.DMXOutputManager: same 44Hz deadline-paced loop over
-the same dmx_state_manager, but the sink is UDP — one shared universe unicast
-to every enabled node in dmx_nodes.json. The nodes re-clock the wire locally
-and hold the last frame through WiFi blips, so this sends on CHANGE plus a 1s
-per-node heartbeat (late joiners / a dropped final packet converge within 1s)
-instead of streaming 44Hz all the time — keeps the AP clear for room audio.
-
-Hostname resolution is lazy and cached: a node that is down or unresolvable
-never blocks the frame loop for the others, and a failed target re-resolves
-with backoff so a DHCP re-lease heals on its own.
+the same dmx_state_manager, but the sink is UDP — the state's universes
+unicast to every enabled node in dmx_nodes.json, on change plus a 1s per-node
+heartbeat. Windowed sends, ArtSync, ArtPoll discovery and the off-loop
+resolver are configured there; the wiring guide covers each.
 """
+import ctypes
+import ctypes.util
+import errno
 import json
 import logging
 import os
 import socket
+import sys
 import threading
 import time
 
-from artnet import ARTNET_PORT, build_artdmx
+from artnet import (ARTNET_PORT, MAX_CHANNELS, ArtDmxBuffer, build_artpoll,
+                    build_artsync, parse_artpollreply)
+from frame_stats import FrameStats
+from light_config_manager import ShowModel
 
 logger = logging.getLogger(__name__)
 
 CONFIG_FILE = 'dmx_nodes.json'
-RERESOLVE_OK = 300      # re-resolve a working target every 5 min
-RERESOLVE_FAIL = 10     # a failing one every 10s
+LIGHT_CONFIG_FILE = 'light_config.json'
+RERESOLVE_OK = 300      # re-resolve a working target every 5 min (cache TTL)
+RERESOLVE_FAIL = 10     # a failing one after 10s, doubling...
+RERESOLVE_MAX = 60      # ...up to once a minute
+POLL_INTERVAL = 3.0     # ArtPoll broadcast period
+NODE_TIMEOUT = 10.0     # a node silent this long (after replying once) is skipped
+NODE_PREFIX = 'lohp-node-'
+
+
+def node_names(room, host):
+    """The names a node running sim/esphome's artnet_dmx may answer ArtPoll
+    with for this room: its ESPHome name (long) and that name minus the fleet
+    prefix cut to Art-Net's 17 characters (short). Taken from the host label
+    when it is a name, and from the room ("Sparkle Pony Room" ->
+    lohp-node-sparkle-pony) so nodes configured by IP still map."""
+    labels = set()
+    try:
+        socket.inet_aton(host)
+    except OSError:
+        labels.add(host.split('.')[0])
+    slug = room.casefold().replace(' ', '-')
+    labels.add(NODE_PREFIX + (slug[:-len('-room')] if slug.endswith('-room') else slug))
+    names = set()
+    for label in labels:
+        names.add(label.casefold())
+        names.add((label[len(NODE_PREFIX):] if label.startswith(NODE_PREFIX) else label)[:17].casefold())
+    return names
+
+
+class _Stream:
+    """One universe a node subscribes to: the fixtures it drives there, the
+    channels it needs, and its own packet and heartbeat clock."""
+
+    def __init__(self, universe, fixtures=None, length=MAX_CHANNELS):
+        self.universe = universe    # state universe (wire port-address = base + this)
+        self.fixtures = fixtures    # frozenset of fixture ids it drives; None = all
+        self.length = length        # channels 1..length on the wire
+        self.packet = None          # ArtDmxBuffer, assigned by the manager
+        self.last_sent = 0.0
 
 
 class _Target:
-    def __init__(self, room, host, port):
+    def __init__(self, room, host, port, fixtures=None, length=MAX_CHANNELS, short_name=None,
+                 universes=None):
+        """``universes`` maps state universe -> (fixtures, length) for a node
+        subscribed to several; without it the node gets universe 0 with
+        ``fixtures`` / ``length``."""
         self.room = room
         self.host = host
         self.port = port
-        self.addr = None            # resolved (ip, port)
+        self.streams = [_Stream(universe, *window)
+                        for universe, window in sorted((universes or {0: (fixtures, length)}).items())]
+        self.addr = None            # resolved (ip, port) — written by the resolver only
         self.next_resolve = 0.0
-        self.last_sent = 0.0
+        self.failures = 0
+        self.last_sent = 0.0        # its last send on any stream (node_table)
         self.warned = False
+        self.names = node_names(room, host)     # ArtPollReply names that map here
+        if short_name:
+            self.names.add(short_name[:17].casefold())
+        self.last_reply = None      # monotonic time of its last ArtPollReply
+        self.node = None            # that reply, parsed (firmware, ports, report)
+        try:
+            socket.inet_aton(host)  # literal IP: usable before the resolver runs
+            self.addr = (host, port)
+            self.next_resolve = time.monotonic() + RERESOLVE_OK
+        except OSError:
+            pass
 
-    def resolve(self, now):
-        if now < self.next_resolve:
-            return
+    def rejoined(self):
+        """Due on every stream at once (a node that just (re)appeared)."""
+        for s in self.streams:
+            s.last_sent = 0.0
+
+
+class _Resolver(threading.Thread):
+    """Resolves target hostnames off the frame loop so getaddrinfo (and its
+    multi-second timeout on a dead mDNS name) never runs at 44Hz. Each due
+    lookup gets its own short-lived daemon thread, so one dead name doesn't
+    queue the others behind it (and can't hold up process exit either). A
+    working name is cached for RERESOLVE_OK and keeps its last address if a
+    refresh fails; a failing one backs off RERESOLVE_FAIL -> RERESOLVE_MAX."""
+
+    def __init__(self, targets):
+        super().__init__(daemon=True)
+        self.targets = targets
+        self.running = True
+        self._wake = threading.Event()
+        self._pending = set()   # targets with a lookup in flight
+
+    def invalidate(self, target):
+        """The frame loop saw a send error: drop the address and re-resolve
+        after RERESOLVE_FAIL (not at once — a node that is simply gone would
+        otherwise cost a warning and a lookup every tick)."""
+        target.addr = None
+        target.next_resolve = time.monotonic() + RERESOLVE_FAIL
+        self._wake.set()
+
+    def run(self):
+        while self.running:
+            self._wake.clear()
+            now = time.monotonic()
+            for t in self.targets:
+                if now >= t.next_resolve and t not in self._pending:
+                    self._pending.add(t)
+                    threading.Thread(target=self._resolve, args=(t,), daemon=True,
+                                     name=f'artnet-resolve-{t.room}').start()
+            idle = [t.next_resolve for t in self.targets if t not in self._pending]
+            self._wake.wait(max(0.05, min(idle, default=now + RERESOLVE_OK) - now))
+
+    def _resolve(self, t):
+        try:
+            self._lookup(t)
+        finally:
+            self._pending.discard(t)
+            self._wake.set()
+
+    def _lookup(self, t):
         try:
-            self.addr = (socket.getaddrinfo(self.host, self.port, socket.AF_INET,
-                                            socket.SOCK_DGRAM)[0][4])
-            self.next_resolve = now + RERESOLVE_OK
-            if self.warned:
-                logger.info(f"Art-Net node {self.room} ({self.host}) resolved: {self.addr[0]}")
-                self.warned = False
+            t.addr = (socket.getaddrinfo(t.host, t.port, socket.AF_INET,
+                                         socket.SOCK_DGRAM)[0][4])
+            t.failures = 0
+            t.next_resolve = time.monotonic() + RERESOLVE_OK
+            if t.warned:
+                logger.info(f"Art-Net node {t.room} ({t.host}) resolved: {t.addr[0]}")
+                t.warned = False
         except OSError as e:
-            self.addr = None
-            self.next_resolve = now + RERESOLVE_FAIL
-            if not self.warned:
-                logger.warning(f"Art-Net node {self.room} ({self.host}) unresolvable: {e} "
-                               f"(retrying every {RERESOLVE_FAIL}s — container mDNS? use an IP)")
-                self.warned = True
+            # A refresh failure keeps a working target's cached address; only
+            # a send error (invalidate) or never having resolved leaves None.
+            t.failures += 1
+            t.next_resolve = time.monotonic() + min(RERESOLVE_MAX,
+                                                    RERESOLVE_FAIL * 2 ** (t.failures - 1))
+            if not t.warned and t.addr is None:
+                logger.warning(f"Art-Net node {t.room} ({t.host}) unresolvable: {e} "
+                               f"(retrying {RERESOLVE_FAIL}-{RERESOLVE_MAX}s — container mDNS? use an IP)")
+                t.warned = True
+
+    def stop(self):
+        self.running = False
+        self._wake.set()
+
+
+class _Discovery(threading.Thread):
+    """ArtPoll broadcaster + ArtPollReply listener. Binds the Art-Net port so
+    nodes can answer the poll's source; if something else already holds it
+    discovery just stays off (unicast output doesn't need it)."""
+
+    def __init__(self, targets, poll_addr, port=ARTNET_PORT, bind=('', ARTNET_PORT)):
+        super().__init__(daemon=True, name='artnet-discovery')
+        self.targets = targets
+        self.poll_addr = (poll_addr, port)
+        self.running = True
+        self.unmatched = {}     # ip -> (monotonic last seen, parsed reply) of unknown nodes
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+        self.sock.settimeout(0.5)
+        self.sock.bind(bind)
+        self._by_name = {}
+        for t in targets:
+            for name in t.names:
+                self._by_name.setdefault(name, t)
+
+    def run(self):
+        poll = build_artpoll()
+        next_poll = 0.0
+        while self.running:
+            now = time.monotonic()
+            if now >= next_poll:
+                try:
+                    self.sock.sendto(poll, self.poll_addr)
+                except OSError as e:
+                    logger.debug(f"ArtPoll to {self.poll_addr[0]} failed: {e}")
+                next_poll = now + POLL_INTERVAL
+            try:
+                packet, addr = self.sock.recvfrom(1024)
+            except socket.timeout:
+                continue
+            except OSError:
+                break               # socket closed by stop()
+            reply = parse_artpollreply(packet)
+            if reply:
+                self.handle_reply(reply, addr[0])
+        self.sock.close()
+
+    def handle_reply(self, reply, source_ip):
+        """Match a reply to its target and refresh its address/liveness. The
+        UDP source wins over the IP field in the body (a node behind NAT, or
+        one that hasn't noticed its new lease yet)."""
+        now = time.monotonic()
+        t = (self._by_name.get(reply['long_name'].casefold())
+             or self._by_name.get(reply['short_name'].casefold()))
+        if t is None:
+            if source_ip not in self.unmatched:
+                logger.info(f"Art-Net node '{reply['long_name']}' at {source_ip} "
+                            f"matches no room in dmx_nodes.json")
+            self.unmatched[source_ip] = (now, reply)
+            return
+        if t.last_reply is None or now - t.last_reply > NODE_TIMEOUT:
+            logger.info(f"Art-Net node {t.room} found at {source_ip} "
+                        f"(fw {reply['firmware']}, '{reply['node_report']}')")
+            t.rejoined()            # give it a frame this tick
+        if t.addr is None or t.addr[0] != source_ip:
+            t.addr = (source_ip, t.port)
+        t.failures = 0
+        t.warned = False
+        t.next_resolve = now + RERESOLVE_OK     # a live reply beats DNS
+        t.node = reply
+        t.last_reply = now
+
+    def stop(self):
+        self.running = False
+        self.sock.close()
+
+
+class _iovec(ctypes.Structure):
+    _fields_ = [('iov_base', ctypes.c_void_p), ('iov_len', ctypes.c_size_t)]
+
+
+class _msghdr(ctypes.Structure):
+    _fields_ = [('msg_name', ctypes.c_void_p), ('msg_namelen', ctypes.c_uint32),
+                ('msg_iov', ctypes.POINTER(_iovec)), ('msg_iovlen', ctypes.c_size_t),
+                ('msg_control', ctypes.c_void_p), ('msg_controllen', ctypes.c_size_t),
+                ('msg_flags', ctypes.c_int)]
+
+
+class _mmsghdr(ctypes.Structure):
+    _fields_ = [('msg_hdr', _msghdr), ('msg_len', ctypes.c_uint)]
+
+
+class _sockaddr_in(ctypes.Structure):
+    _fields_ = [('sin_family', ctypes.c_ushort), ('sin_port', ctypes.c_uint16),
+                ('sin_addr', ctypes.c_ubyte * 4), ('sin_zero', ctypes.c_ubyte * 8)]
+
+
+def _libc_sendmmsg():
+    """libc's sendmmsg, or None off Linux / where libc doesn't have it
+    (Python's socket module doesn't wrap it)."""
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        fn = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True).sendmmsg
+    except (OSError, AttributeError):
+        return None
+    fn.argtypes = [ctypes.c_int, ctypes.POINTER(_mmsghdr), ctypes.c_uint, ctypes.c_int]
+    fn.restype = ctypes.c_int
+    return fn
+
+
+class _BatchSender:
+    """Sends a tick's (packet, (ip, port)) list in one sendmmsg call where
+    available, else one non-blocking sendto each. send() returns
+    [(index, OSError)] for the messages that failed; the others went out.
+    Packets must be long-lived buffers (the manager's preallocated
+    ArtDmxBuffers, the ArtSync bytes): their ctypes views are cached."""
+
+    def __init__(self, sock, use_sendmmsg=True):
+        self.sock = sock
+        sock.setblocking(False)
+        self._sendmmsg = _libc_sendmmsg() if use_sendmmsg else None
+        self._bufs = {}         # id(packet) -> (packet, ctypes view) — keeps both alive
+        self._addrs = {}        # (ip, port) -> _sockaddr_in
+        self._msgs = None       # _mmsghdr array, grown to the largest batch
+        self._iovs = None
+        self._filled = None     # the batch layout _msgs currently holds
+
+    @property
+    def batched(self):
+        return self._sendmmsg is not None
+
+    def send(self, batch):
+        if not batch:
+            return []
+        if self._sendmmsg is None:
+            return self._send_each(batch)
+        try:
+            self._fill(batch)
+        except OSError:             # a name, not an IP: can't build a sockaddr
+            return self._send_each(batch)
+        failed = []
+        fd = self.sock.fileno()
+        i = 0
+        while i < len(batch):
+            sent = self._sendmmsg(fd, ctypes.byref(self._msgs[i]), len(batch) - i, 0)
+            if sent > 0:
+                i += sent
+                continue
+            # -1 = the first unsent message failed: report it, carry on after it
+            err = ctypes.get_errno()
+            failed.append((i, BlockingIOError(err, os.strerror(err))
+                           if err in (errno.EAGAIN, errno.EWOULDBLOCK) else OSError(err, os.strerror(err))))
+            i += 1
+        return failed
+
+    def _send_each(self, batch):
+        failed = []
+        for i, (packet, addr) in enumerate(batch):
+            try:
+                self.sock.sendto(packet, addr)
+            except OSError as e:
+                failed.append((i, e))
+        return failed
+
+    def _fill(self, batch):
+        # Ticks mostly repeat the same (packet, node) list — the buffers are
+        # patched in place — so an unchanged layout needs no refill at all.
+        layout = [(id(packet), addr) for packet, addr in batch]
+        if layout == self._filled:
+            return
+        self._filled = None
+        n = len(batch)
+        if self._msgs is None or len(self._msgs) < n:
+            self._msgs = (_mmsghdr * n)()
+            self._iovs = (_iovec * n)()
+            for msg, iov in zip(self._msgs, self._iovs):
+                msg.msg_hdr.msg_iov = ctypes.pointer(iov)
+                msg.msg_hdr.msg_iovlen = 1
+        for i, (packet, addr) in enumerate(batch):
+            view = self._view(packet)
+            sa = self._addrs.get(addr)
+            if sa is None:
+                sa = _sockaddr_in(socket.AF_INET, socket.htons(addr[1]),
+                                  (ctypes.c_ubyte * 4)(*socket.inet_aton(addr[0])))
+                self._addrs[addr] = sa
+            self._iovs[i].iov_base = ctypes.addressof(view)
+            self._iovs[i].iov_len = len(packet)
+            hdr = self._msgs[i].msg_hdr
+            hdr.msg_name = ctypes.addressof(sa)
+            hdr.msg_namelen = ctypes.sizeof(sa)
+        self._filled = layout
+
+    def _view(self, packet):
+        cached = self._bufs.get(id(packet))
+        if cached is None or cached[0] is not packet:
+            if isinstance(packet, bytearray):
+                view = (ctypes.c_char * len(packet)).from_buffer(packet)
+            else:                   # immutable bytes: a copy is as good
+                view = (ctypes.c_char * len(packet)).from_buffer_copy(packet)
+            cached = self._bufs[id(packet)] = (packet, view)
+        return cached[1]
+
+
+def room_windows(light_config_path, channels_per_fixture):
+    """room -> {universe: (frozenset of fixture ids, last channel it uses
+    there)}, from the light_config.json show model (ShowModel.windows). A
+    fixture's footprint is its model's highest channel offset + 1 (the 6ch
+    U'King stops at 6, not the 8 slot)."""
+    try:
+        show = ShowModel.load(light_config_path, channels_per_fixture)
+    except (OSError, ValueError) as e:
+        logger.error(f"Art-Net windowed mode: can't read {light_config_path} ({e}) — full universe")
+        return {}
+    return show.windows
 
 
 class ArtNetOutputManager(threading.Thread):
     FREQUENCY = 44          # pacing of the change-detect loop (matches the FTDI thread)
     HEARTBEAT = 1.0         # per-node resend interval while the frame is static
 
-    def __init__(self, dmx_state_manager, targets, universe=0):
+    def __init__(self, dmx_state_manager, targets, universe=0, discovery=None, sync_addr=None):
         super().__init__(daemon=True)
         self.dmx_state_manager = dmx_state_manager
-        self.universe = universe
+        self.universe = universe    # Art-Net port-address of state universe 0
         self.targets = targets
         self.running = True
-        self.sequence = 0
         self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        self._last_frame = None
-        logger.info(f"Art-Net output initialized: universe {universe} -> "
-                    f"{[t.room for t in targets]}")
+        self.sender = _BatchSender(self.sock)
+        self.resolver = _Resolver(targets)
+        self.discovery = discovery  # _Discovery, or None without "artpoll"
+        self.sync_addr = sync_addr  # (broadcast ip, port) for ArtSync, or None
+        self._sync = build_artsync()
+        if sync_addr:
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+        self.stalls = 0             # ticks whose send_frame overran the period
+        self.stall_seconds = 0.0    # total time by which they overran it
+        self.flushes = 0            # out-of-band sends (flush_now)
+        self.stats = FrameStats('artnet', self.FREQUENCY)
+        self.tracer = None          # latency_trace.LatencyTracer, set by main.py
+        self._flush = threading.Event()
+        dmx_state_manager.add_flush_listener(self.flush_now)
+        for t in targets:
+            kept = [s for s in t.streams if s.universe < dmx_state_manager.universes]
+            if len(kept) < len(t.streams):
+                logger.warning(f"Art-Net node {t.room}: universes "
+                               f"{[s.universe for s in t.streams if s not in kept]} are beyond the "
+                               f"{dmx_state_manager.universes} the patch uses — not sent")
+            t.streams = kept
+        # Per universe: its own sequence counter and generation last sent.
+        self.universes = sorted({s.universe for t in targets for s in t.streams})
+        self.sequences = dict.fromkeys(self.universes, 0)
+        self._generations = dict.fromkeys(self.universes, -1)
+        # Packets are preallocated once; full-universe streams share one per universe.
+        full = {u: ArtDmxBuffer(universe + u) for u in self.universes}
+        for t in targets:
+            for s in t.streams:
+                s.packet = full[s.universe] if s.fixtures is None else ArtDmxBuffer(universe + s.universe, s.length)
+        logger.info(f"Art-Net output initialized: universe {universe} + {self.universes} -> "
+                    f"{[(t.room, {universe + s.universe: s.packet.length for s in t.streams}) for t in targets]} "
+                    f"(room, {{universe: channels}}), "
+                    f"{'sendmmsg' if self.sender.batched else 'sendto'} fanout")
 
     @classmethod
-    def from_config(cls, dmx_state_manager, path=CONFIG_FILE):
+    def from_config(cls, dmx_state_manager, path=CONFIG_FILE, light_config_path=LIGHT_CONFIG_FILE):
         """Build from dmx_nodes.json, or None if it's absent / has no enabled
-        nodes (FTDI-only operation — the pre-cutover default)."""
+        nodes (FTDI-only operation — the pre-cutover default). A node's
+        optional "universes" lists the state universes it drives; by default
+        that is its room's universes when windowed, else every universe."""
         if not os.path.exists(path):
             return None
         with open(path) as f:
             cfg = json.load(f)
         port = cfg.get('port', ARTNET_PORT)
-        targets = [_Target(room, node['host'], node.get('port', port))
-                   for room, node in cfg.get('nodes', {}).items()
-                   if node.get('enabled')]
+        windows = {}
+        if cfg.get('windowed'):
+            windows = room_windows(light_config_path, dmx_state_manager.channels_per_fixture)
+        targets = []
+        everything = range(dmx_state_manager.universes)
+        for room, node in cfg.get('nodes', {}).items():
+            if not node.get('enabled'):
+                continue
+            window = windows.get(room, {})
+            if cfg.get('windowed') and not window:
+                logger.warning(f"Art-Net node {room}: no fixtures in {light_config_path} — "
+                               f"sending it the full universe")
+            universes = node.get('universes', list(window) or everything)
+            targets.append(_Target(room, node['host'], node.get('port', port),
+                                   short_name=node.get('short_name'),
+                                   universes={u: window.get(u, (None, MAX_CHANNELS)) for u in universes}))
         if not targets:
             logger.info("dmx_nodes.json present but no nodes enabled — Art-Net output idle")
             return None
-        return cls(dmx_state_manager, targets, universe=cfg.get('universe', 0))
+        discovery = None
+        if cfg.get('artpoll'):
+            try:
+                discovery = _Discovery(targets, cfg['artpoll'], port)
+            except OSError as e:
+                logger.warning(f"Art-Net discovery off: can't bind :{port} ({e})")
+        sync_addr = (cfg['artsync'], port) if cfg.get('artsync') else None
+        return cls(dmx_state_manager, targets, universe=cfg.get('universe', 0),
+                   discovery=discovery, sync_addr=sync_addr)
 
     def run(self):
+        self.resolver.start()
+        if self.discovery:
+            self.discovery.start()
+        period = 1 / self.FREQUENCY
         next_frame = time.monotonic()
         while self.running:
+            started = time.monotonic()
             self.send_frame()
-            next_frame += 1 / self.FREQUENCY
-            delay = next_frame - time.monotonic()
-            if delay > 0:
-                time.sleep(delay)
-            else:
+            finished = time.monotonic()
+            self.stats.tick(next_frame, started, finished)
+            took = finished - started
+            if took > period:
+                self.stalls += 1
+                self.stall_seconds += took - period
+            next_frame += period
+            if next_frame <= time.monotonic():
                 next_frame = time.monotonic()  # fell behind; don't burst to catch up
+                continue
+            self._wait(next_frame)
+        self.resolver.stop()
+        if self.discovery:
+            self.discovery.stop()
         self.sock.close()
 
+    def _wait(self, deadline):
+        """Wait for the next tick; a flush_now() sends in between without
+        moving it."""
+        while self.running:
+            delay = deadline - time.monotonic()
+            if delay <= 0 or not self._flush.wait(delay):
+                return
+            self._flush.clear()
+            self.send_frame()
+            self.flushes += 1
+
+    def flush_now(self):
+        """Send what changed now instead of at the next tick."""
+        self._flush.set()
+
     def send_frame(self):
-        state = self.dmx_state_manager.get_full_state()
-        frame = bytes(max(0, min(255, int(v))) for v in state)
+        seen = self.dmx_state_manager.generation   # everything up to here is in this tick's frames
+        changes = {}                # universe -> (changed, dirty fixture ids)
+        for u in self.universes:
+            generation, dirty = self.dmx_state_manager.changes_since(self._generations[u], universe=u)
+            changes[u] = (generation != self._generations[u], frozenset(dirty))
+            self._generations[u] = generation
         now = time.monotonic()
-        changed = frame != self._last_frame
-        self._last_frame = frame
-        packet = None
+        frames = {}
+        filled = set()
+        batch, sent_to = [], []
+        synced = False              # changed data queued this tick -> ArtSync after
         for t in self.targets:
-            if not (changed or now - t.last_sent >= self.HEARTBEAT):
+            addr = t.addr               # read once; the resolver may swap it
+            if addr is None or self._silent(t, now):
                 continue
-            t.resolve(now)
-            if t.addr is None:
+            for s in t.streams:
+                changed, dirty = changes[s.universe]
+                wanted = changed and (s.fixtures is None or not s.fixtures.isdisjoint(dirty))
+                if not (wanted or now - s.last_sent >= self.HEARTBEAT):
+                    continue
+                frame = frames.get(s.universe)
+                if frame is None:               # snapshot once per universe, first needed
+                    self.sequences[s.universe] = self.sequences[s.universe] % 255 + 1
+                    frame = frames[s.universe] = self.dmx_state_manager.universe(s.universe)
+                if s.packet not in filled:
+                    s.packet.fill(self.sequences[s.universe], frame)
+                    filled.add(s.packet)
+                batch.append((s.packet.packet, addr))
+                sent_to.append((t, s))
+                s.last_sent = t.last_sent = now
+                synced = synced or wanted
+        if synced and self.sync_addr:
+            batch.append((self._sync, self.sync_addr))
+        invalidated = set()
+        failed = self.sender.send(batch)
+        failed_at = {i for i, _ in failed}
+        for i, (packet, _) in enumerate(batch):
+            if i not in failed_at:
+                self.stats.sent(sent_to[i][0].room if i < len(sent_to) else 'artsync', len(packet))
+        if self.tracer is not None and self.tracer.pending:
+            self.tracer.frame_sent(seen, time.monotonic(),
+                                   [t.room for i, (t, _) in enumerate(sent_to) if i not in failed_at])
+        for i, e in failed:
+            if i == len(sent_to):
+                logger.debug(f"ArtSync to {self.sync_addr[0]} failed: {e}")
                 continue
-            if packet is None:                    # build once, first needed
-                self.sequence = self.sequence % 255 + 1
-                packet = build_artdmx(self.sequence, self.universe, frame)
-            try:
-                self.sock.sendto(packet, t.addr)
-                t.last_sent = now
-            except OSError as e:
-                logger.warning(f"Art-Net send to {t.room} ({t.addr[0]}) failed: {e}")
-                t.addr = None                     # force re-resolve
-                t.next_resolve = now + RERESOLVE_FAIL
+            t, s = sent_to[i]
+            s.last_sent = 0.0           # not sent: due again next tick
+            if isinstance(e, BlockingIOError):
+                logger.debug(f"Art-Net send to {t.room} dropped (socket buffer full)")
+                continue
+            if t not in invalidated:
+                logger.warning(f"Art-Net send to {t.room} ({batch[i][1][0]}) failed: {e}")
+                self.resolver.invalidate(t)
+                invalidated.add(t)
+
+    def _silent(self, t, now):
+        """A discovered node that stopped answering ArtPoll: skip it until
+        it replies again. Nodes never heard from (no discovery, or firmware
+        without ArtPollReply) are always sent to."""
+        return (self.discovery is not None and t.last_reply is not None
+                and now - t.last_reply > NODE_TIMEOUT)
+
+    def node_table(self):
+        """Per-room node status for the REST API: configured host, address in
+        use, and what the node last said about itself in its ArtPollReply."""
+        now = time.monotonic()
+        nodes = []
+        for t in self.targets:
+            seen = None if t.last_reply is None else round(now - t.last_reply, 1)
+            nodes.append({
+                'room': t.room,
+                'host': t.host,
+                'address': t.addr[0] if t.addr else None,
+                'universes': {self.universe + s.universe: s.packet.length for s in t.streams},
+                'discovered': t.last_reply is not None,
+                'alive': seen is not None and seen <= NODE_TIMEOUT,
+                'last_seen_s': seen,
+                'last_sent_s': round(now - t.last_sent, 1) if t.last_sent else None,
+                'node': t.node,
+            })
+        unmatched = []
+        if self.discovery:
+            unmatched = [dict(reply, address=ip, last_seen_s=round(now - seen, 1))
+                         for ip, (seen, reply) in self.discovery.unmatched.items()]
+        return {'discovery': self.discovery is not None, 'nodes': nodes, 'unmatched': unmatched}
 
     def stop(self):
         self.running = False
+        self._flush.set()
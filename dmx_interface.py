@@ -3,6 +3,8 @@ import time
 import logging
 from pyftdi.ftdi import Ftdi
 
+from frame_stats import FrameStats
+
 logger = logging.getLogger(__name__)
 
 class DMXOutputManager(threading.Thread):
@@ -23,7 +25,12 @@ class DMXOutputManager(threading.Thread):
         self.running = True
         self.data = bytearray(self.DMX_CHANNELS + 1)
         self.data[0] = self.START_CODE
+        self._generation = -1  # dmx_state_manager generation in self.data
+        self._flush = threading.Event()  # flush_now(): send without waiting for the tick
+        self.stats = FrameStats('ftdi', self.FREQUENCY)
+        self.tracer = None  # latency_trace.LatencyTracer, set by main.py
         self._initialize_port()
+        dmx_state_manager.add_flush_listener(self.flush_now)
 
     def _initialize_port(self):
         try:
@@ -42,31 +49,55 @@ class DMXOutputManager(threading.Thread):
         # bytes at 250kbaud) counts toward the period, instead of adding to it.
         next_frame = time.monotonic()
         while self.running:
+            started = time.monotonic()
             self.send_dmx_data()
+            self.stats.tick(next_frame, started, time.monotonic())
             next_frame += 1 / self.FREQUENCY
-            delay = next_frame - time.monotonic()
-            if delay > 0:
-                time.sleep(delay)
-            else:
+            if next_frame <= time.monotonic():
                 next_frame = time.monotonic()  # fell behind; don't burst to catch up
+                continue
+            self._wait(next_frame)
+
+    def _wait(self, deadline):
+        """Wait for the next frame; a flush_now() sends one in between
+        without moving the schedule."""
+        while self.running:
+            delay = deadline - time.monotonic()
+            if delay <= 0 or not self._flush.wait(delay):
+                return
+            self._flush.clear()
+            self.send_dmx_data()
+
+    def flush_now(self):
+        self._flush.set()
 
     def send_dmx_data(self):
         try:
-            state = self.dmx_state_manager.get_full_state()
-            self.data[1:] = bytearray(self._constrain_dmx_values(state))
+            # DMX needs continuous refresh, but the copy in behind the start
+            # code only happens when this chain's universe actually changed.
+            seen = self.dmx_state_manager.generation
+            generation, _ = self.dmx_state_manager.changes_since(self._generation, universe=self.universe)
+            if generation != self._generation:
+                self.data[1:] = self.dmx_state_manager.universe(self.universe)
+                self._generation = generation
+            started = time.monotonic()
             self.port.set_break(True)
             time.sleep(self.BREAK_TIME)
             self.port.set_break(False)
             time.sleep(self.MAB_TIME)
+            written = time.monotonic()
             self.port.write_data(self.data)
             time.sleep(self.FRAME_DELAY)
+            finished = time.monotonic()
+            self.stats.sample('break_mab', written - started)
+            self.stats.sample('write', finished - written)
+            self.stats.sent('ftdi', len(self.data))
+            if self.tracer is not None and self.tracer.pending:
+                self.tracer.frame_sent(seen, finished)
         except Exception as e:
             logger.error(f"Error sending DMX frame: {str(e)}", exc_info=True)
             self._handle_port_error()
 
-    def _constrain_dmx_values(self, values):
-        return [max(0, min(255, int(value))) for value in values]
-
     def _handle_port_error(self):
         if not self.port.is_connected:
             logger.error("DMX port is not connected. Attempting to reopen.")
@@ -77,6 +108,7 @@ class DMXOutputManager(threading.Thread):
 
     def stop(self):
         self.running = False
+        self._flush.set()
 
     def __del__(self):
         self.stop()
@@ -1,38 +1,212 @@
+"""The DMX universe every output reads: one contiguous bytearray over
+consecutive 512-channel universes, with generation-counted change tracking
+so each sink sends only what moved (``changes_since``).
+"""
 import threading
 import logging
 
+UNIVERSE_SIZE = 512
+
 logger = logging.getLogger(__name__)
 
+
+def _pack(values, width):
+    """Channel values -> exactly `width` bytes, clamped to 0..255 (a short row
+    zero-fills). Accepts lists/tuples of numbers or a numpy row."""
+    dtype = getattr(values, 'dtype', None)
+    if dtype is not None and str(dtype) != 'uint8':
+        values = values.clip(0, 255).astype('uint8')
+    try:
+        packed = bytes(values)          # fast path: already ints in 0..255
+    except (TypeError, ValueError):
+        packed = bytes(max(0, min(255, int(v))) for v in values)
+    return packed[:width].ljust(width, b'\x00')
+
+
+def universe_layout(slots, universes):
+    """(universes each fixture touches, fixtures in each universe) for a
+    patch: a fixture straddling a boundary is in both."""
+    fixture_universes = [tuple(range(offset // UNIVERSE_SIZE, (offset + max(1, width) - 1) // UNIVERSE_SIZE + 1))
+                         for offset, width in slots]
+    universe_fixtures = [[fixture_id for fixture_id, touched in enumerate(fixture_universes) if u in touched]
+                         for u in range(universes)]
+    return fixture_universes, universe_fixtures
+
+
 class DMXStateManager:
-    def __init__(self, num_fixtures, channels_per_fixture):
+    def __init__(self, num_fixtures, channels_per_fixture, slots=None, output_stage=None):
         self.num_fixtures = num_fixtures
         self.channels_per_fixture = channels_per_fixture
-        self.state = [0] * (num_fixtures * channels_per_fixture)
-        self.locks = [threading.Lock() for _ in range(num_fixtures)]
+        # fixture_id -> (first channel index, channels it owns)
+        self.slots = tuple(slots) if slots is not None else tuple(
+            (fixture_id * channels_per_fixture, channels_per_fixture) for fixture_id in range(num_fixtures))
+        self.state = bytearray(max((offset + width for offset, width in self.slots), default=0))
+        self._view = memoryview(self.state)  # compare slices without copying
+        # One lock for the whole universe: a write is a slice copy of a few
+        # bytes, so per-fixture locks only cost acquisitions.
+        self.lock = threading.Lock()
+        self._snapshot = bytes(self.state)  # cached frame; None = stale
+        self.generation = 0
+        self._fixture_generation = [0] * num_fixtures  # last generation each fixture changed
+        self.universes = max(1, -(-len(self.state) // UNIVERSE_SIZE))
+        self._fixture_universes, self._universe_fixtures = universe_layout(self.slots, self.universes)
+        self._universe_generation = [0] * self.universes  # last generation each universe changed
+        self._universe_snapshots = [None] * self.universes  # cached frames; None = stale
+        self.output_stage = None
+        self._flush_listeners = []
+        self._shared = None         # SharedUniverse the output process reads, if any
+        if output_stage is not None:
+            self.set_output_stage(output_stage)
+
+    @classmethod
+    def from_show(cls, show, output_stage=None):
+        """Sized and patched from a light_config_manager.ShowModel."""
+        return cls(len(show.fixtures), show.channels_per_fixture, show.slots, output_stage)
+
+    def set_output_stage(self, output_stage):
+        """Run every output frame through ``output_stage`` from now on."""
+        self.output_stage = output_stage
+        output_stage.add_listener(self.refresh_output)
+        self.refresh_output()
+
+    def refresh_output(self):
+        """The output stage changed: every fixture counts as changed, so each
+        sink picks up the new output on its next tick."""
+        with self.lock:
+            self._commit(range(self.num_fixtures))
+
+    def share(self, shared):
+        """Publish every commit to ``shared`` from now on."""
+        with self.lock:
+            self._shared = shared
+            self._publish()
+
+    def _publish(self):
+        """Lock held."""
+        self._shared.publish(self._output(), self.generation, self._universe_generation,
+                             self._fixture_generation)
+
+    def add_flush_listener(self, callback):
+        """``callback()`` runs on flush_now() — an output thread's wake-up."""
+        self._flush_listeners.append(callback)
+
+    def flush_now(self):
+        """Push what's been written to every output now, out of band."""
+        for callback in self._flush_listeners:
+            callback()
+
+    # -- writers (caller-facing); all funnel through _write under the lock ---
 
     def update_fixture(self, fixture_id, channel_values, override=False):
-        with self.locks[fixture_id]:
-            start_index = fixture_id * self.channels_per_fixture
-            if override:
-                self.state[start_index:start_index + self.channels_per_fixture] = channel_values
-            else:
-                for i, value in enumerate(channel_values):
-                    if value is not None:
-                        self.state[start_index + i] = value
+        """Write one fixture. ``override`` replaces all its channels (missing
+        trailing values become 0); otherwise ``None`` values are left as-is."""
+        start_index, width = self.slots[fixture_id]
+        if override or None not in channel_values:
+            packed = _pack(channel_values, width)
+            if not override:
+                packed = packed[:len(channel_values)]
+            with self.lock:
+                if self._write(start_index, packed):
+                    self._commit([fixture_id])
+            return
+        with self.lock:
+            merged = bytearray(self._view[start_index:start_index + width])
+            for i, value in enumerate(channel_values[:width]):
+                if value is not None:
+                    merged[i] = max(0, min(255, int(value)))
+            if self._write(start_index, merged):
+                self._commit([fixture_id])
 
-    def get_full_state(self):
-        return [int(value) for value in self.state]
+    def update_fixtures(self, fixture_ids, matrix):
+        """Bulk write: row i of ``matrix`` replaces fixture ``fixture_ids[i]``
+        (override semantics), all under one lock acquisition and at most one
+        generation bump. Returns the generation the frame is in."""
+        slots = self.slots
+        rows = [(fixture_id, slots[fixture_id][0], _pack(values, slots[fixture_id][1]))
+                for fixture_id, values in zip(fixture_ids, matrix)]
+        with self.lock:
+            self._commit([fixture_id for fixture_id, start_index, packed in rows
+                          if self._write(start_index, packed)])
+            return self.generation
 
     def reset_fixture(self, fixture_id):
-        with self.locks[fixture_id]:
-            start_index = fixture_id * self.channels_per_fixture
-            self.state[start_index:start_index + self.channels_per_fixture] = [0] * self.channels_per_fixture
+        start_index, width = self.slots[fixture_id]
+        with self.lock:
+            if self._write(start_index, bytes(width)):
+                self._commit([fixture_id])
 
     def reset_all_fixtures(self):
-        for fixture_id in range(self.num_fixtures):
-            self.reset_fixture(fixture_id)
+        with self.lock:
+            self._commit([fixture_id for fixture_id, (start_index, width) in enumerate(self.slots)
+                          if self._write(start_index, bytes(width))])
+
+    def _write(self, start_index, packed):
+        """Copy ``packed`` in if it differs; returns whether it did. Lock held."""
+        end_index = start_index + len(packed)
+        if self._view[start_index:end_index] == packed:
+            return False
+        self.state[start_index:end_index] = packed
+        return True
+
+    def _commit(self, changed):
+        """Stamp the changed fixture ids with one new generation. Lock held."""
+        if not changed:
+            return
+        self.generation += 1
+        for fixture_id in changed:
+            self._fixture_generation[fixture_id] = self.generation
+            for u in self._fixture_universes[fixture_id]:
+                self._universe_generation[u] = self.generation
+                self._universe_snapshots[u] = None
+        self._snapshot = None
+        if self._shared is not None:
+            self._publish()
+
+    # -- readers -------------------------------------------------------------
+
+    def snapshot(self):
+        """The current output frame as immutable bytes. Repeated calls return
+        the SAME object until something writes, so sinks can share it for free."""
+        with self.lock:
+            return self._output()
+
+    def universe(self, u):
+        """Universe ``u``'s output channels as immutable bytes (as many as are
+        in use, up to 512) — the same object until something in ``u`` changes."""
+        with self.lock:
+            frame = self._universe_snapshots[u]
+            if frame is None:
+                frame = self._universe_snapshots[u] = self._output()[u * UNIVERSE_SIZE:(u + 1) * UNIVERSE_SIZE]
+            return frame
+
+    def _output(self):
+        """The cached output frame, rebuilt if stale. Lock held."""
+        if self._snapshot is None:
+            stage = self.output_stage
+            frame = bytes(self.state)
+            self._snapshot = stage.apply(frame) if stage is not None else frame
+        return self._snapshot
+
+    def changes_since(self, generation, universe=None):
+        """Return ``(current_generation, dirty_fixture_ids)``. Free when nothing
+        changed since ``generation``; pass the returned generation next time.
+        With ``universe``, only that universe counts: the generation is the
+        last one that changed it and the dirty ids are its fixtures."""
+        with self.lock:
+            if universe is None:
+                current, fixture_ids = self.generation, range(self.num_fixtures)
+            else:
+                current, fixture_ids = self._universe_generation[universe], self._universe_fixtures[universe]
+            if current == generation:
+                return current, []
+            stamps = self._fixture_generation
+            return current, [i for i in fixture_ids if stamps[i] > generation]
+
+    def get_full_state(self):
+        with self.lock:
+            return list(self.state)
 
     def get_fixture_state(self, fixture_id):
-        with self.locks[fixture_id]:
-            start_index = fixture_id * self.channels_per_fixture
-            return self.state[start_index:start_index + self.channels_per_fixture]
+        start_index, width = self.slots[fixture_id]
+        with self.lock:
+            return list(self.state[start_index:start_index + width])
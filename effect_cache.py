@@ -0,0 +1,76 @@
+"""On-disk cache of built effects, keyed by the source that built them.
+
+An entry is the factory's effect dict plus its CompiledEffect tables, pickled
+to <cache dir>/<effect name>-<hash>.pickle. The hash covers the effect's own
+module, effect_utils.py (the step math and the table format) and
+CACHE_VERSION, so editing an effect — or how effects compile — simply misses
+and rebuilds; nothing needs invalidating by hand. A restart with a warm cache
+skips generation entirely (LightningStorm's 6000 steps included).
+
+Effects that roll random numbers at build time keep the same roll across
+restarts until their source changes (they already kept it for the life of a
+process). Delete the directory to re-roll. The cache is local scratch written
+only by this server, so pickle is fine; any unreadable entry is rebuilt.
+"""
+import hashlib
+import inspect
+import logging
+import os
+import pickle
+
+import effect_utils
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = os.environ.get('LOHP_EFFECT_CACHE', '.effect_cache')
+CACHE_VERSION = 1   # bump when the entry layout changes
+
+
+class EffectCache:
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = cache_dir
+        self._sources = {}      # path -> bytes, read once per process
+
+    def key(self, effect_name, factory):
+        digest = hashlib.sha256(f'{CACHE_VERSION}:{effect_name}'.encode())
+        for path in (inspect.getsourcefile(factory), effect_utils.__file__):
+            digest.update(self._source(path))
+        return digest.hexdigest()[:16]
+
+    def load(self, effect_name, factory):
+        """(effect_data, compiled) from disk, or None on a miss."""
+        path = self._path(effect_name, self.key(effect_name, factory))
+        try:
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Effect cache entry {path} unreadable ({e}) — rebuilding")
+            return None
+
+    def store(self, effect_name, factory, effect_data, compiled):
+        """Write the entry atomically and drop this effect's stale ones."""
+        key = self.key(effect_name, factory)
+        path = self._path(effect_name, key)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp = f'{path}.{os.getpid()}.tmp'
+            with open(tmp, 'wb') as f:
+                pickle.dump((effect_data, compiled), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+            for name in os.listdir(self.cache_dir):
+                if (name.endswith('.pickle') and name.rsplit('-', 1)[0] == effect_name
+                        and name != os.path.basename(path)):
+                    os.remove(os.path.join(self.cache_dir, name))
+        except OSError as e:
+            logger.warning(f"Effect cache not written for {effect_name}: {e}")
+
+    def _path(self, effect_name, key):
+        return os.path.join(self.cache_dir, f'{effect_name}-{key}.pickle')
+
+    def _source(self, path):
+        if path not in self._sources:
+            with open(path, 'rb') as f:
+                self._sources[path] = f.read()
+        return self._sources[path]
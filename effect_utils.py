@@ -1,6 +1,8 @@
 import math
 import random
 
+import numpy as np
+
 def hsv_to_rgb(h, s, v):
     if s == 0.0:
         return (v, v, v)
@@ -130,35 +132,187 @@ def generate_theme_values(theme_data, current_time, master_brightness, room_inde
 
     return channels
 
+THEME_CHANNELS = ['total_dimming', 'r_dimming', 'g_dimming', 'b_dimming', 'w_dimming']
+NOISE_LEN = 4096  # rows in the theme noise table (~7 minutes of 10Hz steps)
+
+
+def room_offsets(total_rooms):
+    """Per-room phase offsets, the vector form of generate_theme_values'
+    room_offset."""
+    return np.arange(total_rooms) / max(1, total_rooms) * 2 * math.pi
+
+
+def theme_noise_table(seed=0, length=NOISE_LEN):
+    """Seeded uniform [0, 1) draws standing in for generate_theme_values'
+    random.uniform calls: column 0 flicker/twinkle, 1-3 hue/sat/value jitter."""
+    return np.random.default_rng(seed).random((length, 4))
+
+
+def hsv_to_rgb_array(h, s, v):
+    """hsv_to_rgb over arrays (s == 0 falls out of the formulas as grey)."""
+    i = np.floor(h * 6.).astype(int)
+    f = h * 6. - i
+    p, q, t = v * (1. - s), v * (1. - s * f), v * (1. - s * (1. - f))
+    i %= 6
+    return (np.choose(i, [v, q, p, p, t, v]),
+            np.choose(i, [t, v, v, q, p, p]),
+            np.choose(i, [p, p, t, v, v, q]))
+
+
+def generate_theme_matrix(theme_data, current_time, offsets, noise, temporary_values=None):
+    """generate_theme_values for every room in one pass.
+
+    ``offsets`` is room_offsets(total_rooms) and ``noise`` one row of
+    theme_noise_table per room (shape (rooms, 4)). Returns an int array of
+    shape (rooms, 5): THEME_CHANNELS per room, the same math as the scalar
+    version with the random draws taken from ``noise``. No master brightness:
+    that is the output stage's grand master, applied after the theme.
+    """
+    overall_brightness = theme_data.get('overall_brightness', 0.8)
+    temporary_values = temporary_values or {}
+    transition_speed = temporary_values.get('transition-speed', theme_data.get('transition_speed', 0.7))
+
+    time_factor_slow = current_time * transition_speed * 0.05
+    time_factor_medium = current_time * transition_speed * 0.2
+    time_factor_fast = current_time * transition_speed * 0.8
+    time_factor_very_fast = current_time * transition_speed * 3
+
+    # Everything but the room terms is one scalar for the whole maze
+    wave_medium = math.sin(time_factor_medium)
+    wave_fast = math.sin(time_factor_fast)
+    wave_complex = (math.sin(time_factor_slow) + wave_medium + wave_fast + math.sin(time_factor_very_fast)) / 4
+    room_wave = np.sin(time_factor_medium + offsets)
+
+    color_wheel_speed = temporary_values.get('color-wheel-speed', theme_data.get('color_wheel_speed', 0.3))
+    base_hue = theme_data.get('base_hue', 0)
+    hue_range = theme_data.get('hue_range', 0.7)
+    hue = (base_hue + (wave_complex * 0.5 + 0.5) * hue_range + time_factor_slow * color_wheel_speed + room_wave * 0.1) % 1
+
+    saturation_min = theme_data.get('saturation_min', 0.7)
+    saturation_max = theme_data.get('saturation_max', 1.0)
+    saturation = saturation_min + (saturation_max - saturation_min) * ((wave_medium + room_wave) * 0.25 + 0.5)
+
+    value_min = theme_data.get('value_min', 0.6)
+    value_max = theme_data.get('value_max', 1.0)
+    value = value_min + (value_max - value_min) * ((wave_fast + room_wave) * 0.25 + 0.5) * overall_brightness
+
+    if 'neon_pulse' in theme_data:  # NeonNightlife theme
+        neon_pulse = (np.sin(time_factor_fast * 3 + offsets) * 0.5 + 0.5) * theme_data.get('neon_pulse', 0.9)
+        strobe = (np.sin(time_factor_very_fast * 10 + offsets) * 0.5 + 0.5) * theme_data.get('strobe_frequency', 0.3)
+        hue = (hue + neon_pulse * 0.2) % 1
+        value = np.clip(value + neon_pulse * 0.3 + strobe * 0.2, value_min, value_max)
+    elif 'wave_effect' in theme_data:  # TropicalParadise theme
+        wave = np.sin(time_factor_medium * 1.5 + offsets) * theme_data.get('wave_effect', 0.7)
+        sunset = (np.sin(time_factor_slow * 0.5 + offsets) * 0.5 + 0.5) * theme_data.get('sunset_glow', 0.8)
+        hue = (hue + sunset * 0.1 + wave * 0.05) % 1
+        saturation = np.clip(saturation + wave * 0.2, saturation_min, saturation_max)
+        value = np.clip(value + sunset * 0.3 + wave * 0.1, value_min, value_max)
+    elif 'neon_flicker' in theme_data:  # CyberPunk theme
+        flicker = (0.8 + 0.2 * noise[:, 0]) * theme_data.get('neon_flicker', 0.8)
+        data_stream = (np.sin(time_factor_very_fast * 5 + offsets) * 0.5 + 0.5) * theme_data.get('data_stream', 0.7)
+        hue = (hue + data_stream * 0.3) % 1
+        value = np.clip(value * flicker + data_stream * 0.2, value_min, value_max)
+    elif 'fairy_lights' in theme_data:  # EnchantedForest theme
+        fairy_lights = (np.sin(time_factor_fast * 4 + offsets) * 0.5 + 0.5) * theme_data.get('fairy_lights', 0.6)
+        moonbeam = (np.sin(time_factor_slow * 0.3 + offsets) * 0.5 + 0.5) * theme_data.get('moonbeam', 0.5)
+        hue = (hue + moonbeam * 0.1 + fairy_lights * 0.05) % 1
+        saturation = np.clip(saturation - moonbeam * 0.3 + fairy_lights * 0.2, saturation_min, saturation_max)
+        value = np.clip(value + fairy_lights * 0.4 + moonbeam * 0.2, value_min, value_max)
+    elif 'starfield_twinkle' in theme_data:  # CosmicVoyage theme
+        twinkle = (0.7 + 0.3 * noise[:, 0]) * theme_data.get('starfield_twinkle', 0.8)
+        nebula = (np.sin(time_factor_medium * 0.7 + offsets) * 0.5 + 0.5) * theme_data.get('nebula_swirl', 0.7)
+        hue = (hue + nebula * 0.2 + twinkle * 0.05) % 1
+        saturation = np.clip(saturation + nebula * 0.3 + twinkle * 0.1, saturation_min, saturation_max)
+        value = np.clip(value * twinkle + nebula * 0.2, value_min, value_max)
+
+    # Jitter to prevent static patterns
+    hue = (hue + (noise[:, 1] * 0.06 - 0.03)) % 1
+    saturation = np.clip(saturation + (noise[:, 2] * 0.1 - 0.05), saturation_min, saturation_max)
+    value = np.clip(value + (noise[:, 3] * 0.1 - 0.05), value_min, value_max)
+
+    # Keep one or two channels dominant: the top one as-is, the second scaled
+    # by second/top, the third off
+    rgb = np.stack(hsv_to_rgb_array(hue, saturation, value), axis=1)
+    max_color = rgb.max(axis=1, keepdims=True)
+    secondary_color = np.sort(rgb, axis=1)[:, 1:2]
+    secondary_ratio = np.divide(secondary_color, max_color, out=np.zeros_like(max_color), where=max_color > 0)
+    rgb_final = np.where(rgb == max_color, rgb, np.where(rgb == secondary_color, rgb * secondary_ratio, 0.0))
+
+    channels = np.zeros((len(offsets), len(THEME_CHANNELS)), dtype=int)
+    channels[:, 0] = (value * 255).astype(int)
+    channels[:, 1:4] = (rgb_final * 255).astype(int)
+    return channels  # w_dimming stays 0: no white component in themes
+
 EFFECT_CHANNELS = ['total_dimming', 'r_dimming', 'g_dimming', 'b_dimming',
                    'w_dimming', 'total_strobe', 'function_selection', 'function_speed']
 
-def get_effect_step_values(effect_data):
-    """Return a function mapping elapsed seconds to the 8 interpolated channel values.
+FRAME_RATE = 44  # frame table rate; matches the compositor and the outputs
+
 
-    Steps are precomputed into arrays and scanned with a moving cursor so long
-    effects (LightningStorm has ~6000 steps) stay cheap at the 44Hz update rate.
+class CompiledEffect:
+    """An effect's steps compiled once into contiguous tables.
+
+    ``times`` is a float32 array of step times, sorted; ``values`` the
+    matching (N, 8) uint8 matrix in EFFECT_CHANNELS order. ``frames``
+    pre-renders the interpolation at FRAME_RATE in one vectorized pass
+    (``searchsorted`` of every frame time into ``times``) and keeps it as one
+    bytes object, so playback is a slice of one shared 8-byte row — the form
+    the DMX state takes — instead of a cursor scan per fixture. ``cues`` are
+    the (time, row) of steps marked ``"flush": True`` — moments that must
+    hit the wire on time, not at the next frame.
     """
-    times = [step['time'] for step in effect_data['steps']]
-    values = [[step['channels'].get(channel, 0) for channel in EFFECT_CHANNELS]
-              for step in effect_data['steps']]
-    cursor = 0
-
-    def get_values(elapsed_time):
-        nonlocal cursor
-        if not times:
-            return [0] * 8
-        if cursor > 0 and elapsed_time < times[cursor - 1]:
-            cursor = 0  # Another fixture is slightly behind; rewind
-        while cursor < len(times) and times[cursor] < elapsed_time:
-            cursor += 1
-        if cursor >= len(times):
-            return [0] * 8  # Beyond the last step
-        if cursor == 0:
-            return list(values[0])
-        t0, t1 = times[cursor - 1], times[cursor]
+
+    __slots__ = ('duration', 'times', 'values', 'frames', 'frame_rate', 'cues')
+
+    def __init__(self, effect_data, frame_rate=FRAME_RATE):
+        steps = sorted(effect_data['steps'], key=lambda step: step['time'])
+        self.duration = effect_data['duration']
+        self.frame_rate = frame_rate
+        self.times = np.array([step['time'] for step in steps], dtype=np.float32)
+        self.values = np.array([[max(0, min(255, int(step['channels'].get(channel, 0))))
+                                 for channel in EFFECT_CHANNELS] for step in steps],
+                               dtype=np.uint8).reshape(len(steps), len(EFFECT_CHANNELS))
+        count = max(0, math.ceil(self.duration * frame_rate))
+        self.frames = self._interpolate(np.arange(count) / frame_rate).tobytes()
+        self.cues = tuple((float(self.times[i]), self.values[i].tobytes())
+                          for i, step in enumerate(steps) if step.get('flush'))
+
+    def _interpolate(self, elapsed):
+        """values_at() for an array of times: an (len(elapsed), 8) uint8 matrix."""
+        rows = np.zeros((len(elapsed), len(EFFECT_CHANNELS)), dtype=np.uint8)
+        count = len(self.times)
+        if not count:
+            return rows
+        index = np.searchsorted(self.times, elapsed)
+        upper = np.clip(index, 1, count - 1) if count > 1 else np.zeros_like(index)
+        lower = np.maximum(upper - 1, 0)
+        t0, t1 = self.times[lower].astype(np.float64), self.times[upper].astype(np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t = np.where(t1 > t0, (elapsed - t0) / (t1 - t0), 1.0)[:, None]
+        v0, v1 = self.values[lower].astype(np.float64), self.values[upper].astype(np.float64)
+        between = v0 + t * (v1 - v0)
+        rows[:] = np.trunc(between)
+        rows[index == 0] = self.values[0]
+        rows[index >= count] = 0
+        return rows
+
+    def values_at(self, elapsed_time):
+        """The 8 channel values at ``elapsed_time``: the first step's before
+        it starts, linear (truncated) between steps, zeros past the last."""
+        times = self.times
+        index = int(np.searchsorted(times, elapsed_time))
+        if index >= len(times):
+            return bytes(8)
+        if index == 0:
+            return self.values[0].tobytes()
+        t0, t1 = float(times[index - 1]), float(times[index])
         t = (elapsed_time - t0) / (t1 - t0) if t1 > t0 else 1.0
-        v0, v1 = values[cursor - 1], values[cursor]
-        return [int(a + t * (b - a)) for a, b in zip(v0, v1)]
+        v0, v1 = self.values[index - 1].tolist(), self.values[index].tolist()
+        return bytes(int(a + t * (b - a)) for a, b in zip(v0, v1))
 
-    return get_values
+    def frame_at(self, elapsed_time):
+        """The pre-rendered row for the frame containing ``elapsed_time``."""
+        k = int(elapsed_time * self.frame_rate + 1e-6)  # k/rate * rate can land at k - ε
+        if k * 8 >= len(self.frames):
+            return bytes(8)
+        return self.frames[k * 8:k * 8 + 8]
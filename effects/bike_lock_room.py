@@ -3,10 +3,12 @@ import random
 
 logger = logging.getLogger(__name__)
 
+DESCRIPTION = "Borg ship action scene effect for Bike Lock Room"
+
 def create_bike_lock_room_effect():
     bike_lock_room_effect = {
         "duration": 10.0,
-        "description": "Borg ship action scene effect for Bike Lock Room",
+        "description": DESCRIPTION,
         "steps": []
     }
     
@@ -55,6 +57,6 @@ def create_bike_lock_room_effect():
         }
     })
     
-    logger.debug(f"Created BikeLockRoom effect: {bike_lock_room_effect}")
+    logger.debug("Created BikeLockRoom effect: %s", bike_lock_room_effect)
     logger.info(f"BikeLockRoom effect created with {len(bike_lock_room_effect['steps'])} steps over {bike_lock_room_effect['duration']} seconds")
     return bike_lock_room_effect
@@ -3,10 +3,12 @@ import math
 
 logger = logging.getLogger(__name__)
 
+DESCRIPTION = "Soft, warm, and inviting light effect for the Cuddle Puddle area"
+
 def create_cuddle_puddle_effect():
     cuddle_puddle_effect = {
         "duration": 20.0,
-        "description": "Soft, warm, and inviting light effect for the Cuddle Puddle area",
+        "description": DESCRIPTION,
         "steps": []
     }
     
@@ -37,6 +39,6 @@ def create_cuddle_puddle_effect():
             }
         })
     
-    logger.debug(f"Created Cuddle Puddle effect: {cuddle_puddle_effect}")
+    logger.debug("Created Cuddle Puddle effect: %s", cuddle_puddle_effect)
     logger.info(f"Cuddle Puddle effect created with {len(cuddle_puddle_effect['steps'])} steps over {cuddle_puddle_effect['duration']} seconds")
     return cuddle_puddle_effect
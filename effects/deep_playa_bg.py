@@ -4,10 +4,12 @@ from effect_utils import hsv_to_rgb
 
 logger = logging.getLogger(__name__)
 
+DESCRIPTION = "Background effect for the Deep Playa area with subtle, slow-changing colors"
+
 def create_deep_playa_bg_effect():
     deep_playa_bg_effect = {
         "duration": 20.0,
-        "description": "Background effect for the Deep Playa area with subtle, slow-changing colors",
+        "description": DESCRIPTION,
         "steps": []
     }
     
@@ -34,7 +36,7 @@ def create_deep_playa_bg_effect():
             }
         })
     
-    logger.debug(f"Created Deep Playa Background effect: {deep_playa_bg_effect}")
+    logger.debug("Created Deep Playa Background effect: %s", deep_playa_bg_effect)
     logger.info(f"Deep Playa Background effect created with {len(deep_playa_bg_effect['steps'])} steps over {deep_playa_bg_effect['duration']} seconds")
     return deep_playa_bg_effect
 
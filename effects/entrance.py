@@ -3,10 +3,12 @@ import math
 
 logger = logging.getLogger(__name__)
 
+DESCRIPTION = "Welcoming effect with warm colors and gentle pulsing for the entrance"
+
 def create_entrance_effect():
     entrance_effect = {
         "duration": 15.0,
-        "description": "Welcoming effect with warm colors and gentle pulsing for the entrance",
+        "description": DESCRIPTION,
         "steps": []
     }
     
@@ -37,6 +39,6 @@ def create_entrance_effect():
             }
         })
     
-    logger.debug(f"Created Entrance effect: {entrance_effect}")
+    logger.debug("Created Entrance effect: %s", entrance_effect)
     logger.info(f"Entrance effect created with {len(entrance_effect['steps'])} steps over {entrance_effect['duration']} seconds")
     return entrance_effect
@@ -3,10 +3,12 @@ import math
 
 logger = logging.getLogger(__name__)
 
+DESCRIPTION = "Welcoming effect with gentle color transitions and pulsing"
+
 def create_gate_greeters_effect():
     gate_greeters_effect = {
         "duration": 10.0,
-        "description": "Welcoming effect with gentle color transitions and pulsing",
+        "description": DESCRIPTION,
         "steps": []
     }
     
@@ -38,6 +40,6 @@ def create_gate_greeters_effect():
             }
         })
     
-    logger.debug(f"Created Gate Greeters effect: {gate_greeters_effect}")
+    logger.debug("Created Gate Greeters effect: %s", gate_greeters_effect)
     logger.info(f"Gate Greeters effect created with {len(gate_greeters_effect['steps'])} steps over {gate_greeters_effect['duration']} seconds")
     return gate_greeters_effect
@@ -3,10 +3,12 @@ import math
 
 logger = logging.getLogger(__name__)
 
+DESCRIPTION = "Simulates climbing vines in a jungle with blues and greens and a low strobe, lasting 15 seconds"
+
 def create_guy_line_climb_effect():
     guy_line_climb_effect = {
         "duration": 15.0,
-        "description": "Simulates climbing vines in a jungle with blues and greens and a low strobe, lasting 15 seconds",
+        "description": DESCRIPTION,
         "steps": []
     }
     
@@ -40,6 +42,6 @@ def create_guy_line_climb_effect():
             }
         })
     
-    logger.debug(f"Created Guy Line Climb effect: {guy_line_climb_effect}")
+    logger.debug("Created Guy Line Climb effect: %s", guy_line_climb_effect)
     logger.info(f"Guy Line Climb effect created with {len(guy_line_climb_effect['steps'])} steps over {guy_line_climb_effect['duration']} seconds")
     return guy_line_climb_effect
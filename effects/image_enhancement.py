@@ -3,10 +3,12 @@ import math
 
 logger = logging.getLogger(__name__)
 
+DESCRIPTION = "3-second fade up to orange, then 15 seconds at full brightness for image enhancement effect"
+
 def create_image_enhancement_effect():
     image_enhancement_effect = {
         "duration": 18.0,  # 3 seconds fade up + 15 seconds full brightness
-        "description": "3-second fade up to orange, then 15 seconds at full brightness for image enhancement effect",
+        "description": DESCRIPTION,
         "audio_file": "image-enhancement.mp3",
         "steps": []
     }
@@ -61,6 +63,6 @@ def create_image_enhancement_effect():
             }
         })
     
-    logger.debug(f"Created Image Enhancement effect: {image_enhancement_effect}")
+    logger.debug("Created Image Enhancement effect: %s", image_enhancement_effect)
     logger.info(f"Image Enhancement effect created with {len(image_enhancement_effect['steps'])} steps over {image_enhancement_effect['duration']} seconds")
     return image_enhancement_effect
@@ -2,15 +2,17 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+DESCRIPTION = "Simulates a lightning strike with bright flashes, matching the audio spectrogram"
+
 def create_lightning_effect():
     lightning_effect = {
         "duration": 3.5,
-        "description": "Simulates a lightning strike with bright flashes, matching the audio spectrogram",
+        "description": DESCRIPTION,
         "steps": [
             {"time": 0.0, "channels": {"total_dimming": 0, "r_dimming": 0, "g_dimming": 0, "b_dimming": 0, "w_dimming": 0, "total_strobe": 0, "function_selection": 0, "function_speed": 0}},
-            {"time": 0.5, "channels": {"total_dimming": 255, "r_dimming": 255, "g_dimming": 255, "b_dimming": 255, "w_dimming": 255, "total_strobe": 0, "function_selection": 0, "function_speed": 0}},
+            {"time": 0.5, "flush": True, "channels": {"total_dimming": 255, "r_dimming": 255, "g_dimming": 255, "b_dimming": 255, "w_dimming": 255, "total_strobe": 0, "function_selection": 0, "function_speed": 0}},
             {"time": 0.6, "channels": {"total_dimming": 128, "r_dimming": 128, "g_dimming": 128, "b_dimming": 128, "w_dimming": 128, "total_strobe": 0, "function_selection": 0, "function_speed": 0}},
-            {"time": 0.7, "channels": {"total_dimming": 255, "r_dimming": 255, "g_dimming": 255, "b_dimming": 255, "w_dimming": 255, "total_strobe": 0, "function_selection": 0, "function_speed": 0}},
+            {"time": 0.7, "flush": True, "channels": {"total_dimming": 255, "r_dimming": 255, "g_dimming": 255, "b_dimming": 255, "w_dimming": 255, "total_strobe": 0, "function_selection": 0, "function_speed": 0}},
             {"time": 0.8, "channels": {"total_dimming": 64, "r_dimming": 64, "g_dimming": 64, "b_dimming": 64, "w_dimming": 64, "total_strobe": 0, "function_selection": 0, "function_speed": 0}},
             {"time": 1.0, "channels": {"total_dimming": 192, "r_dimming": 192, "g_dimming": 192, "b_dimming": 192, "w_dimming": 192, "total_strobe": 0, "function_selection": 0, "function_speed": 0}},
             {"time": 1.2, "channels": {"total_dimming": 128, "r_dimming": 128, "g_dimming": 128, "b_dimming": 128, "w_dimming": 128, "total_strobe": 0, "function_selection": 0, "function_speed": 0}},
@@ -22,6 +24,6 @@ def create_lightning_effect():
             {"time": 3.5, "channels": {"total_dimming": 0, "r_dimming": 0, "g_dimming": 0, "b_dimming": 0, "w_dimming": 0, "total_strobe": 0, "function_selection": 0, "function_speed": 0}}
         ]
     }
-    logger.debug(f"Created Lightning effect: {lightning_effect}")
+    logger.debug("Created Lightning effect: %s", lightning_effect)
     logger.info(f"Lightning effect created with {len(lightning_effect['steps'])} steps over {lightning_effect['duration']} seconds")
     return lightning_effect
@@ -4,11 +4,13 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+DESCRIPTION = "A 10-minute rain and thunderstorm simulation with synchronized lightning flashes and background blue light"
+
 def create_lightning_storm_effect():
     duration = 600.0  # 10 minutes
     lightning_storm_effect = {
         "duration": duration,
-        "description": "A 10-minute rain and thunderstorm simulation with synchronized lightning flashes and background blue light",
+        "description": DESCRIPTION,
         "steps": []
     }
 
@@ -50,9 +52,10 @@ def create_lightning_storm_effect():
         if lightning_timings and current_time >= lightning_timings[0]:
             flash_time = lightning_timings.pop(0)
             
-            # Bright initial flash
+            # Bright initial flash — a cue: flushed to the wire on time, with the thunder
             lightning_storm_effect["steps"].append({
                 "time": flash_time,
+                "flush": True,
                 "channels": {
                     "total_dimming": 255,
                     "r_dimming": 255,
@@ -115,6 +118,6 @@ def create_lightning_storm_effect():
     # Ensure the last step is at the exact duration
     lightning_storm_effect["steps"][-1]["time"] = duration
 
-    logger.debug(f"Created LightningStorm effect: {lightning_storm_effect}")
+    logger.debug("Created LightningStorm effect: %s", lightning_storm_effect)
     logger.info(f"LightningStorm effect created with {len(lightning_storm_effect['steps'])} steps over {duration} seconds")
     return lightning_storm_effect
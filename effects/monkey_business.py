@@ -2,6 +2,10 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+DESCRIPTION = ("Monkey puzzle completed — Shrine of the Silver Monkey "
+               "fanfare with synced gold flashes, a mega flash on the "
+               "stinger, and emerald twinkle decay")
+
 # Timeline mirrors audio_files/monkey-shrine-complete.mp3 — the Shrine of the
 # Silver Monkey assembly cue from Legends of the Hidden Temple (sampled by
 # tools/fetch_monkey_sound.sh). Measured onsets: fanfare hit at 0.06s, sustained
@@ -75,9 +79,7 @@ def create_monkey_business_effect():
 
     effect = {
         "duration": DURATION,
-        "description": "Monkey puzzle completed — Shrine of the Silver Monkey "
-                       "fanfare with synced gold flashes, a mega flash on the "
-                       "stinger, and emerald twinkle decay",
+        "description": DESCRIPTION,
         "steps": steps,
     }
     logger.info(f"MonkeyBusiness effect created with {len(steps)} steps over {DURATION} seconds")
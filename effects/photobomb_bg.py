@@ -4,10 +4,12 @@ from effect_utils import hsv_to_rgb
 
 logger = logging.getLogger(__name__)
 
+DESCRIPTION = "Background effect for the Photo Bomb room with subtle color changes"
+
 def create_photobomb_bg_effect():
     photobomb_bg_effect = {
         "duration": 10.0,
-        "description": "Background effect for the Photo Bomb room with subtle color changes",
+        "description": DESCRIPTION,
         "steps": []
     }
     
@@ -34,7 +36,7 @@ def create_photobomb_bg_effect():
             }
         })
     
-    logger.debug(f"Created Photo Bomb Background effect: {photobomb_bg_effect}")
+    logger.debug("Created Photo Bomb Background effect: %s", photobomb_bg_effect)
     logger.info(f"Photo Bomb Background effect created with {len(photobomb_bg_effect['steps'])} steps over {photobomb_bg_effect['duration']} seconds")
     return photobomb_bg_effect
 
@@ -2,6 +2,10 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+DESCRIPTION = ("Photo booth camera sequence: power-up, 3-2-1 countdown, "
+               "white FLASH at the shutter (photo taken), sparkle outro")
+
+
 # Shared timeline for the Photo Bomb camera sequence (seconds from effect start).
 # tools/make_photobomb_audio.py renders audio_files/photobomb-countdown.mp3 from
 # these numbers, and main.py schedules the webcam capture off SHUTTER_OFFSET —
@@ -12,8 +16,8 @@ SHUTTER_OFFSET = 4.0           # shutter click, white flash, photo capture
 DURATION = 6.5
 
 
-def _step(t, total, r, g, b, w):
-    return {
+def _step(t, total, r, g, b, w, flush=False):
+    step = {
         "time": t,
         "channels": {
             "total_dimming": total, "r_dimming": r, "g_dimming": g,
@@ -21,6 +25,9 @@ def _step(t, total, r, g, b, w):
             "total_strobe": 0, "function_selection": 0, "function_speed": 0,
         },
     }
+    if flush:
+        step["flush"] = True    # a cue: on the wire at its time, not the next frame
+    return step
 
 
 def create_photobomb_shot_effect():
@@ -48,7 +55,7 @@ def create_photobomb_shot_effect():
     # Anticipation dip, then the FLASH
     steps.append(_step(3.5, 60, 255, 210, 120, 0))
     steps.append(_step(SHUTTER_OFFSET - 0.05, 25, 255, 220, 160, 0))
-    steps.append(_step(SHUTTER_OFFSET, 255, 255, 255, 255, 255))
+    steps.append(_step(SHUTTER_OFFSET, 255, 255, 255, 255, 255, flush=True))
     steps.append(_step(SHUTTER_OFFSET + 0.15, 255, 255, 255, 255, 255))
     steps.append(_step(SHUTTER_OFFSET + 0.45, 90, 255, 240, 220, 60))
     steps.append(_step(SHUTTER_OFFSET + 0.70, 35, 255, 220, 180, 0))
@@ -67,8 +74,7 @@ def create_photobomb_shot_effect():
 
     effect = {
         "duration": DURATION,
-        "description": "Photo booth camera sequence: power-up, 3-2-1 countdown, "
-                       "white FLASH at the shutter (photo taken), sparkle outro",
+        "description": DESCRIPTION,
         "steps": steps,
     }
     logger.info(f"PhotoBomb-Shot effect created with {len(steps)} steps over {DURATION} seconds")
@@ -2,10 +2,12 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+DESCRIPTION = "Flashing white light for Photo Bomb Room, synced with 'Girls on Film'"
+
 def create_photobomb_spot_effect():
     photobomb_spot_effect = {
         "duration": 15.0,  # Duration of the "Girls on Film" intro
-        "description": "Flashing white light for Photo Bomb Room, synced with 'Girls on Film'",
+        "description": DESCRIPTION,
         "steps": []
     }
     
@@ -35,6 +37,6 @@ def create_photobomb_spot_effect():
         "channels": {"total_dimming": 0, "r_dimming": 0, "g_dimming": 0, "b_dimming": 0, "w_dimming": 0, "total_strobe": 0, "function_selection": 0, "function_speed": 0}
     })
     
-    logger.debug(f"Created PhotoBomb-Spot effect: {photobomb_spot_effect}")
+    logger.debug("Created PhotoBomb-Spot effect: %s", photobomb_spot_effect)
     logger.info(f"PhotoBomb-Spot effect created with {len(photobomb_spot_effect['steps'])} steps over {photobomb_spot_effect['duration']} seconds")
     return photobomb_spot_effect
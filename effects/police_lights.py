@@ -2,10 +2,12 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+DESCRIPTION = "Alternating red and blue flashes simulating police lights"
+
 def create_police_lights_effect():
     police_lights_effect = {
         "duration": 10.0,
-        "description": "Alternating red and blue flashes simulating police lights",
+        "description": DESCRIPTION,
         "audio_file": "policelights.mp3",
         "steps": []
     }
@@ -16,6 +18,6 @@ def create_police_lights_effect():
             {"time": t + 0.5, "channels": {"total_dimming": 255, "r_dimming": 0, "b_dimming": 255, "g_dimming": 0, "w_dimming": 0, "total_strobe": 0, "function_selection": 0, "function_speed": 0}}
         ])
     police_lights_effect["steps"].append({"time": 15.0, "channels": {"total_dimming": 0, "r_dimming": 0, "b_dimming": 0, "g_dimming": 0, "w_dimming": 0, "total_strobe": 0, "function_selection": 0, "function_speed": 0}})
-    logger.debug(f"Created Police Lights effect: {police_lights_effect}")
+    logger.debug("Created Police Lights effect: %s", police_lights_effect)
     logger.info(f"Police Lights effect created with {len(police_lights_effect['steps'])} steps over {police_lights_effect['duration']} seconds")
     return police_lights_effect
@@ -3,10 +3,12 @@ import math
 
 logger = logging.getLogger(__name__)
 
+DESCRIPTION = "Simulates a hit on the porto-potty with a quick flash and fade"
+
 def create_porto_hit_effect():
     porto_hit_effect = {
         "duration": 3.0,
-        "description": "Simulates a hit on the porto-potty with a quick flash and fade",
+        "description": DESCRIPTION,
         "steps": []
     }
     
@@ -32,6 +34,6 @@ def create_porto_hit_effect():
             }
         })
     
-    logger.debug(f"Created Porto Hit effect: {porto_hit_effect}")
+    logger.debug("Created Porto Hit effect: %s", porto_hit_effect)
     logger.info(f"Porto Hit effect created with {len(porto_hit_effect['steps'])} steps over {porto_hit_effect['duration']} seconds")
     return porto_hit_effect
@@ -3,10 +3,12 @@ import math
 
 logger = logging.getLogger(__name__)
 
+DESCRIPTION = "Gentle pulsing blue light for Porto Room standby state"
+
 def create_porto_standby_effect():
     porto_standby_effect = {
         "duration": 10.0,
-        "description": "Gentle pulsing blue light for Porto Room standby state",
+        "description": DESCRIPTION,
         "steps": []
     }
     
@@ -35,6 +37,6 @@ def create_porto_standby_effect():
             }
         })
     
-    logger.debug(f"Created Porto Standby effect: {porto_standby_effect}")
+    logger.debug("Created Porto Standby effect: %s", porto_standby_effect)
     logger.info(f"Porto Standby effect created with {len(porto_standby_effect['steps'])} steps over {porto_standby_effect['duration']} seconds")
     return porto_standby_effect
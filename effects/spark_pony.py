@@ -5,10 +5,12 @@ from effect_utils import hsv_to_rgb
 
 logger = logging.getLogger(__name__)
 
+DESCRIPTION = "Sparkling effect simulating a 'sparkle pony' with rapid color changes and brightness fluctuations"
+
 def create_spark_pony_effect():
     spark_pony_effect = {
         "duration": 10.0,
-        "description": "Sparkling effect simulating a 'sparkle pony' with rapid color changes and brightness fluctuations",
+        "description": DESCRIPTION,
         "steps": []
     }
     
@@ -43,7 +45,7 @@ def create_spark_pony_effect():
             }
         })
     
-    logger.debug(f"Created Spark Pony effect: {spark_pony_effect}")
+    logger.debug("Created Spark Pony effect: %s", spark_pony_effect)
     logger.info(f"Spark Pony effect created with {len(spark_pony_effect['steps'])} steps over {spark_pony_effect['duration']} seconds")
     return spark_pony_effect
 
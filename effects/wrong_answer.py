@@ -3,10 +3,12 @@ import math
 
 logger = logging.getLogger(__name__)
 
+DESCRIPTION = "Three quick red flashes to indicate a wrong answer"
+
 def create_wrong_answer_effect():
     wrong_answer_effect = {
         "duration": 1.5,
-        "description": "Three quick red flashes to indicate a wrong answer",
+        "description": DESCRIPTION,
         "steps": []
     }
     
@@ -17,6 +19,6 @@ def create_wrong_answer_effect():
             {"time": t + 0.25, "channels": {"total_dimming": 0, "r_dimming": 0, "g_dimming": 0, "b_dimming": 0, "w_dimming": 0, "total_strobe": 0, "function_selection": 0, "function_speed": 0}}
         ])
     
-    logger.debug(f"Created Wrong Answer effect: {wrong_answer_effect}")
+    logger.debug("Created Wrong Answer effect: %s", wrong_answer_effect)
     logger.info(f"Wrong Answer effect created with {len(wrong_answer_effect['steps'])} steps over {wrong_answer_effect['duration']} seconds")
     return wrong_answer_effect
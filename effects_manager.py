@@ -1,6 +1,10 @@
 import logging
 import asyncio
-from collections import defaultdict
+import inspect
+import threading
+import time
+import uuid
+from collections import OrderedDict, defaultdict
 from contextlib import AsyncExitStack
 from effects import (
     create_lightning_effect, create_police_lights_effect, create_gate_inspection_effect,
@@ -13,50 +17,139 @@ from effects import (
     create_monkey_business_effect
 )
 from theme_manager import ThemeManager
-from effect_utils import get_effect_step_values
-from interrupt_handler import InterruptHandler
+from frame_compositor import FrameCompositor
+from effect_utils import CompiledEffect
+from effect_cache import EffectCache
+from trigger_admission import TriggerAdmission
 
 logger = logging.getLogger(__name__)
 
+EFFECT_FACTORIES = {
+    "Lightning": create_lightning_effect,
+    "PoliceLights": create_police_lights_effect,
+    "GateInspection": create_gate_inspection_effect,
+    "GateGreeters": create_gate_greeters_effect,
+    "WrongAnswer": create_wrong_answer_effect,
+    "CorrectAnswer": create_correct_answer_effect,
+    "Entrance": create_entrance_effect,
+    "GuyLineClimb": create_guy_line_climb_effect,
+    "SparkPony": create_spark_pony_effect,
+    "PortoStandBy": create_porto_standby_effect,
+    "PortoHit": create_porto_hit_effect,
+    "CuddlePuddle": create_cuddle_puddle_effect,
+    "PhotoBomb-BG": create_photobomb_bg_effect,
+    "PhotoBomb-Spot": create_photobomb_spot_effect,
+    "DeepPlaya-BG": create_deep_playa_bg_effect,
+    "DeepPlaya-Hit": create_deep_playa_hit_effect,
+    "ImageEnhancement": create_image_enhancement_effect,
+    "BikeLockRoom": create_bike_lock_room_effect,
+    "NoFriendsMonday": create_no_friends_monday_effect,
+    "LightningStorm": create_lightning_storm_effect,
+    "PhotoBomb-Shot": create_photobomb_shot_effect,
+    "MonkeyBusiness": create_monkey_business_effect,
+}
+
+RUN_HISTORY = 256   # finished runs kept for /api/effect_runs
+
+
+class EffectRun:
+    """One trigger of an effect: an id callers can poll, and how the run ended
+    in each of its rooms — 'running', then 'completed', 'superseded' (a newer
+    effect took the room over), 'stopped' (/api/stop_effect) or 'failed'."""
+
+    def __init__(self, effect_name, rooms, where, trace=None):
+        self.run_id = uuid.uuid4().hex[:12]
+        self.effect_name = effect_name
+        self.trace = trace              # latency_trace.Trace of the trigger, or None
+        self.where = where              # "room Entrance" / "all rooms", for messages
+        self.rooms = dict.fromkeys(rooms, 'running')
+        self.state = 'running'
+        self.error = None
+        self.started = time.time()
+        self.finished = None
+        self.done = asyncio.Event()
+
+    def end_room(self, room, state, error=None):
+        self.rooms[room] = state
+        if error is not None and self.error is None:
+            self.error = error
+        if 'running' in self.rooms.values():
+            return
+        states = set(self.rooms.values())
+        self.state = ('failed' if 'failed' in states else
+                      'completed' if states == {'completed'} else
+                      'superseded' if 'superseded' in states else 'stopped')
+        self.finished = time.time()
+        self.done.set()
+
+    async def wait(self, timeout=None):
+        """Wait up to ``timeout`` seconds (None = until it ends); the run's state."""
+        try:
+            await asyncio.wait_for(self.done.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self.state
+
+    def message(self):
+        return {
+            'running': f"{self.effect_name} effect started in {self.where}",
+            'completed': f"{self.effect_name} effect applied to {self.where}",
+            'superseded': f"{self.effect_name} superseded by a newer effect in {self.where}",
+            'stopped': f"{self.effect_name} stopped in {self.where}",
+            'failed': self.error or f"{self.effect_name} failed in {self.where}",
+        }[self.state]
+
+    def to_dict(self):
+        end = self.finished if self.finished is not None else time.time()
+        return {
+            'run_id': self.run_id,
+            'trace_id': self.trace.trace_id if self.trace else None,
+            'effect_name': self.effect_name,
+            'state': self.state,
+            'rooms': dict(self.rooms),
+            'error': self.error,
+            'started': self.started,
+            'finished': self.finished,
+            'elapsed_s': round(end - self.started, 3),
+        }
+
 
 class EffectsManager:
-    def __init__(self, light_config_manager, dmx_state_manager, remote_host_manager, audio_manager):
+    def __init__(self, light_config_manager, dmx_state_manager, remote_host_manager, audio_manager,
+                 admission=None):
         self.light_config_manager = light_config_manager
         self.dmx_state_manager = dmx_state_manager
         self.remote_host_manager = remote_host_manager
         self.audio_manager = audio_manager
-        self.interrupt_handler = InterruptHandler(dmx_state_manager)
-        self.theme_manager = ThemeManager(dmx_state_manager, light_config_manager, self.interrupt_handler)
+        self.theme_manager = ThemeManager(dmx_state_manager, light_config_manager)
+        # The single render clock: effects below hand it timelines, it owns the frame
+        self.compositor = FrameCompositor(dmx_state_manager, self.theme_manager)
         self.effect_tasks = {}  # room -> asyncio.Task of the running effect
         self.room_locks = defaultdict(asyncio.Lock)  # serializes effect start/stop per room
-        self.effects = {
-            "Lightning": create_lightning_effect(),
-            "PoliceLights": create_police_lights_effect(),
-            "GateInspection": create_gate_inspection_effect(),
-            "GateGreeters": create_gate_greeters_effect(),
-            "WrongAnswer": create_wrong_answer_effect(),
-            "CorrectAnswer": create_correct_answer_effect(),
-            "Entrance": create_entrance_effect(),
-            "GuyLineClimb": create_guy_line_climb_effect(),
-            "SparkPony": create_spark_pony_effect(),
-            "PortoStandBy": create_porto_standby_effect(),
-            "PortoHit": create_porto_hit_effect(),
-            "CuddlePuddle": create_cuddle_puddle_effect(),
-            "PhotoBomb-BG": create_photobomb_bg_effect(),
-            "PhotoBomb-Spot": create_photobomb_spot_effect(),
-            "DeepPlaya-BG": create_deep_playa_bg_effect(),
-            "DeepPlaya-Hit": create_deep_playa_hit_effect(),
-            "ImageEnhancement": create_image_enhancement_effect(),
-            "BikeLockRoom": create_bike_lock_room_effect(),
-            "NoFriendsMonday": create_no_friends_monday_effect(),
-            "LightningStorm": create_lightning_storm_effect(),
-            "PhotoBomb-Shot": create_photobomb_shot_effect(),
-            "MonkeyBusiness": create_monkey_business_effect(),
-        }
+        self.runs = OrderedDict()  # run_id -> EffectRun, oldest first (RUN_HISTORY finished kept)
+        self._cancel_reasons = {}  # effect task -> 'superseded' / 'stopped', set before cancel()
+        self.room_runs = {}  # room -> the EffectRun last started there
+        self.room_timelines = {}  # room -> compositor Timeline of its running effect
+        # Per-room trigger policy: coalescing, re-trigger throttling, same-effect rule
+        self.admission = admission or TriggerAdmission()
+        # Effects are registered by name with metadata only (the DESCRIPTION
+        # each effect module declares) and built on first use (or by warm(),
+        # which main.py starts once the server is listening); a build comes
+        # from the on-disk cache when the effect's source is unchanged.
+        self.effect_factories = EFFECT_FACTORIES
+        self.effect_info = {name: {'description': getattr(inspect.getmodule(factory), 'DESCRIPTION',
+                                                          'No description available')}
+                            for name, factory in self.effect_factories.items()}
+        self._warm_task = None  # warm() once started by main.py (held: a bare task can be collected)
+        self.effects = {}  # effect_name -> effect dict, as built so far
+        self.effect_cache = EffectCache()
+        self._build_lock = threading.Lock()  # warm() builds on a worker thread
+        self.cache_hits = 0
+        self._compiled = {}  # effect_name -> (effect_data, CompiledEffect)
         # effect_name -> {'start': fn(room), 'cancel': fn(room)} side-channel for
         # non-lighting actions tied to an effect run (the Photo Bomb camera)
         self.effect_hooks = {}
-        logger.info(f"Initialized {len(self.effects)} effects")
+        logger.info(f"Registered {len(self.effect_factories)} effects (built on first use)")
 
     def register_effect_hooks(self, effect_name, on_start=None, on_cancel=None):
         """Attach callbacks to an effect's lifecycle. ``on_start`` fires when a
@@ -65,56 +158,187 @@ class EffectsManager:
         must be synchronous and quick — they run on the event loop."""
         self.effect_hooks[effect_name] = {'start': on_start, 'cancel': on_cancel}
 
+    def has_effect(self, effect_name):
+        return effect_name in self.effect_factories
+
     def get_effect(self, effect_name):
-        return self.effects.get(effect_name)
+        """The effect dict, built (or loaded from the cache) on first use."""
+        if effect_name not in self.effect_factories:
+            return None
+        effect_data = self.effects.get(effect_name)
+        return effect_data if effect_data is not None else self._build(effect_name)
+
+    async def load_effect(self, effect_name):
+        """get_effect() for the event loop: a first build runs off-loop."""
+        effect_data = self.effects.get(effect_name)
+        if effect_data is not None or effect_name not in self.effect_factories:
+            return effect_data
+        return await asyncio.to_thread(self._build, effect_name)
 
     def get_all_effects(self):
-        return self.effects
+        """Every effect as built so far; one not built yet is its metadata.
+        Never builds — this serves /api/effects_details."""
+        return {name: self.effects.get(name) or dict(info) for name, info in self.effect_info.items()}
 
     def get_effects_list(self):
-        return {name: data.get('description', 'No description available')
-                for name, data in self.effects.items()}
+        return {name: info['description'] for name, info in self.effect_info.items()}
 
-    def _room_fixture_ids(self, room):
-        lights = self.light_config_manager.get_room_layout().get(room, [])
-        return [(light['start_address'] - 1) // 8 for light in lights]
+    def start_warming(self):
+        """Start warm() on the running loop, once."""
+        if self._warm_task is None:
+            self._warm_task = asyncio.create_task(self.warm())
 
-    async def apply_effect_to_room(self, room, effect_name, effect_data=None):
+    async def warm(self):
+        """Build every effect not built yet, one at a time off the event loop.
+        Started once the server is listening, so it never delays /api/health."""
+        started = time.monotonic()
+        pending = [name for name in self.effect_factories if name not in self.effects]
+        hits = self.cache_hits
+        for effect_name in pending:
+            await asyncio.to_thread(self._build, effect_name)
+        logger.info(f"Effects warm in {time.monotonic() - started:.2f}s: {len(pending)} loaded, "
+                    f"{self.cache_hits - hits} of them from {self.effect_cache.cache_dir}")
+
+    def _build(self, effect_name):
+        """Load one effect from the cache, or run its factory, compile it and
+        cache that. Returns the effect dict."""
+        with self._build_lock:
+            effect_data = self.effects.get(effect_name)
+            if effect_data is not None:
+                return effect_data
+            factory = self.effect_factories[effect_name]
+            entry = self.effect_cache.load(effect_name, factory)
+            if entry is None:
+                effect_data = factory()
+                compiled = CompiledEffect(effect_data)
+                self.effect_cache.store(effect_name, factory, effect_data, compiled)
+            else:
+                effect_data, compiled = entry
+                self.cache_hits += 1
+            self._compiled[effect_name] = (effect_data, compiled)
+            self.effects[effect_name] = effect_data
+            return effect_data
+
+    def _compile(self, effect_name, effect_data):
+        """The effect's frame table: from the build (or the cache) for a
+        registered effect, shared by every run and every room of an
+        all-rooms run; compiled on the spot for ad-hoc effect_data."""
+        cached = self._compiled.get(effect_name)
+        if cached is None or cached[0] is not effect_data:
+            cached = self._compiled[effect_name] = (effect_data, CompiledEffect(effect_data))
+        return cached[1]
+
+    async def start_effect_in_room(self, room, effect_name, effect_data=None, trace=None):
+        """Take the room over and return ``(run, message)`` as soon as the new
+        effect task is registered — without waiting for it to finish. ``run``
+        is None (and ``message`` says why) if the effect can't start.
+        ``trace`` (latency_trace) is stamped along the run's way to the lights."""
         if effect_data is None:
-            effect_data = self.get_effect(effect_name)
+            effect_data = await self.load_effect(effect_name)
         if not effect_data:
-            return False, f"{effect_name} effect not found"
+            return None, f"{effect_name} effect not found"
 
-        fixture_ids = self._room_fixture_ids(room)
+        show = self.light_config_manager.show
+        fixture_ids = show.fixture_ids(room)
         if not fixture_ids:
-            return False, f"No lights found for room: {room}"
+            return None, f"No lights found for room: {room}"
+        room = show.room(room)  # one spelling for the room's lock and task slot
 
-        logger.info(f"Applying effect '{effect_name}' to room '{room}'")
         # The lock makes the takeover atomic: cancel whatever is running, then
-        # register the new task before anyone else can touch this room.
+        # register the new task before anyone else can touch this room. The
+        # admission decision sits inside it too, so a burst is judged in order.
         async with self.room_locks[room]:
-            await self._cancel_effect_in_room(room)
-            self.theme_manager.pause_theme_for_room(room)
-            effect_task = asyncio.create_task(self._run_effect(room, fixture_ids, effect_data, effect_name))
-            self.effect_tasks[room] = effect_task
+            now = time.monotonic()
+            current = self.room_runs.get(room)
+            if current is not None and current.rooms.get(room) != 'running':
+                current = None
+            outcome, folded = self.admission.decide(room, effect_name, current, now)
+            if folded is not None:
+                if outcome == 'extended' and room in self.room_timelines:
+                    self.compositor.restart(self.room_timelines[room])
+                if trace is not None:
+                    trace.started(outcome, room, effect_name, folded)
+                return folded, f"{effect_name} trigger {outcome} into run {folded.run_id} in room {room}"
+            logger.info(f"Applying effect '{effect_name}' to room '{room}'")
+            run = EffectRun(effect_name, [room], f"room {room}", trace)
+            if trace is not None:
+                trace.started(outcome, room, effect_name, run)
+            await self._cancel_effect_in_room(room, 'superseded')
+            # Registered only once its task exists: a caller cancelled during
+            # the await above leaves no run that never ends
+            self._start_task(room, fixture_ids, effect_data, effect_name, run)
+            self._register(run)
+            self.admission.admitted(room, effect_name, run, now)
+            if trace is not None:
+                trace.mark('takeover')
+        return run, run.message()
 
-        try:
-            await effect_task
-        except asyncio.CancelledError:
-            if effect_task.cancelled():
-                logger.info(f"Effect '{effect_name}' in room '{room}' was superseded")
-                return True, f"{effect_name} superseded by a newer effect in room {room}"
-            raise  # this request was cancelled; the effect task itself keeps running
-        except Exception as e:
-            logger.error(f"Error applying effect '{effect_name}' to room '{room}': {e}", exc_info=True)
-            return False, str(e)
-        return True, f"{effect_name} effect applied to room {room}"
+    async def apply_effect_to_room(self, room, effect_name, effect_data=None):
+        """start_effect_in_room, then wait for the run to end: ``(success,
+        message)``. Cancelling the caller leaves the effect running."""
+        run, message = await self.start_effect_in_room(room, effect_name, effect_data)
+        if run is None:
+            return False, message
+        return await self.wait_for_run(run)
+
+    async def wait_for_run(self, run):
+        await run.wait()
+        if run.state == 'superseded':
+            logger.info(f"Effect '{run.effect_name}' in {run.where} was superseded")
+        return run.state != 'failed', run.message()
+
+    def room_status(self):
+        """room -> the run last started there: effect, run id, how it stands
+        in the room and, while running, its progress 0..1 — None for a room
+        no effect has run in. Polled by the live state stream."""
+        now = time.monotonic()
+        status = {}
+        for room in self.light_config_manager.show.rooms:
+            run = self.room_runs.get(room)
+            if run is None:
+                status[room] = None
+                continue
+            state = run.rooms.get(room)
+            timeline = self.room_timelines.get(room)
+            progress = None
+            if state == 'running' and timeline is not None and timeline.duration > 0:
+                progress = round(min(1.0, max(0.0, (now - timeline.start) / timeline.duration)), 2)
+            status[room] = {'effect_name': run.effect_name, 'run_id': run.run_id, 'state': state,
+                            'progress': progress}
+        return status
+
+    def _register(self, run):
+        self.runs[run.run_id] = run
+        finished = [run_id for run_id, r in self.runs.items() if r.finished is not None]
+        for run_id in finished[:len(finished) - RUN_HISTORY]:
+            del self.runs[run_id]
+        return run
+
+    def _start_task(self, room, fixture_ids, effect_data, effect_name, run, send_audio=True):
+        """Create and register the room's effect task (room lock held)."""
+        task = asyncio.create_task(self._run_effect(room, fixture_ids, effect_data, effect_name, run,
+                                                    send_audio))
+        task.add_done_callback(lambda task: self._effect_task_done(task, room, run))
+        self.effect_tasks[room] = task
+        self.room_runs[room] = run
+
+    def _effect_task_done(self, task, room, run):
+        # A cancel can land before the task first runs, when its finally never
+        # executes — so the cancelled outcome is recorded here, for every task.
+        reason = self._cancel_reasons.pop(task, 'stopped')
+        if run.rooms.get(room) == 'running':
+            run.end_room(room, reason)
+        if run.rooms.get(room) != 'completed':
+            self.admission.forget(room, run)    # nothing left to coalesce or throttle into
 
-    async def _run_effect(self, room, fixture_ids, effect_data, effect_name, send_audio=True):
+    async def _run_effect(self, room, fixture_ids, effect_data, effect_name, run, send_audio=True):
         """The per-room effect task. Owns its cleanup: only the task still registered
-        for the room resumes the theme, so a takeover can never unbalance pause/resume."""
+        for the room unregisters itself, so a takeover can never drop the newer run.
+        Records a completed or crashed run (a crash is logged, not raised);
+        _effect_task_done records a cancelled one."""
         hooks = self.effect_hooks.get(effect_name) or {}
         completed = False
+        error = None
         try:
             if hooks.get('start'):
                 try:
@@ -123,9 +347,13 @@ class EffectsManager:
                     logger.error(f"Start hook for '{effect_name}' failed: {e}", exc_info=True)
             if send_audio:
                 await self.remote_host_manager.play_effect_audio(effect_name, rooms=[room],
-                                                                 audio_params=effect_data.get('audio', {}))
-            await self._run_lights(fixture_ids, effect_data)
+                                                                 audio_params=effect_data.get('audio', {}),
+                                                                 trace=run.trace)
+            await self._run_lights(room, fixture_ids, self._compile(effect_name, effect_data), run.trace)
             completed = True
+        except Exception as e:
+            error = str(e)
+            logger.error(f"Error applying effect '{effect_name}' to room '{room}': {e}", exc_info=True)
         finally:
             # A run that didn't complete was cancelled (supersede/stop) or crashed;
             # let the hook owner abort whatever it scheduled (pending photo capture).
@@ -136,20 +364,18 @@ class EffectsManager:
                     logger.error(f"Cancel hook for '{effect_name}' failed: {e}", exc_info=True)
             if self.effect_tasks.get(room) is asyncio.current_task():
                 del self.effect_tasks[room]
-                # Effects are transient: clear their last frame so it can't stay
-                # latched (several end on a bright hold — without this, a room
-                # with no theme stays stuck white after the effect completes).
-                for fixture_id in fixture_ids:
-                    self.dmx_state_manager.reset_fixture(fixture_id)
-                self.theme_manager.resume_theme_for_room(room)
-
-    async def _cancel_effect_in_room(self, room):
+            if completed or error:
+                run.end_room(room, 'completed' if completed else 'failed', error)
+
+    async def _cancel_effect_in_room(self, room, reason='stopped'):
         """Cancel and await the room's running effect, then stop its audio.
+        ``reason`` is what its run records ('superseded' / 'stopped').
         Returns True if an effect was cancelled. Caller must hold the room's lock."""
         effect_task = self.effect_tasks.pop(room, None)
         if not effect_task:
             return False
         logger.info(f"Stopping active effect in room: {room}")
+        self._cancel_reasons[effect_task] = reason
         effect_task.cancel()
         try:
             await effect_task
@@ -160,82 +386,90 @@ class EffectsManager:
         await self.remote_host_manager.send_audio_command(room, 'audio_stop')
         return True
 
-    async def _run_lights(self, fixture_ids, effect_data):
-        # One interpolator per fixture: each keeps its own monotonic step cursor
-        await asyncio.gather(*(
-            self.interrupt_handler.interrupt_fixture(fixture_id, effect_data['duration'],
-                                                     get_effect_step_values(effect_data))
-            for fixture_id in fixture_ids
-        ))
+    async def _run_lights(self, room, fixture_ids, compiled, trace=None):
+        # The compositor renders the timeline; this task only marks its
+        # lifetime (which an "extend" admission can push out by restarting
+        # the timeline). Releasing hands the fixtures back to the theme (or
+        # blacks them out once — several effects end on a bright hold that
+        # must not stay latched in a room with no theme).
+        timeline = self.compositor.play(fixture_ids, compiled, trace)
+        self.room_timelines[room] = timeline
+        try:
+            remaining = compiled.duration
+            while remaining > 0:
+                await asyncio.sleep(remaining)
+                remaining = timeline.start + timeline.duration - time.monotonic()
+        finally:
+            self.compositor.release(timeline)
+            if self.room_timelines.get(room) is timeline:
+                del self.room_timelines[room]
 
-    async def apply_effect_to_all_rooms(self, effect_name, audio_params=None):
-        effect_data = self.get_effect(effect_name)
+    async def start_effect_in_all_rooms(self, effect_name, audio_params=None, trace=None):
+        """The all-rooms takeover: ``(run, message)`` once every room's task is
+        registered, like start_effect_in_room."""
+        effect_data = await self.load_effect(effect_name)
         if not effect_data:
-            return False, f"{effect_name} effect not found"
+            return None, f"{effect_name} effect not found"
 
-        all_rooms = list(self.light_config_manager.get_room_layout().keys())
+        show = self.light_config_manager.show
+        all_rooms = show.rooms
         logger.info(f"Applying effect '{effect_name}' to all rooms")
+        lit_rooms = [room for room in all_rooms if show.room_fixtures[room]]
+        if not lit_rooms:
+            return None, "No lights found in any room"
+        run = EffectRun(effect_name, lit_rooms, "all rooms", trace)
+        if trace is not None:
+            trace.started('admitted', None, effect_name, run)
 
         # Hold every room's lock (fixed order, so no deadlock with single-room
         # triggers) while taking over: cancel running effects first so their
         # audio_stop commands can't kill the broadcast audio sent next.
-        tasks = []
         async with AsyncExitStack() as stack:
             for room in all_rooms:
                 await stack.enter_async_context(self.room_locks[room])
             for room in all_rooms:
-                await self._cancel_effect_in_room(room)
+                await self._cancel_effect_in_room(room, 'superseded')
             # One audio command per connected client covers every zone at once
             await self.remote_host_manager.play_effect_audio(
-                effect_name, audio_params=audio_params or effect_data.get('audio', {}))
-            for room in all_rooms:
-                fixture_ids = self._room_fixture_ids(room)
-                if not fixture_ids:
-                    continue
-                self.theme_manager.pause_theme_for_room(room)
-                task = asyncio.create_task(
-                    self._run_effect(room, fixture_ids, effect_data, effect_name, send_audio=False))
-                self.effect_tasks[room] = task
-                tasks.append(task)
-
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        errors = [r for r in results
-                  if isinstance(r, Exception) and not isinstance(r, asyncio.CancelledError)]
-        for error in errors:
-            logger.error(f"Error during all-rooms effect execution: {error}")
-        success = not errors
-        return success, f"{effect_name} effect {'triggered' if success else 'failed to trigger'} in all rooms"
+                effect_name, audio_params=audio_params or effect_data.get('audio', {}), trace=trace)
+            for room in run.rooms:
+                self._start_task(room, show.room_fixtures[room], effect_data, effect_name, run,
+                                 send_audio=False)
+            self._register(run)     # as in start_effect_in_room: only once its tasks exist
+            if trace is not None:
+                trace.mark('takeover')
+        return run, run.message()
+
+    async def apply_effect_to_all_rooms(self, effect_name, audio_params=None):
+        run, message = await self.start_effect_in_all_rooms(effect_name, audio_params)
+        if run is None:
+            return False, message
+        return await self.wait_for_run(run)
 
     async def stop_current_effect(self, room=None):
         """Stop the current effect in one room, or in all rooms if room is None."""
         if room is not None:
             await self.stop_effect_in_room(room)
             return
-        for r in list(self.light_config_manager.get_room_layout().keys()):
+        for r in self.light_config_manager.show.rooms:
             await self.stop_effect_in_room(r, send_audio=False)
         # One broadcast catches audio whose lighting already finished (long or
         # looping files leave no task to cancel): stop-all must mean silence.
         await self.remote_host_manager.send_audio_command(None, 'audio_stop')
 
     async def stop_effect_in_room(self, room, send_audio=True):
+        room = self.light_config_manager.show.room(room) or room
         async with self.room_locks[room]:
             stopped = await self._cancel_effect_in_room(room)
-            if stopped:
-                for fixture_id in self._room_fixture_ids(room):
-                    self.dmx_state_manager.reset_fixture(fixture_id)
-                self.theme_manager.resume_theme_for_room(room)
-            elif send_audio:
+            if not stopped and send_audio:
                 # Audio can outlive the lights; an explicit per-room stop must
                 # silence the room even with no lighting task left to cancel.
                 await self.remote_host_manager.send_audio_command(room, 'audio_stop')
 
     # --- Theme / music passthroughs used by the API ---
 
-    def set_master_brightness(self, brightness):
-        self.theme_manager.set_master_brightness(brightness)
-
-    async def set_current_theme_async(self, theme_name):
-        return await self.theme_manager.set_current_theme_async(theme_name)
+    async def set_current_theme_async(self, theme_name, crossfade=0.0):
+        return await self.theme_manager.set_current_theme_async(theme_name, crossfade)
 
     async def stop_current_theme_async(self):
         await self.theme_manager.stop_current_theme_async()
@@ -243,8 +477,8 @@ class EffectsManager:
     def stop_current_theme(self):
         self.theme_manager.stop_current_theme()
 
-    async def set_next_theme_async(self):
-        return await self.theme_manager.set_next_theme_async()
+    async def set_next_theme_async(self, crossfade=0.0):
+        return await self.theme_manager.set_next_theme_async(crossfade)
 
     def get_all_themes(self):
         return self.theme_manager.get_all_themes()
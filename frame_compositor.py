@@ -0,0 +1,205 @@
+"""The one render clock between effects/themes and the DMX universe.
+
+A single deadline-paced 44Hz thread on time.monotonic() — the same clock and
+period the output threads pace on — evaluates every active effect timeline
+and the theme for all fixtures in one pass, then publishes the whole frame
+with one update_fixtures() call (one lock, at most one generation bump).
+Effects and themes are data here, not tasks that write state: EffectsManager
+play()s a Timeline and awaits its duration, ThemeManager.render() hands back
+rows for the fixtures it covers. An all-rooms Lightning is one step lookup
+per room per tick, not 44 independent sleepers drifting on the event loop.
+
+Ownership is a token per fixture: play() hands the fixtures to the new
+timeline, so the run it superseded stops showing there at the next tick, and
+release() only drops fixtures the released timeline still holds — a takeover
+can never be undone by the replaced run finishing late. An effect beats the
+theme on every fixture it owns. A fixture the compositor stops covering (an
+effect ended with no theme, the theme stopped) is written to 0 once, so no
+final effect frame stays latched; fixtures it never covered are left alone
+(the control panel's channel test writes those directly).
+
+Cues: an effect step marked ``"flush": True`` (the Photo Bomb shutter
+flash, a lightning strike) is not left to the 44Hz grid. The render thread
+waits on an Event rather than sleeping, with its deadline pulled in to the
+next cue; at the cue it renders that step's exact row and calls
+dmx_state_manager.flush_now(), so the outputs put it on the wire within a
+millisecond or so of its scheduled time. The regular ticks keep their own
+schedule around it.
+"""
+import logging
+import threading
+import time
+
+from frame_stats import FrameStats
+
+logger = logging.getLogger(__name__)
+
+
+class Timeline:
+    """One effect run: the same pre-rendered row on every fixture it owns,
+    from ``start`` (monotonic) for the effect's duration."""
+
+    def __init__(self, fixture_ids, compiled, start, trace=None):
+        self.fixture_ids = tuple(fixture_ids)
+        self.trace = trace          # latency_trace.Trace until its first row is published
+        self.compiled = compiled    # effect_utils.CompiledEffect
+        self.duration = compiled.duration
+        self.start = start
+        self.cues = [(start + t, row) for t, row in compiled.cues]  # (monotonic, row), pending
+        self._cued = float('-inf')  # elapsed time of the last cue taken
+
+    def restart(self, now):
+        """Replay from the top at ``now`` (an extended run): end and cues move
+        out. Compositor lock held, so render() sees both moves or neither."""
+        self._cued = float('-inf')
+        self.cues = [(now + t, row) for t, row in self.compiled.cues]
+        self.start = now
+
+    def take_cue(self, now, late):
+        """The row of a cue that has come due at ``now`` (at most ``late``
+        seconds ago), or None; due cues are consumed either way."""
+        row = None
+        while self.cues and self.cues[0][0] <= now:
+            at, cue_row = self.cues.pop(0)
+            self._cued = at - self.start
+            row = cue_row if now - at <= late else row
+        return row
+
+    def values_at(self, now):
+        """The channel row at ``now``, or None once the run is over."""
+        elapsed = now - self.start
+        if elapsed >= self.duration:
+            return None
+        elapsed = max(0.0, elapsed)
+        if self._cued > elapsed - 1 / self.compiled.frame_rate:
+            # the frame grid could still land before the cue just shown
+            return self.compiled.values_at(elapsed)
+        return self.compiled.frame_at(elapsed)
+
+
+class FrameCompositor(threading.Thread):
+    FREQUENCY = 44          # render rate; matches the output threads
+
+    def __init__(self, dmx_state_manager, theme_manager):
+        super().__init__(daemon=True, name='frame-compositor')
+        self.dmx_state_manager = dmx_state_manager
+        self.theme_manager = theme_manager
+        self.running = True
+        self.lock = threading.Lock()    # guards owners and timeline restarts (event loop vs render thread)
+        self.owners = {}                # fixture_id -> Timeline holding it
+        self._covered = set()           # fixtures that had a row last tick
+        self.stalls = 0                 # ticks whose render overran the period
+        self.cue_flushes = 0            # out-of-band renders for cues
+        self.stats = FrameStats('compositor', self.FREQUENCY)
+        self._wake = threading.Event()  # play() with cues: re-plan the wait
+
+    def play(self, fixture_ids, compiled, trace=None):
+        """Start a compiled effect on ``fixture_ids`` now; returns its Timeline."""
+        timeline = Timeline(fixture_ids, compiled, time.monotonic(), trace)
+        with self.lock:
+            for fixture_id in timeline.fixture_ids:
+                if fixture_id in self.owners:
+                    logger.info(f"Taking over running effect on fixture {fixture_id}")
+                self.owners[fixture_id] = timeline
+        if timeline.cues:
+            self._wake.set()
+        return timeline
+
+    def restart(self, timeline):
+        """Replay a playing ``timeline`` from the top now."""
+        with self.lock:
+            timeline.restart(time.monotonic())
+        if timeline.cues:
+            self._wake.set()
+
+    def release(self, timeline):
+        """Drop the fixtures ``timeline`` still owns (finished, cancelled or
+        superseded — releasing a taken-over run is a no-op for those)."""
+        with self.lock:
+            for fixture_id in timeline.fixture_ids:
+                if self.owners.get(fixture_id) is timeline:
+                    del self.owners[fixture_id]
+
+    def run(self):
+        period = 1 / self.FREQUENCY
+        next_frame = time.monotonic()
+        while self.running:
+            started = time.monotonic()
+            try:
+                self.render(started)
+            except Exception as e:
+                logger.error(f"Frame render failed: {e}", exc_info=True)
+            finished = time.monotonic()
+            self.stats.tick(next_frame, started, finished)
+            if finished - started > period:
+                self.stalls += 1
+            next_frame += period
+            if next_frame <= time.monotonic():
+                next_frame = time.monotonic()  # fell behind; don't burst to catch up
+                continue
+            self._wait(next_frame)
+
+    def _wait(self, deadline):
+        """Wait for ``deadline`` (the next tick), rendering any cue that comes
+        due before it at its own time."""
+        while self.running:
+            self._wake.clear()
+            now = time.monotonic()
+            if now >= deadline:
+                return
+            cue = self._next_cue()
+            if cue <= now:
+                self._render_cue(now)
+                continue
+            self._wake.wait(min(deadline, cue) - now)
+
+    def _next_cue(self):
+        with self.lock:
+            return min((t.cues[0][0] for t in set(self.owners.values()) if t.cues), default=float('inf'))
+
+    def _render_cue(self, now):
+        try:
+            if self.render(now):
+                self.cue_flushes += 1
+        except Exception as e:
+            logger.error(f"Cue render failed: {e}", exc_info=True)
+
+    def render(self, now):
+        """Evaluate every layer at ``now`` and publish one frame; a frame
+        carrying a cue is flushed to the outputs at once. Returns whether it
+        did."""
+        frame = {}
+        rows = {}                       # Timeline -> its row this tick
+        traced = []                     # timelines publishing their first row
+        cued = False
+        # Under the lock: restart() moves a timeline's start and cues
+        # together, so a tick never pairs the new cues with the old start.
+        with self.lock:
+            for fixture_id, timeline in self.owners.items():
+                if timeline not in rows:
+                    row = timeline.take_cue(now, 1 / self.FREQUENCY)
+                    cued = cued or row is not None
+                    rows[timeline] = row if row is not None else timeline.values_at(now)
+                    if timeline.trace is not None and rows[timeline] is not None:
+                        traced.append(timeline)
+                if rows[timeline] is not None:
+                    frame[fixture_id] = rows[timeline]
+        for fixture_id, row in self.theme_manager.render(now, skip=frame.keys()).items():
+            frame.setdefault(fixture_id, row)
+        covered = set(frame)
+        blank = [0] * self.dmx_state_manager.channels_per_fixture
+        for fixture_id in self._covered - covered:
+            frame[fixture_id] = blank
+        self._covered = covered
+        if frame:
+            generation = self.dmx_state_manager.update_fixtures(list(frame), list(frame.values()))
+            for timeline in traced:
+                timeline.trace.written(generation, time.monotonic())
+                timeline.trace = None
+        if cued:
+            self.dmx_state_manager.flush_now()
+        return cued
+
+    def stop(self):
+        self.running = False
+        self._wake.set()
@@ -0,0 +1,176 @@
+"""Frame timing instrumentation for the 44Hz loops (the DMX sinks and the
+compositor): what rate they actually achieve, how late they wake, how long a
+tick takes, and what they put on the network.
+
+Each loop owns one FrameStats and is its only writer. Samples go into
+preallocated ring buffers (the last WINDOW seconds of ticks) with a plain
+index bump — no lock, nothing allocated per tick — and readers (the REST
+endpoint, the minute log) copy the rings and histogram the copy, so a slow
+reader can never stall a frame. Per tick:
+
+- duration — started to finished (FTDI: break + MAB + write on the wire)
+- jitter — how late the tick started against its deadline
+- missed deadline — finished after the NEXT tick's deadline
+- packets / bytes per node per second — from sent(), rolled into per-second
+  buckets as the seconds pass
+
+Once a minute a one-line summary (achieved fps, tick and jitter
+percentiles, misses, traffic) is logged, built on a throwaway thread rather
+than the loop's — the same heartbeat the projection renderer prints — so
+WiFi or CPU starvation on playa shows in the journal before anyone sees
+stutter. ``summary()`` is the full picture for
+/api/frame_stats.
+"""
+import logging
+import threading
+import time
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+WINDOW = 60                 # seconds of history the rings and rates cover
+LOG_INTERVAL = 60.0         # seconds between summary log lines
+HEALTH_WINDOW = 5.0         # seconds health() averages the tick rate over
+EDGES_MS = (0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 50, 100)   # histogram bucket upper bounds
+
+
+def _histogram(samples_ms):
+    counts = np.histogram(samples_ms, bins=(0,) + EDGES_MS + (np.inf,))[0]
+    return {'edges_ms': list(EDGES_MS), 'counts': counts.tolist()}
+
+
+def percentiles(samples_ms):
+    if not len(samples_ms):
+        return {'p50': None, 'p95': None, 'p99': None, 'max': None}
+    p50, p95, p99 = np.percentile(samples_ms, (50, 95, 99))
+    return {'p50': round(float(p50), 3), 'p95': round(float(p95), 3),
+            'p99': round(float(p99), 3), 'max': round(float(samples_ms.max()), 3)}
+
+
+class FrameStats:
+    def __init__(self, name, frequency):
+        self.name = name
+        self.frequency = frequency
+        self.period = 1 / frequency
+        size = int(WINDOW * frequency)
+        self._duration = np.zeros(size)     # seconds, ring
+        self._jitter = np.zeros(size)
+        self._started = np.zeros(size)      # monotonic start of each tick
+        self._missed = np.zeros(size, dtype=bool)
+        self._count = 0                     # ticks ever; ring index = count % size
+        self.missed_total = 0
+        self._current = {}                  # node -> [packets, bytes] this second
+        self._seconds = []                  # (second start, {node: (packets, bytes)}), last WINDOW
+        self._second_start = time.monotonic()
+        self._next_log = self._second_start + LOG_INTERVAL
+        self.extra = {}                     # name -> ring of other phase timings (seconds)
+        self._extra_count = {}
+
+    # -- writer side (the loop's own thread) ---------------------------------
+
+    def tick(self, deadline, started, finished):
+        """Record one scheduled tick: its deadline and when it ran."""
+        i = self._count % len(self._duration)
+        self._duration[i] = finished - started
+        self._jitter[i] = max(0.0, started - deadline)
+        self._started[i] = started
+        missed = finished > deadline + self.period
+        self._missed[i] = missed
+        self.missed_total += missed
+        self._count += 1
+        if finished - self._second_start >= 1.0:
+            self._roll(finished)
+        if finished >= self._next_log:
+            self._next_log = finished + LOG_INTERVAL
+            # summarizing takes ~1ms (more on the Pi) — not on the loop's time
+            threading.Thread(target=lambda: logger.info(self.log_line()), daemon=True,
+                             name=f'frame-stats-{self.name}').start()
+
+    def sent(self, node, nbytes, packets=1):
+        """Count traffic to ``node`` (a room, 'ftdi', 'artsync', ...)."""
+        counts = self._current.get(node)
+        if counts is None:
+            counts = self._current[node] = [0, 0]
+        counts[0] += packets
+        counts[1] += nbytes
+
+    def sample(self, name, seconds):
+        """Record another timing (e.g. the FTDI write alone) into its own ring."""
+        ring = self.extra.get(name)
+        if ring is None:
+            ring = self.extra[name] = np.zeros(len(self._duration))
+            self._extra_count[name] = 0
+        ring[self._extra_count[name] % len(ring)] = seconds
+        self._extra_count[name] += 1
+
+    def _roll(self, now):
+        # Seconds with no traffic still count as zero for the nodes seen
+        # before, so rates dip instead of holding their last value.
+        while now - self._second_start >= 1.0:
+            seen = {node for _, counts in self._seconds for node in counts}
+            counts = {node: (0, 0) for node in seen}
+            counts.update({node: tuple(c) for node, c in self._current.items()})
+            self._seconds.append((self._second_start, counts))
+            self._current = {}
+            self._second_start += 1.0
+        del self._seconds[:-WINDOW]
+
+    # -- reader side (API, log) ----------------------------------------------
+
+    def _window(self):
+        n = min(self._count, len(self._duration))
+        return (self._duration[:n].copy(), self._jitter[:n].copy(),
+                self._started[:n].copy(), self._missed[:n].copy())
+
+    def summary(self):
+        duration, jitter, started, missed = self._window()
+        span = started.max() - started.min() if len(started) > 1 else 0.0
+        seconds = list(self._seconds)
+        nodes = {}
+        for _, counts in seconds:
+            for node, (packets, nbytes) in counts.items():
+                entry = nodes.setdefault(node, {'packets': [], 'bytes': []})
+                entry['packets'].append(packets)
+                entry['bytes'].append(nbytes)
+        traffic = {node: {'packets_per_s': round(sum(v['packets']) / len(seconds), 2),
+                          'packets_per_s_max': max(v['packets']),
+                          'bytes_per_s': round(sum(v['bytes']) / len(seconds), 1)}
+                   for node, v in nodes.items()}
+        return {
+            'name': self.name,
+            'frequency': self.frequency,
+            'ticks': self._count,
+            'window_ticks': len(duration),
+            'fps': round((len(started) - 1) / span, 2) if span > 0 else None,
+            'tick_ms': percentiles(duration * 1000),
+            'tick_histogram': _histogram(duration * 1000),
+            'jitter_ms': percentiles(jitter * 1000),
+            'jitter_histogram': _histogram(jitter * 1000),
+            'missed_deadlines': int(missed.sum()),
+            'missed_total': self.missed_total,
+            'bytes_per_s': round(sum(t['bytes_per_s'] for t in traffic.values()), 1),
+            'nodes': traffic,
+            'extra_ms': {name: percentiles(ring[:min(self._extra_count.get(name, 0), len(ring))] * 1000)
+                         for name, ring in list(self.extra.items())},
+        }
+
+    def health(self):
+        """The cheap view the live state stream polls: the tick rate over the
+        last HEALTH_WINDOW seconds in whole fps (steady at 44, so it only
+        changes when the loop does), 'ok' / 'degraded' / 'stopped', and the
+        missed deadlines so far."""
+        started = self._started[:min(self._count, len(self._started))]
+        now = time.monotonic()
+        span = min(HEALTH_WINDOW, now - started.min()) if len(started) else 0.0
+        fps = round(np.count_nonzero(started > now - HEALTH_WINDOW) / span) if span > 0 else 0
+        status = 'ok' if fps >= 0.9 * self.frequency else 'degraded' if fps else 'stopped'
+        return {'status': status, 'fps': fps, 'missed_total': self.missed_total}
+
+    def log_line(self):
+        s = self.summary()
+        tick, jitter = s['tick_ms'], s['jitter_ms']
+        packets = sum(t['packets_per_s'] for t in s['nodes'].values())
+        return (f"Frame stats {self.name}: {s['fps']} fps, tick p50 {tick['p50']} / p99 {tick['p99']} / "
+                f"max {tick['max']} ms, late p99 {jitter['p99']} ms, {s['missed_deadlines']} missed, "
+                f"{packets:.0f} pkt/s {s['bytes_per_s'] / 1000:.1f} kB/s")
@@ -134,6 +134,24 @@ const api = {
         return response.json();
     },
 
+    // Live state push (GET /api/live, server-sent events): a full snapshot,
+    // then merge-patch deltas as rooms, theme, clients and outputs change.
+    // onState gets the whole, patched state each time. EventSource
+    // reconnects by itself and the server starts it over with a snapshot.
+    subscribeLiveState(onState) {
+        const source = new EventSource(`${API_BASE_URL}/live`);
+        let state = {};
+        source.addEventListener('snapshot', (event) => {
+            state = JSON.parse(event.data);
+            onState(state);
+        });
+        source.addEventListener('delta', (event) => {
+            state = applyMergePatch(state, JSON.parse(event.data));
+            onState(state);
+        });
+        return source;
+    },
+
     async terminateClient(ip) {
         const response = await fetch(`${API_BASE_URL}/terminate_client`, {
             method: 'POST',
@@ -145,3 +163,19 @@ const api = {
         return response.json();
     },
 };
+
+// RFC 7386: null removes a key, objects merge, anything else replaces.
+function applyMergePatch(target, patch) {
+    if (patch === null || typeof patch !== 'object' || Array.isArray(patch)) {
+        return patch;
+    }
+    const result = (target !== null && typeof target === 'object' && !Array.isArray(target)) ? { ...target } : {};
+    Object.entries(patch).forEach(([key, value]) => {
+        if (value === null) {
+            delete result[key];
+        } else {
+            result[key] = applyMergePatch(result[key], value);
+        }
+    });
+    return result;
+}
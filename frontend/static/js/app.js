@@ -152,6 +152,16 @@ document.addEventListener('DOMContentLoaded', async () => {
         return listHTML;
     }
 
+    // Live state: pushed by the server, so the panel never polls for it
+    const liveState = document.getElementById('live-state');
+    api.subscribeLiveState((state) => {
+        liveState.innerHTML = renderLiveState(state);
+        if (document.activeElement !== brightnessSlider && state.brightness !== undefined) {
+            brightnessSlider.value = state.brightness;
+            brightnessValue.textContent = `${Math.round(state.brightness * 100)}%`;
+        }
+    });
+
     // Kill Process Button
     const killProcessControl = createControl('Kill Process', async () => {
         if (confirm('Are you sure you want to kill the entire process? This will stop all operations.')) {
@@ -169,6 +179,31 @@ document.addEventListener('DOMContentLoaded', async () => {
 
 });
 
+function renderLiveState(state) {
+    const rooms = Object.entries(state.rooms || {}).map(([room, run]) => ({
+        room,
+        effect: run ? run.effect_name : '',
+        state: run ? run.state : '',
+        progress: run && run.progress !== null ? `${Math.round(run.progress * 100)}%` : '',
+    }));
+    const clients = (state.clients || []).map(client => `${client.name} (${client.rooms.join(', ')})`);
+    const artnet = Object.entries((state.nodes || {}).artnet || {})
+        .map(([room, node]) => `${room}: ${node.alive === null ? '?' : node.alive ? 'up' : 'DOWN'}`);
+    const audio = Object.entries((state.nodes || {}).audio || {})
+        .map(([room, connected]) => `${room}: ${connected ? 'up' : 'down'}`);
+    const outputs = Object.entries(state.outputs || {})
+        .map(([name, output]) => `${name}: ${output.status}${output.fps !== undefined ? ` ${output.fps}fps` : ''}`);
+    return `
+        <div class="api-control">
+            <h2>Live</h2>
+            <p>Theme: ${state.theme || 'none'} · Music: ${state.music ? 'on' : 'off'} · Outputs: ${outputs.join(', ') || 'none'}</p>
+            <p>Units: ${clients.join(', ') || 'none'}</p>
+            <p>Art-Net nodes: ${artnet.join(', ') || 'none'}${audio.length ? ` · Audio nodes: ${audio.join(', ')}` : ''}</p>
+            ${createTable(rooms, ['room', 'effect', 'state', 'progress'])}
+        </div>
+    `;
+}
+
 function createControl(title, action, getCurlCommand) {
     const control = document.createElement('div');
     control.className = 'api-control';
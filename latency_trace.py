@@ -0,0 +1,166 @@
+"""Trigger-to-photon latency tracing.
+
+Every trigger that can start an effect — POST /api/run_effect or
+/api/run_effect_all_rooms, a UDP trigger datagram — gets a Trace the moment
+it arrives: an id and a monotonic timestamp. The trace rides on the
+EffectRun and the compositor Timeline it starts, and each stage stamps it
+once, the first time it gets there:
+
+- ``takeover`` — admission passed, the old effect cancelled, the new task
+  registered
+- ``first_write`` — the compositor published the first frame carrying the
+  effect's row (the state generation it landed in is remembered)
+- ``first_tick`` — the first output tick (FTDI, Art-Net, the sim's sink) that
+  read the state at or past that generation
+- ``artnet:<node>`` — each Art-Net node of the trace's room(s), on the first
+  packet it was sent with that frame
+- ``audio_ws:<unit>`` — the play_effect_audio WebSocket message went out
+- ``audio_node:<room>`` — a speaker node's ``play_cue`` api call returned
+
+Each stamp is also a sample, in milliseconds since arrival, kept in a ring
+of the last SAMPLES per stage (``artnet:*`` pooled as ``artnet``, and so
+on) per room, per effect and per trigger source; summary() gives their
+percentiles (/api/latency) plus the last RECENT traces stage by stage.
+Triggers that admission folded into another run are counted by outcome and
+stamp nothing. The output loops call frame_sent() every tick; with no trace
+waiting on a frame that is one attribute check. With the outputs in their
+own process (output_process.py) nothing reports ticks back, so traces stop
+at ``first_write``.
+"""
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict, deque
+
+import numpy as np
+
+from frame_stats import percentiles
+
+SAMPLES = 256           # per stage per room / effect / source
+RECENT = 64             # traces kept whole for the API
+PENDING_TIMEOUT = 2.0   # seconds a written trace keeps collecting output stamps
+STAGES = ('takeover', 'first_write', 'first_tick', 'artnet', 'audio_ws', 'audio_node')
+ALL_ROOMS = 'all rooms'
+
+
+class Trace:
+    """One trigger, arrival to light and sound. Stamps go through the
+    tracer, which also owns the locking."""
+
+    def __init__(self, tracer, source):
+        self.tracer = tracer
+        self.trace_id = uuid.uuid4().hex[:12]
+        self.source = source            # 'rest' / 'udp'
+        self.arrived = time.monotonic()
+        self.room = None                # stats key: the room, or ALL_ROOMS; None until started
+        self.nodes = None               # casefolded rooms whose Art-Net nodes count; None = all
+        self.effect_name = None
+        self.outcome = None             # 'admitted' or the admission outcome it folded on
+        self.run_id = None
+        self.marks = {}                 # stage -> monotonic
+        self.generation = None          # state generation of the first write
+        self.expires = None
+
+    def started(self, outcome, room, effect_name, run):
+        self.tracer.started(self, outcome, room, effect_name, run)
+
+    def mark(self, stage, when=None):
+        self.tracer.mark(self, stage, when)
+
+    def written(self, generation, when):
+        self.tracer.written(self, generation, when)
+
+    def to_dict(self):
+        return {
+            'trace_id': self.trace_id,
+            'source': self.source,
+            'room': self.room,
+            'effect_name': self.effect_name,
+            'outcome': self.outcome,
+            'run_id': self.run_id,
+            'stages_ms': {stage: round((when - self.arrived) * 1000, 2)
+                          for stage, when in sorted(self.marks.items(), key=lambda item: item[1])},
+        }
+
+
+class LatencyTracer:
+    def __init__(self):
+        self.lock = threading.Lock()    # event loop, render thread and output threads all stamp
+        self.samples = {group: defaultdict(dict) for group in ('rooms', 'effects', 'sources')}
+        self.outcomes = defaultdict(Counter)    # source -> admission outcome -> triggers
+        self.recent = deque(maxlen=RECENT)
+        self.pending = []               # written traces still collecting output stamps
+
+    def begin(self, source):
+        """Stamp a trigger's arrival."""
+        return Trace(self, source)
+
+    def started(self, trace, outcome, room, effect_name, run):
+        """The trigger reached EffectsManager: ``outcome`` is 'admitted' or
+        the admission outcome it folded on (then it stamps nothing more);
+        ``room`` None for an all-rooms run."""
+        with self.lock:
+            trace.room = room or ALL_ROOMS
+            trace.nodes = None if room is None else {room.casefold()}
+            trace.effect_name = effect_name
+            trace.outcome = outcome
+            trace.run_id = run.run_id
+            self.outcomes[trace.source][outcome] += 1
+            self.recent.append(trace)
+
+    def mark(self, trace, stage, when=None):
+        when = time.monotonic() if when is None else when
+        with self.lock:
+            if trace.outcome != 'admitted' or stage in trace.marks:
+                return
+            trace.marks[stage] = when
+            sample = (when - trace.arrived) * 1000
+            stage = stage.split(':', 1)[0]
+            for group, key in (('rooms', trace.room), ('effects', trace.effect_name),
+                               ('sources', trace.source)):
+                rings = self.samples[group][key]
+                ring = rings.get(stage)
+                if ring is None:
+                    ring = rings[stage] = deque(maxlen=SAMPLES)
+                ring.append(sample)
+
+    def written(self, trace, generation, when):
+        """The compositor published the trace's first row in ``generation``."""
+        self.mark(trace, 'first_write', when)
+        with self.lock:
+            if trace.generation is None:    # an all-rooms run writes once per room timeline
+                trace.generation = generation
+                trace.expires = when + PENDING_TIMEOUT
+                self.pending = [t for t in self.pending if t.expires > when] + [trace]
+
+    def frame_sent(self, generation, when, nodes=()):
+        """An output tick that read the state at ``generation`` put its
+        frame on the wire at ``when``; ``nodes`` are the rooms of the
+        Art-Net nodes it sent to."""
+        if not self.pending:
+            return
+        with self.lock:
+            pending = list(self.pending)
+        for trace in pending:
+            if generation < trace.generation:
+                continue
+            self.mark(trace, 'first_tick', when)
+            for node in nodes:
+                if trace.nodes is None or node.casefold() in trace.nodes:
+                    self.mark(trace, f'artnet:{node}', when)
+        with self.lock:
+            self.pending = [t for t in self.pending if t.expires > when]
+
+    def summary(self):
+        with self.lock:
+            samples = {group: {key: {stage: np.array(ring) for stage, ring in rings.items()}
+                               for key, rings in keyed.items()}
+                       for group, keyed in self.samples.items()}
+            recent = [trace.to_dict() for trace in reversed(self.recent)]
+            outcomes = {source: dict(counts) for source, counts in self.outcomes.items()}
+        return dict(
+            {group: {key: {stage: dict(percentiles(rings[stage]), count=len(rings[stage]))
+                           for stage in STAGES if stage in rings}
+                     for key, rings in keyed.items()}
+             for group, keyed in samples.items()},
+            stages=list(STAGES), outcomes=outcomes, recent=recent)
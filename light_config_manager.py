@@ -1,13 +1,142 @@
 import json
 import logging
+import threading
+from types import MappingProxyType
+
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
+UNIVERSE_SIZE = 512     # channels per DMX universe
+
+
+class ShowModel:
+    """light_config.json compiled once into the lookups the hot paths need.
+
+    Immutable after construction: tuples, frozensets, read-only mappings and
+    arrays. LightConfigManager swaps a whole new model in on reload, so a
+    reader that fetches ``light_config_manager.show`` once per operation sees
+    one consistent config, never half of an old one and half of a new one.
+
+    Room names are matched case-insensitively everywhere (``room()``); the
+    canonical spelling is the one in light_config.json. Fixture ids are
+    positions in room-layout order, and each fixture's state slot is its
+    patch — ``start_address`` in ``universe`` (optional, default 0) — and
+    its model's real footprint (highest channel offset + 1), so fixtures of
+    any channel count pack at whatever addresses they're dialed to. The
+    state is consecutive 512-channel universes; ``universes`` is how many
+    the patch reaches.
+    """
+
+    def __init__(self, config, channels_per_fixture=8):
+        self.config = config
+        self.channels_per_fixture = channels_per_fixture
+        models = config.get('light_models', {})
+        self.model_channels = MappingProxyType({
+            model: MappingProxyType(dict(spec.get('channels', {}))) for model, spec in models.items()})
+        fixtures = []           # (fixture_id, room index, model) in room-layout order
+        slots = []              # fixture_id -> (absolute channel index, footprint)
+        room_fixtures = {}
+        windows = {}
+        for room_index, (room, lights) in enumerate(config.get('room_layout', {}).items()):
+            ids, window = [], {}    # window: universe -> ([fixture ids], end within it)
+            for light in lights:
+                fixture_id = len(fixtures)
+                offsets = self.model_channels.get(light['model'], {}).values()
+                footprint = max(offsets) + 1 if offsets else channels_per_fixture
+                offset = light.get('universe', 0) * UNIVERSE_SIZE + light['start_address'] - 1
+                # a fixture patched across a universe boundary is in both
+                for universe in range(offset // UNIVERSE_SIZE, (offset + footprint - 1) // UNIVERSE_SIZE + 1):
+                    base = universe * UNIVERSE_SIZE
+                    universe_ids, end = window.get(universe, ([], 0))
+                    universe_ids.append(fixture_id)
+                    window[universe] = (universe_ids, max(end, min(offset + footprint - base, UNIVERSE_SIZE)))
+                ids.append(fixture_id)
+                fixtures.append((fixture_id, room_index, light['model']))
+                slots.append((offset, footprint))
+            room_fixtures[room] = tuple(ids)
+            if ids:
+                windows[room] = MappingProxyType({universe: (frozenset(universe_ids), end)
+                                                  for universe, (universe_ids, end) in sorted(window.items())})
+        self.rooms = tuple(room_fixtures)
+        self.room_fixtures = MappingProxyType(room_fixtures)
+        # room -> {universe: (fixture ids, last channel it uses there)}: the
+        # universe slices a room's node needs (a 6ch U'King stops at 6, not
+        # the 8 slot)
+        self.windows = MappingProxyType(windows)
+        self.fixtures = tuple(fixtures)
+        self.slots = tuple(slots)
+        self.frame_size = max((offset + width for offset, width in slots), default=0)
+        self.universes = max(1, -(-self.frame_size // UNIVERSE_SIZE))
+        self._check_patch(config)
+        self.fixture_models = MappingProxyType({fixture_id: model for fixture_id, _, model in fixtures})
+        self._room_keys = MappingProxyType({room.casefold(): room for room in self.rooms})
+        self._channel_index = {}
+        self._channel_index_lock = threading.Lock()
+
+    def _check_patch(self, config):
+        lights = [light for room_lights in config.get('room_layout', {}).values() for light in room_lights]
+        previous_end, previous = 0, None
+        for fixture_id in sorted(range(len(self.slots)), key=self.slots.__getitem__):
+            offset, width = self.slots[fixture_id]
+            if offset < previous_end:
+                logger.warning(f"Fixture @{lights[fixture_id]['start_address']} ({lights[fixture_id]['model']}) "
+                               f"overlaps the one @{lights[previous]['start_address']} — they share channels")
+            if offset + width > previous_end:
+                previous_end, previous = offset + width, fixture_id
+
+    @classmethod
+    def load(cls, path, channels_per_fixture=8):
+        with open(path) as f:
+            return cls(json.load(f), channels_per_fixture)
+
+    def room(self, name):
+        """The canonical room name for ``name`` in any case, or None."""
+        return self._room_keys.get(name.casefold()) if name else None
+
+    def fixture_ids(self, room):
+        """The fixture ids of ``room`` (any case); empty for an unknown room."""
+        return self.room_fixtures.get(self.room(room), ())
+
+    def fixture_channels(self, fixture_id):
+        """channel name -> slot offset for the fixture's model."""
+        return self.model_channels.get(self.fixture_models.get(fixture_id), {})
+
+    def channel_index(self, channels):
+        """Scatter indices for writing per-room ``channels`` (a sequence of
+        channel names) onto every fixture's slots in one fancy assignment:
+        (row, slot, room index, column) int arrays, one entry per fixture
+        channel its model has. ``row`` indexes ``fixtures``; ``column``
+        indexes ``channels``. Built once per channel list."""
+        key = tuple(channels)
+        index = self._channel_index.get(key)
+        if index is None:
+            rows, slots, rooms, columns = [], [], [], []
+            for row, (_, room_index, model) in enumerate(self.fixtures):
+                model_channels = self.model_channels.get(model, {})
+                for column, channel in enumerate(key):
+                    if channel in model_channels:
+                        rows.append(row)
+                        slots.append(model_channels[channel])
+                        rooms.append(room_index)
+                        columns.append(column)
+            index = tuple(np.array(values, dtype=int) for values in (rows, slots, rooms, columns))
+            for array in index:
+                array.flags.writeable = False
+            with self._channel_index_lock:
+                index = self._channel_index.setdefault(key, index)
+        return index
+
 
 class LightConfigManager:
-    def __init__(self, config_file='light_config.json'):
+    def __init__(self, config_file='light_config.json', channels_per_fixture=8):
         self.config_file = config_file
-        self.light_configs = self.load_config()
+        self.channels_per_fixture = channels_per_fixture
+        self.show = ShowModel(self.load_config(), channels_per_fixture)
+
+    @property
+    def light_configs(self):
+        return self.show.config
 
     def load_config(self):
         try:
@@ -19,6 +148,30 @@ class LightConfigManager:
             logger.error(f"Error loading {self.config_file}: {e}")
             return {'light_models': {}, 'room_layout': {}}
 
+    def reload(self):
+        """Re-read the config file and swap the new ShowModel in whole
+        (POST /api/reload_light_config). What can change live is what
+        readers fetch per operation — the models' channel maps, dimmer
+        curves and caps, which model each fixture is. The DMX state and the
+        Art-Net windows (in the output process too) are sized from the patch
+        and the rooms at startup, so a file that changes either, or doesn't
+        load, leaves the current model in place: ValueError saying why."""
+        try:
+            show = ShowModel.load(self.config_file, self.channels_per_fixture)
+        except (OSError, ValueError) as e:
+            reason = f"{self.config_file} doesn't load: {e}"
+        else:
+            if show.slots != self.show.slots:
+                reason = f"{self.config_file} changes the fixture patch — restart to apply"
+            elif show.windows != self.show.windows:
+                reason = f"{self.config_file} changes the rooms or their fixtures — restart to apply"
+            else:
+                self.show = show
+                logger.info(f"Light configuration reloaded from {self.config_file}")
+                return show
+        logger.error(f"{reason}; keeping the current config")
+        raise ValueError(reason)
+
     def get_light_config(self, model):
         config = self.light_configs.get('light_models', {}).get(model, {})
         if not config:
@@ -0,0 +1,116 @@
+"""Push-based live state for the control panel (GET /api/live, server-sent events).
+
+The panel used to fetch /rooms, /connected_clients and friends on demand and
+never heard when an effect started, a room was superseded, the theme
+changed or a unit dropped. LiveState runs one publisher task while anyone is
+subscribed: every TICK it collects the whole live state (one dict — main.py
+builds it), diffs it against what it last published and, if anything
+changed, encodes the difference ONCE as a JSON merge patch (RFC 7386:
+changed keys only, a removed key as null, lists replaced whole) and hands
+the same bytes to every subscriber. Changes within a tick coalesce into one
+event; a static maze sends nothing but a keepalive comment every KEEPALIVE
+seconds, and with no panel open nothing is collected at all.
+
+A new subscriber first gets the full state as a ``snapshot`` event (encoded
+once per change, shared by everyone who joins in between), then ``delta``
+events. A subscriber too slow to drain QUEUE_SIZE events gets its backlog
+replaced by one fresh snapshot instead of growing it. Event ids are the
+publish sequence, so a reconnecting EventSource just starts over from a
+snapshot.
+"""
+import asyncio
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+TICK = 0.25             # seconds between collections while subscribed
+KEEPALIVE = 15.0        # idle seconds before a keepalive comment (proxies, dead-peer detection)
+QUEUE_SIZE = 32         # events a subscriber may fall behind before a resync
+_MISSING = object()
+
+
+def merge_patch(old, new):
+    """The RFC 7386 patch taking dict ``old`` to dict ``new``; {} if equal."""
+    patch = {key: None for key in old.keys() - new.keys()}
+    for key, value in new.items():
+        before = old.get(key, _MISSING)
+        if isinstance(value, dict) and isinstance(before, dict):
+            nested = merge_patch(before, value)
+            if nested:
+                patch[key] = nested
+        elif before is _MISSING or before != value:
+            patch[key] = value
+    return patch
+
+
+class LiveState:
+    def __init__(self, collect, tick=TICK):
+        self.collect = collect          # async () -> the live state dict
+        self.tick = tick
+        self.subscribers = set()        # asyncio.Queue of encoded events, one per client
+        self.state = None               # as last published; None while nobody listens
+        self.seq = 0
+        self.encodes = 0                # events serialized, however many subscribers
+        self._snapshot = None           # self.state encoded as a snapshot event, on demand
+        self._task = None
+
+    async def subscribe(self):
+        """One client's stream of encoded SSE events (an async generator:
+        closing it unsubscribes)."""
+        queue = asyncio.Queue(QUEUE_SIZE)
+        if self.state is None:
+            self._set(await self.collect())
+        self.subscribers.add(queue)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._publish())
+        try:
+            yield self._snapshot_event()
+            while True:
+                try:
+                    yield await asyncio.wait_for(queue.get(), KEEPALIVE)
+                except asyncio.TimeoutError:
+                    yield b': keepalive\n\n'
+        finally:
+            self.subscribers.discard(queue)
+
+    async def _publish(self):
+        while self.subscribers:
+            await asyncio.sleep(self.tick)
+            try:
+                state = await self.collect()
+            except Exception as e:
+                logger.error(f"Live state collection failed: {e}", exc_info=True)
+                continue
+            patch = merge_patch(self.state, state)
+            if not patch:
+                continue
+            self._set(state)
+            event = self._event('delta', patch)
+            for queue in list(self.subscribers):
+                try:
+                    queue.put_nowait(event)
+                except asyncio.QueueFull:
+                    while not queue.empty():
+                        queue.get_nowait()
+                    queue.put_nowait(self._snapshot_event())
+        self.state = None               # stale from here on; the next subscriber collects afresh
+
+    def _set(self, state):
+        self.state = state
+        self.seq += 1
+        self._snapshot = None
+
+    def _snapshot_event(self):
+        if self._snapshot is None:
+            self._snapshot = self._event('snapshot', self.state)
+        return self._snapshot
+
+    def _event(self, kind, payload):
+        self.encodes += 1
+        data = json.dumps(payload, separators=(',', ':'))
+        return f"event: {kind}\nid: {self.seq}\ndata: {data}\n\n".encode()
+
+    def summary(self):
+        return {'subscribers': len(self.subscribers), 'seq': self.seq, 'encodes': self.encodes,
+                'tick': self.tick}
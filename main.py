@@ -1,5 +1,6 @@
 import os
 import sys
+import atexit
 import time
 import json
 import logging
@@ -13,7 +14,14 @@ import dmx_interface
 from dmx_interface import DMXOutputManager
 from artnet_output_manager import ArtNetOutputManager
 from light_config_manager import LightConfigManager
+from output_stage import OutputStage
+from output_process import OutputProcess
+from trigger_admission import TriggerAdmission
 from effects_manager import EffectsManager
+from theme_manager import MAX_CROSSFADE
+from udp_triggers import UDPTriggerServer
+from latency_trace import LatencyTracer
+from live_state import LiveState
 from remote_host_manager import RemoteHostManager
 from audio_manager import AudioManager
 from node_audio_manager import NodeAudioManager
@@ -22,11 +30,12 @@ from effects.photobomb_shot import SHUTTER_OFFSET
 
 # Configuration
 DEBUG = os.environ.get('DEBUG', 'False').lower() == 'true'
-# ids 0-19: the 20 maze pars/spots (ch 1-160); ids 20-43: the 24 Camp Sign
-# letter/logo zones (ch 161-352, ESP32 bridge out front). This one constant
-# sizes the DMX state, the FTDI frame, the Art-Net payload the room nodes
-# receive (zero-padded to 512 on the wire) and the sim's virtual universe.
-NUM_FIXTURES = 44
+# Row width of the effect/theme engine (EFFECT_CHANNELS). The universe itself
+# is laid out from light_config.json: every fixture's patched address and its
+# model's real footprint (ShowModel.slots) size the DMX state, the FTDI frame,
+# the Art-Net payload the room nodes receive and the sim's virtual universe —
+# today the 20 maze pars/spots (ch 1-160) and the 24 Camp Sign letter/logo
+# zones (ch 161-350, ESP32 bridge out front).
 CHANNELS_PER_FIXTURE = 8
 
 # Set up logging
@@ -104,7 +113,10 @@ async def handle_trigger_event(ws, data):
 
 # --- Component initialization ---
 
-dmx_state_manager = DMXStateManager(NUM_FIXTURES, CHANNELS_PER_FIXTURE)
+light_config = LightConfigManager(channels_per_fixture=CHANNELS_PER_FIXTURE)
+# Masters, dimmer curves and channel caps, applied to every output frame
+output_stage = OutputStage(light_config.show)
+dmx_state_manager = DMXStateManager.from_show(light_config.show, output_stage)
 
 # Two DMX sinks, config-gated by dmx_nodes.json (wiring-guides/dmx-over-wifi.md):
 # Art-Net unicast to the room nodes (the plan of record — cut over 2026-07-22)
@@ -113,29 +125,55 @@ dmx_state_manager = DMXStateManager(NUM_FIXTURES, CHANNELS_PER_FIXTURE)
 # gracefully when Art-Net nodes are enabled; with NO output at all it still
 # raises — a maze with zero DMX outputs should crash-loop visibly, not run
 # dark. The sim's virtual sink (VIRTUAL flag) is the sim's frame feed, not
-# FTDI hardware, so the ftdi flag never gates it.
-artnet_output_manager = ArtNetOutputManager.from_config(dmx_state_manager)
+# FTDI hardware, so the ftdi flag never gates it. With "output_process"
+# enabled both sinks run in their own process instead (output_process.py),
+# reading the frame from shared memory; the sim always keeps them in-process.
 try:
     with open('dmx_nodes.json') as _f:
-        _ftdi_wanted = json.load(_f).get('ftdi', True)
+        _nodes_cfg = json.load(_f)
 except FileNotFoundError:
-    _ftdi_wanted = True
+    _nodes_cfg = {}
+_ftdi_wanted = _nodes_cfg.get('ftdi', True)
+_process_cfg = _nodes_cfg.get('output_process', {})
+_virtual = getattr(dmx_interface, 'VIRTUAL', False)
+artnet_output_manager = None
 dmx_output_manager = None
-if _ftdi_wanted or getattr(dmx_interface, 'VIRTUAL', False):
-    try:
-        dmx_output_manager = DMXOutputManager(dmx_state_manager)
-    except Exception as e:
-        if artnet_output_manager is None:
-            raise
-        logger.error(f"FTDI output unavailable ({e}) — continuing on Art-Net nodes only")
-elif artnet_output_manager is None:
-    log_and_exit("dmx_nodes.json disables FTDI but enables no Art-Net nodes — no DMX output")
+output_process = None
+if _process_cfg.get('enabled') and _virtual:
+    logger.info("dmx_nodes.json output_process ignored in the sim — outputs stay in-process")
+if _process_cfg.get('enabled') and not _virtual:
+    if not _ftdi_wanted and not any(node.get('enabled') for node in _nodes_cfg.get('nodes', {}).values()):
+        log_and_exit("dmx_nodes.json disables FTDI but enables no Art-Net nodes — no DMX output")
+    output_process = OutputProcess(dmx_state_manager, _process_cfg, ftdi=_ftdi_wanted)
+    atexit.register(output_process.stop)
+else:
+    artnet_output_manager = ArtNetOutputManager.from_config(dmx_state_manager)
+    if _ftdi_wanted or _virtual:
+        try:
+            dmx_output_manager = DMXOutputManager(dmx_state_manager)
+        except Exception as e:
+            if artnet_output_manager is None:
+                raise
+            logger.error(f"FTDI output unavailable ({e}) — continuing on Art-Net nodes only")
+    elif artnet_output_manager is None:
+        log_and_exit("dmx_nodes.json disables FTDI but enables no Art-Net nodes — no DMX output")
+
+# Trigger-to-photon tracing: triggers are stamped at arrival, the output
+# sinks stamp the ticks that carry their first frame (not in output-process
+# mode, where the sinks live in the child)
+latency_tracer = LatencyTracer()
+for _sink in (dmx_output_manager, artnet_output_manager):
+    if _sink is not None:
+        _sink.tracer = latency_tracer
 
-light_config = LightConfigManager()
 audio_manager = AudioManager()
 node_audio_manager = NodeAudioManager(audio_manager=audio_manager)
 remote_host_manager = RemoteHostManager(audio_manager=audio_manager, node_audio=node_audio_manager)
-effects_manager = EffectsManager(light_config, dmx_state_manager, remote_host_manager, audio_manager)
+# Sensor storms: per-room coalescing / throttling from triggers.json "admission"
+effects_manager = EffectsManager(light_config, dmx_state_manager, remote_host_manager, audio_manager,
+                                 TriggerAdmission.from_config())
+# Room nodes can trigger over one UDP datagram (:8766) instead of HTTP
+udp_trigger_server = UDPTriggerServer.from_config(effects_manager, tracer=latency_tracer)
 camera_manager = CameraManager()
 
 # Photo Bomb camera: every PhotoBomb-Shot run schedules a webcam capture at the
@@ -147,11 +185,48 @@ effects_manager.register_effect_hooks(
     on_cancel=lambda room: camera_manager.cancel_pending(),
 )
 
+
+async def _collect_live_state():
+    """Everything the control panel shows live, as one dict (live_state.py
+    diffs it per tick and pushes the changes to every open panel)."""
+    if output_process is not None:
+        node_table = await asyncio.to_thread(output_process.node_table)
+    elif artnet_output_manager is not None:
+        node_table = artnet_output_manager.node_table()
+    else:
+        node_table = {'nodes': []}
+    loops = [effects_manager.compositor, dmx_output_manager, artnet_output_manager]
+    outputs = {loop.stats.name: loop.stats.health() for loop in loops if loop is not None}
+    if output_process is not None:
+        outputs['output_process'] = output_process.health()
+    return {
+        'rooms': effects_manager.room_status(),
+        'theme': effects_manager.theme_manager.current_theme,
+        'brightness': output_stage.grand_master,
+        'music': remote_host_manager.background_music_task is not None,
+        'clients': remote_host_manager.get_connected_clients_info(),
+        'nodes': {
+            # alive is null for a node discovery hasn't heard from (or without "artpoll")
+            'artnet': {node['room']: {'address': node['address'],
+                                      'alive': node['alive'] if node['discovered'] else None}
+                       for node in node_table['nodes']},
+            'audio': node_audio_manager.connected(),
+        },
+        'outputs': outputs,
+    }
+
+
+# Panels subscribe to GET /api/live instead of polling the endpoints below
+live_state = LiveState(_collect_live_state)
+
 dmx_state_manager.reset_all_fixtures()
 if dmx_output_manager:
     dmx_output_manager.start()
 if artnet_output_manager:
     artnet_output_manager.start()
+if output_process:
+    output_process.start()
+effects_manager.compositor.start()
 effects_manager.stop_current_theme()
 
 
@@ -166,19 +241,54 @@ async def index():
 async def set_master_brightness():
     data = await request.json
     brightness = float(data.get('brightness', 1.0))
-    effects_manager.set_master_brightness(brightness)
+    output_stage.set_grand_master(brightness)
     return jsonify({"status": "success", "master_brightness": brightness})
 
 
+@app.route('/api/output_stage', methods=['GET'])
+async def get_output_stage():
+    return jsonify(output_stage.settings())
+
+
+@app.route('/api/output_stage', methods=['POST'])
+async def set_output_stage():
+    """Adjust the output stage live: any of grand_master, submasters
+    {room: level}, curves {model: curve}, caps [{channel, max, model?}]."""
+    data = await request.json
+    show = light_config.show
+    submasters = {}
+    for room, level in data.get('submasters', {}).items():
+        canonical = show.room(room)
+        if canonical is None:
+            return jsonify({'status': 'error', 'message': f'Unknown room: {room}'}), 400
+        submasters[canonical] = level
+    try:
+        # checked whole first: one bad entry applies nothing
+        output_stage.update(grand_master=data.get('grand_master'), submasters=submasters,
+                            curves=data.get('curves'),
+                            caps=[(cap['channel'], cap.get('max'), cap.get('model'))
+                                  for cap in data.get('caps', [])])
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({'status': 'error', 'message': f'Invalid output stage setting: {e}'}), 400
+    return jsonify(dict(output_stage.settings(), status='success'))
+
+
 @app.route('/api/set_theme', methods=['POST'])
 async def set_theme():
     data = await request.json
     theme_name = data.get('theme_name')
     next_theme = data.get('next_theme', False)
+    try:
+        crossfade = float(data.get('crossfade', 0.0))  # seconds; 0 = cut at the next frame
+    except (TypeError, ValueError):
+        crossfade = None
+    if crossfade is None or not 0.0 <= crossfade <= MAX_CROSSFADE:  # NaN / inf fail too
+        return jsonify({'status': 'error',
+                        'message': f'crossfade must be a number of seconds from 0 to {MAX_CROSSFADE:g}'}), 400
 
     try:
         if next_theme:
-            next_theme_name = await effects_manager.set_next_theme_async()
+            next_theme_name = await effects_manager.set_next_theme_async(crossfade)
             if next_theme_name:
                 return jsonify({'status': 'success', 'message': f'Theme set to next theme: {next_theme_name}'})
             return jsonify({'status': 'error', 'message': 'Failed to set next theme'}), 400
@@ -188,14 +298,9 @@ async def set_theme():
                 await effects_manager.stop_current_theme_async()
                 return jsonify({'status': 'success', 'message': 'Theme turned off'})
 
-            try:
-                success = await asyncio.wait_for(effects_manager.set_current_theme_async(theme_name), timeout=2.0)
-                if success:
-                    return jsonify({'status': 'success', 'message': f'Theme set to {theme_name}'})
-                return jsonify({'status': 'error', 'message': f'Failed to set theme to {theme_name}'}), 400
-            except asyncio.TimeoutError:
-                logger.error(f"Timeout while setting theme to: {theme_name}")
-                return jsonify({'status': 'error', 'message': f'Timeout while setting theme to {theme_name}'}), 504
+            if await effects_manager.set_current_theme_async(theme_name, crossfade):
+                return jsonify({'status': 'success', 'message': f'Theme set to {theme_name}'})
+            return jsonify({'status': 'error', 'message': f'Failed to set theme to {theme_name}'}), 400
 
         return jsonify({'status': 'error', 'message': 'Theme name or next_theme flag is required'}), 400
     except Exception as e:
@@ -203,8 +308,34 @@ async def set_theme():
         return jsonify({'status': 'error', 'message': f'An error occurred while setting the theme: {e}'}), 500
 
 
+MAX_RUN_WAIT = 60.0  # seconds one /api/effect_runs/<id>?wait= long-poll may hold
+
+
+def _wants_wait(data):
+    """``wait`` from the query string or body: false / 0 / no = fire and forget."""
+    value = request.args.get('wait', data.get('wait', True))
+    return str(value).lower() not in ('false', '0', 'no')
+
+
+async def _effect_response(run, message, wait, error_message):
+    """Answer a trigger: 202 with the run id straight after takeover, or (the
+    default) once the run has ended, as before."""
+    if run is None:
+        logger.error(f"{error_message}: {message}")
+        return jsonify({'status': 'error', 'message': message}), 500
+    if not wait:
+        return jsonify({'status': 'success', 'message': message, 'run_id': run.run_id,
+                        'state': run.state}), 202
+    success, message = await effects_manager.wait_for_run(run)
+    if success:
+        return jsonify({'status': 'success', 'message': message, 'run_id': run.run_id, 'state': run.state})
+    logger.error(f"{error_message}: {message}")
+    return jsonify({'status': 'error', 'message': message, 'run_id': run.run_id, 'state': run.state}), 500
+
+
 @app.route('/api/run_effect', methods=['POST'])
 async def run_effect():
+    trace = latency_tracer.begin('rest')
     data = await request.json
     room = data.get('room')
     effect_name = data.get('effect_name')
@@ -212,15 +343,13 @@ async def run_effect():
     if not room or not effect_name:
         return jsonify({'status': 'error', 'message': 'Room and effect_name are required'}), 400
 
-    if not effects_manager.get_effect(effect_name):
+    if not effects_manager.has_effect(effect_name):
         return jsonify({'status': 'error', 'message': f'Effect {effect_name} not found'}), 404
 
     try:
-        success, message = await effects_manager.apply_effect_to_room(room, effect_name)
-        if success:
-            return jsonify({'status': 'success', 'message': f'Effect {effect_name} executed in room {room}'})
-        logger.error(f"Failed to execute effect {effect_name} in room {room}: {message}")
-        return jsonify({'status': 'error', 'message': message}), 500
+        run, message = await effects_manager.start_effect_in_room(room, effect_name, trace=trace)
+        return await _effect_response(run, message, _wants_wait(data),
+                                      f"Failed to execute effect {effect_name} in room {room}")
     except Exception as e:
         error_message = f"Error executing effect {effect_name} for room {room}: {e}"
         logger.error(error_message, exc_info=True)
@@ -229,27 +358,65 @@ async def run_effect():
 
 @app.route('/api/run_effect_all_rooms', methods=['POST'])
 async def run_effect_all_rooms():
+    trace = latency_tracer.begin('rest')
     data = await request.json
     effect_name = data.get('effect_name')
 
     if not effect_name:
         return jsonify({'status': 'error', 'message': 'Effect name is required'}), 400
 
-    if not effects_manager.get_effect(effect_name):
+    if not effects_manager.has_effect(effect_name):
         return jsonify({'status': 'error', 'message': f'Effect {effect_name} not found'}), 404
 
     try:
-        success, message = await effects_manager.apply_effect_to_all_rooms(effect_name, data.get('audio'))
-        if success:
-            return jsonify({'status': 'success', 'message': f'Effect {effect_name} executed in all rooms'})
-        logger.error(message)
-        return jsonify({'status': 'error', 'message': message}), 500
+        run, message = await effects_manager.start_effect_in_all_rooms(effect_name, data.get('audio'), trace)
+        return await _effect_response(run, message, _wants_wait(data),
+                                      f"Failed to execute effect {effect_name} in all rooms")
     except Exception as e:
         error_message = f"Error executing effect {effect_name} for all rooms: {e}"
         logger.error(error_message, exc_info=True)
         return jsonify({'status': 'error', 'message': error_message}), 500
 
 
+@app.route('/api/trigger_admission', methods=['GET'])
+def get_trigger_admission():
+    """The per-room trigger policy and how many triggers each outcome got."""
+    return jsonify(effects_manager.admission.summary())
+
+
+@app.route('/api/udp_triggers', methods=['GET'])
+def get_udp_triggers():
+    """The UDP trigger listener: port, whether HMAC is required, and what
+    each node has sent (received, ok, duplicate, unknown, ...)."""
+    return jsonify(udp_trigger_server.summary())
+
+
+@app.route('/api/latency', methods=['GET'])
+def get_latency():
+    """Trigger-to-photon latency: per-stage percentiles (ms since the trigger
+    arrived) per room, effect and trigger source, and the recent traces."""
+    return jsonify(latency_tracer.summary())
+
+
+@app.route('/api/effect_runs', methods=['GET'])
+def get_effect_runs():
+    """Recent effect runs, newest first (running ones and the last finished)."""
+    return jsonify({'runs': [run.to_dict() for run in reversed(effects_manager.runs.values())]})
+
+
+@app.route('/api/effect_runs/<run_id>', methods=['GET'])
+async def get_effect_run(run_id):
+    """One run's state; ``?wait=<seconds>`` long-polls until it ends (at most
+    MAX_RUN_WAIT — poll again for longer effects)."""
+    run = effects_manager.runs.get(run_id)
+    if run is None:
+        return jsonify({'status': 'error', 'message': f'Unknown effect run {run_id}'}), 404
+    wait = request.args.get('wait', type=float)
+    if wait:
+        await run.wait(min(wait, MAX_RUN_WAIT))
+    return jsonify(run.to_dict())
+
+
 @app.route('/api/stop_effect', methods=['POST'])
 async def stop_effect():
     data = await request.json
@@ -294,6 +461,18 @@ def get_light_models():
     return jsonify(light_config.get_light_models())
 
 
+@app.route('/api/reload_light_config', methods=['POST'])
+async def reload_light_config():
+    """Re-read light_config.json without a restart: models, channel maps,
+    curves and caps. Patch or room changes still need a restart (400)."""
+    try:
+        show = light_config.reload()
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    output_stage.set_show(show)
+    return jsonify({'status': 'success', 'message': f'Light configuration reloaded from {light_config.config_file}'})
+
+
 @app.route('/api/light_fixtures', methods=['GET'])
 def get_light_fixtures():
     room_layout = light_config.get_room_layout()
@@ -407,19 +586,22 @@ async def run_test():
 
 
 async def run_channel_test(rooms, channel_values):
+    show = light_config.show
+    fixture_ids, rows = [], []
     for room in rooms:
-        for light in light_config.get_room_layout().get(room, []):
-            light_model = light_config.get_light_config(light['model'])
+        for fixture_id in show.fixture_ids(room):
             fixture_values = [0] * CHANNELS_PER_FIXTURE
-            for channel, value in channel_values.items():
-                if channel in light_model['channels']:
-                    fixture_values[light_model['channels'][channel]] = int(value)
-            dmx_state_manager.update_fixture((light['start_address'] - 1) // CHANNELS_PER_FIXTURE, fixture_values)
+            for channel, offset in show.fixture_channels(fixture_id).items():
+                if channel in channel_values:
+                    fixture_values[offset] = int(channel_values[channel])
+            fixture_ids.append(fixture_id)
+            rows.append(fixture_values)
+    dmx_state_manager.update_fixtures(fixture_ids, rows)
     return jsonify({"message": f"Channel test applied to rooms: {', '.join(rooms)}"}), 200
 
 
 async def run_effect_test(rooms, effect_name):
-    if not effects_manager.get_effect(effect_name):
+    if not effects_manager.has_effect(effect_name):
         return jsonify({"error": f"Effect '{effect_name}' not found"}), 404
     for room in rooms:
         success, message = await effects_manager.apply_effect_to_room(room, effect_name)
@@ -431,8 +613,7 @@ async def run_effect_test(rooms, effect_name):
 @app.route('/api/stop_test', methods=['POST'])
 def stop_test():
     try:
-        for fixture_id in range(NUM_FIXTURES):
-            dmx_state_manager.reset_fixture(fixture_id)
+        dmx_state_manager.reset_all_fixtures()
         logger.info("Test stopped and all channels reset")
         return jsonify({"message": "Test stopped and lights reset"}), 200
     except Exception as e:
@@ -454,6 +635,43 @@ async def serve_photobomb_photo(filename):
     return await send_from_directory(camera_manager.photos_dir, filename)
 
 
+@app.route('/api/artnet/nodes', methods=['GET'])
+def get_artnet_nodes():
+    """Art-Net node table: per-room address, liveness and ArtPollReply data."""
+    if output_process is not None:
+        return jsonify(output_process.node_table())
+    if artnet_output_manager is None:
+        return jsonify({'discovery': False, 'nodes': [], 'unmatched': []})
+    return jsonify(artnet_output_manager.node_table())
+
+
+@app.route('/api/frame_stats', methods=['GET'])
+def get_frame_stats():
+    """Timing of the 44Hz loops over the last minute: achieved fps, tick
+    duration and lateness histograms, missed deadlines, traffic per node."""
+    loops = [effects_manager.compositor, dmx_output_manager, artnet_output_manager]
+    stats = {loop.stats.name: loop.stats.summary() for loop in loops if loop is not None}
+    if output_process is not None:
+        stats.update(output_process.frame_stats())
+    return jsonify(stats)
+
+
+@app.route('/api/live')
+async def live():
+    """Server-sent events: the live state as a ``snapshot``, then ``delta``
+    JSON merge patches as it changes, coalesced per tick (live_state.py)."""
+    response = Response(live_state.subscribe(), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    response.timeout = None     # open for as long as the panel is
+    return response
+
+
+@app.route('/api/live/stats', methods=['GET'])
+def get_live_stats():
+    """Subscribers to /api/live, events published and events encoded."""
+    return jsonify(live_state.summary())
+
+
 @app.route('/api/health')
 async def health():
     """Liveness for deploy scripts and the sim's RPI status dot."""
@@ -482,6 +700,9 @@ if __name__ == '__main__':
     async def run_server():
         try:
             websocket_server = await websockets.serve(websocket_handler, "0.0.0.0", 8765)
+            await udp_trigger_server.serve()
+            # Effects build lazily; warm them (cache or factory, off-loop) once serving
+            effects_manager.start_warming()
             await asyncio.gather(websocket_server.wait_closed(), serve(app, config))
         except Exception as e:
             log_and_exit(f"Server crashed: {e}")
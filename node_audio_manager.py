@@ -120,7 +120,7 @@ class _NodeConn:
                                      f"{type(e).__name__}: {e}")
         return False
 
-    async def play_cue(self, cue):
+    async def play_cue(self, cue, trace=None):
         async def call():
             svc = self.services.get('play_cue')
             if svc is None:
@@ -129,6 +129,8 @@ class _NodeConn:
             result = self.client.execute_service(svc, {'cue': cue})
             if asyncio.iscoroutine(result):  # awaitable in newer aioesphomeapi
                 await result
+            if trace is not None:
+                trace.mark(f"audio_node:{self.room}")
         return await self._run(f"play_cue {cue}", call)
 
     async def play_url(self, url):
@@ -193,6 +195,10 @@ class NodeAudioManager:
     def enabled(self):
         return bool(self.rooms)
 
+    def connected(self):
+        """room -> whether its node's API connection is up."""
+        return {conn.room: conn.client is not None for conn in self.rooms.values()}
+
     def enabled_for(self, room):
         return room is not None and room.lower() in self.rooms
 
@@ -200,7 +206,7 @@ class NodeAudioManager:
         return (f"http://{self.server_host}:{self.server_port}"
                 f"/api/audio/{quote(music_file)}")
 
-    def handle_command(self, room, command, data):
+    def handle_command(self, room, command, data, trace=None):
         """Mirror a WS audio command onto the node(s). room=None means every
         node room (matching the WS broadcast semantics). Fire-and-forget:
         returns True if it was dispatched to at least one node."""
@@ -212,7 +218,7 @@ class NodeAudioManager:
             return False
         dispatched = False
         for conn in conns:
-            coro = self._command_coro(conn, command, data or {})
+            coro = self._command_coro(conn, command, data or {}, trace)
             if coro is not None:
                 task = asyncio.create_task(coro)
                 self._tasks.add(task)
@@ -220,12 +226,12 @@ class NodeAudioManager:
                 dispatched = True
         return dispatched
 
-    def _command_coro(self, conn, command, data):
+    def _command_coro(self, conn, command, data, trace=None):
         if command == 'play_effect_audio':
             if data.get('loop'):
                 logger.warning(f"Node audio [{conn.room}]: loop requested for "
                                f"{data.get('file_name')} — embedded cues don't loop")
-            return conn.play_cue(cue_id(data['file_name']))
+            return conn.play_cue(cue_id(data['file_name']), trace)
         if command == 'start_background_music':
             return conn.play_url(self.music_url(data['music_file']))
         if command == 'stop_background_music':
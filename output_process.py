@@ -0,0 +1,288 @@
+"""The DMX outputs (Art-Net, FTDI) in a dedicated process.
+
+In-process, the 44Hz sink threads share the GIL with the REST API, the
+WebSocket server and the compositor, so a burst of requests shows up as
+output jitter. With ``"output_process": {"enabled": true}`` in
+dmx_nodes.json the server only WRITES state: dmx_state_manager publishes
+every commit to a shared_universe.SharedUniverse, and a child process
+(``python output_process.py <config>``) runs the unchanged sink threads
+against a SharedStateReader over the same block — its own interpreter, its
+own GIL, optionally pinned to CPUs (``"cpus": [3]``) and at SCHED_FIFO
+priority (``"realtime_priority": 50``, needs CAP_SYS_NICE — the container's
+``cap_add: [SYS_NICE]``) with a ``"nice"`` fallback. tools/output_process_bench.py
+measures the difference under synthetic API load.
+
+It's a plain subprocess rather than multiprocessing: spawn would re-import
+main.py in the child and start a second server. Two socketpairs connect
+them — flush_now() is one datagram on the wake socket, and node_table() /
+frame_stats() are JSON-line queries on the control socket. The child exits
+when the control socket closes (the server died) or when a sink thread dies
+(a crash there would otherwise leave a live process sending nothing); the
+server's watchdog restarts a child that exited, backing off 1s → 30s.
+"""
+import json
+import logging
+import os
+import select
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+from shared_universe import SharedStateReader, SharedUniverse
+
+logger = logging.getLogger(__name__)
+
+CONFIG_FILE = 'dmx_nodes.json'
+LIGHT_CONFIG_FILE = 'light_config.json'
+RESTART_MIN = 1.0           # seconds before restarting a dead child, doubling to
+RESTART_MAX = 30.0
+STABLE_AFTER = 60.0         # a child that ran this long resets the backoff
+QUERY_TIMEOUT = 1.0
+SINK_CHECK = 1.0            # seconds between the child's checks that its sink threads live
+NO_NODES = {'discovery': False, 'nodes': [], 'unmatched': []}
+
+
+def _readline(sock, pending, deadline=None):
+    """(line, rest) from a JSON-lines socket; OSError when it closes or
+    the deadline passes."""
+    while b'\n' not in pending:
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError("no reply")
+            sock.settimeout(remaining)
+        data = sock.recv(65536)
+        if not data:
+            raise ConnectionError("closed")
+        pending += data
+    line, _, rest = pending.partition(b'\n')
+    return line, rest
+
+
+def _send(sock, message):
+    sock.sendall(json.dumps(message).encode() + b'\n')
+
+
+class OutputProcess:
+    """Server side: owns the shared block and the child."""
+
+    def __init__(self, dmx_state_manager, options, ftdi=True, artnet_config=CONFIG_FILE,
+                 light_config_path=LIGHT_CONFIG_FILE):
+        self.shared = SharedUniverse.from_state(dmx_state_manager)
+        self.config = {
+            'layout': self.shared.layout,
+            'ftdi': ftdi,
+            'artnet_config': os.path.abspath(artnet_config),
+            'light_config': os.path.abspath(light_config_path),
+            'cpus': options.get('cpus'),
+            'realtime_priority': options.get('realtime_priority'),
+            'nice': options.get('nice'),
+        }
+        self.running = True
+        self.process = None
+        self.restarts = 0
+        self._lock = threading.Lock()   # the control socket: one query at a time
+        self._control = None
+        self._pending = b''
+        self._query_id = 0
+        self._wake = None
+        dmx_state_manager.share(self.shared)
+        dmx_state_manager.add_flush_listener(self.flush_now)
+        self._watchdog = threading.Thread(target=self._watch, daemon=True, name='output-process')
+
+    def start(self):
+        self._watchdog.start()
+
+    def _spawn(self):
+        control, child_control = socket.socketpair()
+        wake, child_wake = socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+        config = dict(self.config, control_fd=child_control.fileno(), wake_fd=child_wake.fileno())
+        try:
+            process = subprocess.Popen([sys.executable, os.path.abspath(__file__), json.dumps(config)],
+                                       pass_fds=(child_control.fileno(), child_wake.fileno()))
+        finally:
+            child_control.close()
+            child_wake.close()
+        wake.setblocking(False)
+        with self._lock:
+            self.process, self._control, self._wake, self._pending = process, control, wake, b''
+        logger.info(f"DMX output process started (pid {process.pid})")
+        return process
+
+    def _watch(self):
+        delay = RESTART_MIN
+        while self.running:
+            started = time.monotonic()
+            try:
+                code = self._spawn().wait()
+            except OSError as e:
+                code = e
+            with self._lock:
+                for sock in (self._control, self._wake):
+                    if sock is not None:
+                        sock.close()
+                self._control = self._wake = None
+            if not self.running:
+                break
+            if time.monotonic() - started > STABLE_AFTER:
+                delay = RESTART_MIN
+            logger.error(f"DMX output process exited ({code}) — restarting in {delay:.0f}s")
+            time.sleep(delay)
+            delay = min(delay * 2, RESTART_MAX)
+            self.restarts += 1
+
+    def flush_now(self):
+        wake = self._wake
+        if wake is None:
+            return
+        try:
+            wake.send(b'!')
+        except OSError:
+            pass        # a wake-up is already queued, or the child is restarting
+
+    def _query(self, query, default):
+        with self._lock:
+            control = self._control
+            if control is None:
+                return default
+            self._query_id += 1
+            try:
+                _send(control, {'id': self._query_id, 'query': query})
+                deadline = time.monotonic() + QUERY_TIMEOUT
+                while True:
+                    line, self._pending = _readline(control, self._pending, deadline)
+                    reply = json.loads(line)
+                    if reply.get('id') == self._query_id:    # late replies to timed-out queries are dropped
+                        return reply.get('result', default)
+            except (OSError, ValueError) as e:
+                logger.warning(f"DMX output process: {query} query failed ({e})")
+                return default
+
+    def node_table(self):
+        return self._query('node_table', NO_NODES)
+
+    def frame_stats(self):
+        """{loop name: FrameStats summary} for the child's sinks."""
+        return self._query('frame_stats', {})
+
+    def health(self):
+        process = self.process
+        return {'status': 'ok' if process is not None and process.poll() is None else 'stopped',
+                'restarts': self.restarts}
+
+    def stop(self):
+        self.running = False
+        process = self.process
+        if process is not None and process.poll() is None:
+            process.terminate()
+            try:
+                process.wait(2)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        self.shared.close()
+
+
+# -- the child ----------------------------------------------------------------
+
+def _tune(config):
+    """CPU affinity and scheduling, before any thread starts (threads inherit both)."""
+    cpus = config.get('cpus')
+    if cpus:
+        try:
+            os.sched_setaffinity(0, cpus)
+            logger.info(f"DMX output process pinned to CPUs {sorted(cpus)}")
+        except (AttributeError, OSError) as e:
+            logger.warning(f"DMX output process: can't pin to CPUs {cpus} ({e})")
+    priority = config.get('realtime_priority')
+    if priority:
+        try:
+            os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(priority))
+            logger.info(f"DMX output process running SCHED_FIFO priority {priority}")
+            return
+        except (AttributeError, OSError) as e:
+            logger.warning(f"DMX output process: no SCHED_FIFO ({e}) — falling back to nice")
+    nice = config.get('nice')
+    if nice is not None:
+        try:
+            os.setpriority(os.PRIO_PROCESS, 0, nice)
+            logger.info(f"DMX output process niceness {nice}")
+        except OSError as e:
+            logger.warning(f"DMX output process: can't set niceness {nice} ({e})")
+
+
+def _outputs(reader, config):
+    """The sinks main.py would build in-process, with the same degrade rules:
+    a broken FTDI is tolerated when Art-Net nodes are enabled; no output at
+    all raises (and the watchdog's crash-loop shows in the journal)."""
+    from artnet_output_manager import ArtNetOutputManager
+    artnet = ArtNetOutputManager.from_config(reader, config['artnet_config'], config['light_config'])
+    ftdi = None
+    if config['ftdi']:
+        try:
+            from dmx_interface import DMXOutputManager
+            ftdi = DMXOutputManager(reader)
+        except Exception as e:
+            if artnet is None:
+                raise
+            logger.error(f"FTDI output unavailable ({e}) — continuing on Art-Net nodes only")
+    elif artnet is None:
+        raise RuntimeError("dmx_nodes.json disables FTDI but enables no Art-Net nodes — no DMX output")
+    return artnet, ftdi
+
+
+def _wake_loop(wake, reader):
+    while True:
+        if not wake.recv(64):
+            return
+        reader.flush_now()
+
+
+def _answer(query, artnet, ftdi):
+    if query == 'node_table':
+        return artnet.node_table() if artnet is not None else NO_NODES
+    if query == 'frame_stats':
+        return {sink.stats.name: sink.stats.summary() for sink in (ftdi, artnet) if sink is not None}
+    raise ValueError(f"unknown query {query!r}")
+
+
+def main(argv):
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+                        handlers=[logging.StreamHandler(sys.stdout)])
+    logging.getLogger('pyftdi.ftdi').setLevel(logging.WARNING)
+    config = json.loads(argv[1])
+    control = socket.socket(fileno=config['control_fd'])
+    wake = socket.socket(fileno=config['wake_fd'])
+    _tune(config)
+    reader = SharedStateReader(config['layout'])
+    artnet, ftdi = _outputs(reader, config)
+    threading.Thread(target=_wake_loop, args=(wake, reader), daemon=True, name='output-wake').start()
+    sinks = [sink for sink in (ftdi, artnet) if sink is not None]
+    for sink in sinks:
+        sink.start()
+    pending = b''
+    while True:
+        dead = [type(sink).__name__ for sink in sinks if not sink.is_alive()]
+        if dead:
+            logger.error(f"DMX output process: {', '.join(dead)} thread died — exiting to be restarted")
+            return 1
+        if b'\n' not in pending and not select.select([control], [], [], SINK_CHECK)[0]:
+            continue
+        try:
+            line, pending = _readline(control, pending)
+        except OSError:
+            logger.info("DMX output process: server gone — exiting")
+            return 0
+        request = json.loads(line)
+        try:
+            reply = {'id': request['id'], 'result': _answer(request['query'], artnet, ftdi)}
+        except Exception as e:
+            logger.error(f"DMX output process: {request.get('query')} failed ({e})")
+            reply = {'id': request['id'], 'error': str(e)}
+        _send(control, reply)
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,206 @@
+"""The last processing step between the DMX state and every output.
+
+Themes and effects write raw levels; what actually goes on the wire (FTDI,
+Art-Net, the sim) is those levels run through one 256-entry lookup table per
+channel class:
+
+- grand master — every fixture's intensity channel (``set_grand_master``,
+  what /api/set_master_brightness sets)
+- per-room submasters — the intensity channels of one room's fixtures
+- per-model dimmer curves — gamma on the intensity channel, for fixtures
+  whose dimmer isn't perceptually linear ("linear", "square", or a number)
+- per-channel maximum caps — by channel name, optionally per model (a
+  battery fixture's w_dimming held below full white)
+
+The intensity channel is a model's ``total_dimming`` (every model in
+light_config.json has one; a model without it uses all its ``*_dimming``
+channels), so masters scale the fixture's own dimmer and never the colour
+mix. A channel class is one (room, model, channel) combination; the tables
+for all of them are stacked into one flat array and every frame channel
+holds the offset of its class's table, so processing a frame is a single
+``np.take`` of ``offset + level`` — done once per changed frame by
+dmx_state_manager.snapshot(), never per sink. A model can carry defaults in
+light_config.json (``"dimmer_curve"``, ``"channel_caps"``); the API adjusts
+everything live; ``update`` takes several settings as one change, checked
+whole before any of it applies (unknown rooms, models and channel names are
+refused). Each change rebuilds the tables (a few hundred µs) and
+tells the state manager, which re-stamps every fixture so each sink re-sends.
+With everything at identity ``apply`` hands the frame back untouched. A
+reloaded light config (``set_show``) re-derives the channel classes and the
+models' defaults; masters and live settings carry over.
+"""
+import logging
+import threading
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+INTENSITY_CHANNEL = 'total_dimming'
+CURVES = {'linear': 1.0, 'square': 2.0, 'cube': 3.0, 'sqrt': 0.5}    # name -> gamma
+
+
+def _gamma(curve):
+    """A curve name or a gamma exponent -> the exponent; ValueError otherwise."""
+    gamma = CURVES.get(curve, curve) if isinstance(curve, str) else curve
+    gamma = float(gamma)
+    if not gamma > 0:
+        raise ValueError(f"dimmer curve must be one of {sorted(CURVES)} or a positive gamma, got {curve!r}")
+    return gamma
+
+
+def _level(value):
+    return max(0.0, min(1.0, float(value)))
+
+
+class OutputStage:
+    def __init__(self, show):
+        self.rooms = show.rooms
+        self.grand_master = 1.0
+        self.submasters = dict.fromkeys(show.rooms, 1.0)
+        self.curves = {}        # model -> gamma
+        self.caps = {}          # (model or None, channel name) -> maximum value
+        self._lock = threading.Lock()
+        self._listeners = []
+        self._table = None      # (flat (classes + 1) * 256 uint8 tables, offsets); None = all identity
+        self._load(show)
+        self._build()
+
+    def set_show(self, show):
+        """Take a reloaded ShowModel with the same rooms and patch
+        (LightConfigManager.reload() guarantees both)."""
+        with self._lock:
+            self._load(show)
+        self._changed()
+
+    def _load(self, show):
+        """The models' light_config.json defaults, and every frame channel's
+        class, from ``show``."""
+        self.models = {model: frozenset(channels) for model, channels in show.model_channels.items()}
+        for model, spec in show.config.get('light_models', {}).items():
+            if 'dimmer_curve' in spec:
+                self.curves[model] = _gamma(spec['dimmer_curve'])
+            for channel, maximum in spec.get('channel_caps', {}).items():
+                self.caps[(model, channel)] = max(0, min(255, int(maximum)))
+        # Every frame channel's class: (room, model, channel name), None for
+        # channels no fixture owns. Overlapping fixtures: the later one wins.
+        channel_classes = [None] * show.frame_size
+        for (fixture_id, room_index, model), (offset, width) in zip(show.fixtures, show.slots):
+            channels = show.model_channels.get(model, {})
+            intensity = ({INTENSITY_CHANNEL} if INTENSITY_CHANNEL in channels else
+                         {name for name in channels if name.endswith('_dimming')})
+            for name, slot in channels.items():
+                if slot < width:
+                    channel_classes[offset + slot] = (show.rooms[room_index], model, name, name in intensity)
+        self.classes = sorted(set(channel_classes) - {None})
+        number = {cls: i + 1 for i, cls in enumerate(self.classes)}     # 0 = pass-through
+        self._offsets = np.array([number.get(cls, 0) * 256 for cls in channel_classes], dtype=np.intp)
+
+    # -- live adjustment (API) ----------------------------------------------
+
+    def add_listener(self, callback):
+        """``callback()`` runs after every change (the state manager's refresh)."""
+        self._listeners.append(callback)
+
+    def set_grand_master(self, level):
+        self.update(grand_master=level)
+
+    def set_submaster(self, room, level):
+        """``room`` must be a canonical room name (ShowModel.room())."""
+        self.update(submasters={room: level})
+
+    def set_curve(self, model, curve):
+        """``curve``: a name from CURVES or a gamma exponent; None = linear."""
+        self.update(curves={model: curve})
+
+    def set_cap(self, channel, maximum, model=None):
+        """Cap ``channel`` (a channel name) at ``maximum`` on every model, or
+        on ``model`` only; a per-model cap wins. None removes the cap."""
+        self.update(caps=[(channel, maximum, model)])
+
+    def update(self, grand_master=None, submasters=None, curves=None, caps=()):
+        """Apply any of the settings above as one change: ``submasters``
+        {room: level}, ``curves`` {model: curve}, ``caps`` [(channel,
+        maximum, model)]. Everything is checked first — ValueError for an
+        unknown room, model or channel or a bad value (TypeError for a
+        value of the wrong type) — so a bad entry applies nothing; then one
+        table rebuild and one re-send."""
+        grand_master = None if grand_master is None else _level(grand_master)
+        levels = {}
+        for room, level in (submasters or {}).items():
+            if room not in self.submasters:
+                raise ValueError(f"unknown room {room!r}")
+            levels[room] = _level(level)
+        gammas = {}
+        for model, curve in (curves or {}).items():
+            self._check_model(model)
+            gammas[model] = None if curve is None else _gamma(curve)
+        maxima = {}
+        for channel, maximum, model in caps:
+            names = self._check_model(model) if model is not None else frozenset().union(*self.models.values())
+            if channel not in names:
+                raise ValueError(f"unknown channel {channel!r}" + (f" for model {model!r}" if model else ''))
+            maxima[(model, channel)] = None if maximum is None else max(0, min(255, int(maximum)))
+        with self._lock:
+            if grand_master is not None:
+                self.grand_master = grand_master
+            self.submasters.update(levels)
+            for settings, changes in ((self.curves, gammas), (self.caps, maxima)):
+                for key, value in changes.items():
+                    if value is None:
+                        settings.pop(key, None)
+                    else:
+                        settings[key] = value
+        self._changed()
+
+    def _check_model(self, model):
+        """``model``'s channel names; ValueError if light_config.json has no such model."""
+        channels = self.models.get(model)
+        if channels is None:
+            raise ValueError(f"unknown model {model!r}")
+        return channels
+
+    def settings(self):
+        with self._lock:
+            return {
+                'grand_master': self.grand_master,
+                'submasters': dict(self.submasters),
+                'curves': dict(self.curves),
+                'caps': [{'model': model, 'channel': channel, 'max': maximum}
+                         for (model, channel), maximum in self.caps.items()],
+            }
+
+    def _changed(self):
+        self._build()
+        for callback in self._listeners:
+            callback()
+
+    # -- the stage ----------------------------------------------------------
+
+    def _build(self):
+        with self._lock:
+            levels = np.arange(256, dtype=np.float64)
+            tables = [levels]
+            identity = True
+            for room, model, channel, intensity in self.classes:
+                table = levels
+                if intensity:
+                    scale = self.grand_master * self.submasters.get(room, 1.0)
+                    gamma = self.curves.get(model, 1.0)
+                    if scale != 1.0 or gamma != 1.0:
+                        table = np.rint(255 * (levels / 255 * scale) ** gamma)
+                cap = self.caps.get((model, channel), self.caps.get((None, channel)))
+                if cap is not None and cap < 255:
+                    table = np.minimum(table, cap)
+                identity = identity and table is levels
+                tables.append(table)
+            self._table = None if identity else (np.concatenate(tables).astype(np.uint8), self._offsets)
+
+    def apply(self, frame):
+        """Raw frame bytes -> output frame bytes (the same object if the stage
+        is at identity)."""
+        table = self._table     # read once; a rebuild swaps tables and offsets together
+        if table is None:
+            return frame
+        lut, offsets = table
+        return lut.take(offsets[:len(frame)] + np.frombuffer(frame, dtype=np.uint8)).tobytes()
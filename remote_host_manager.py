@@ -61,27 +61,30 @@ class RemoteHostManager:
             logger.warning(f"No audio client found for room: {room}")
         return sockets
 
-    async def _send(self, websocket, message):
+    async def _send(self, websocket, message, trace=None):
         client = self.clients.get(websocket)
         label = f"{client['name']} ({client['ip']})" if client else "unregistered client"
         try:
             await websocket.send(json.dumps(message))
+            if trace is not None:
+                trace.mark(f"audio_ws:{client['name'] if client else 'unregistered'}")
             return True
         except Exception as e:
             logger.error(f"Error sending {message.get('type')} to {label}: {e}")
             return False
 
-    async def send_audio_command(self, room, command, data=None):
+    async def send_audio_command(self, room, command, data=None, trace=None):
         """Send a command to the client covering `room`, or to all clients if room is None.
 
         Rooms with an ESP32 speaker node (node_audio_config.json) get the same
         command mirrored over the ESPHome native API. That path is additive —
         the WS copy still goes out, so the sim's browser audio client keeps
-        working — and fire-and-forget, so a dead node never delays an effect."""
+        working — and fire-and-forget, so a dead node never delays an effect.
+        ``trace`` (latency_trace) is stamped as each copy goes out."""
         message = {"type": command, "data": data if data is not None else {}}
-        node_handled = bool(self.node_audio) and self.node_audio.handle_command(room, command, data)
+        node_handled = bool(self.node_audio) and self.node_audio.handle_command(room, command, data, trace)
         if room is None:
-            results = [await self._send(ws, message) for ws in list(self.clients)]
+            results = [await self._send(ws, message, trace) for ws in list(self.clients)]
             return all(results)
         message["room"] = room
         sockets = self.get_websockets_by_room(room, warn_if_empty=not node_handled)
@@ -91,10 +94,10 @@ class RemoteHostManager:
                 return True
             logger.error(f"No connected client found for room: {room}. Cannot send {command}.")
             return False
-        results = [await self._send(ws, message) for ws in sockets]
+        results = [await self._send(ws, message, trace) for ws in sockets]
         return all(results)
 
-    async def play_effect_audio(self, effect_name, rooms=None, audio_params=None):
+    async def play_effect_audio(self, effect_name, rooms=None, audio_params=None, trace=None):
         """
         Tell clients to play the audio for an effect. With `rooms`, targets the client
         covering each room; without, sends once to every connected client.
@@ -116,8 +119,8 @@ class RemoteHostManager:
             'loop': audio_params.get('loop', False)
         }
         if rooms is None:
-            return await self.send_audio_command(None, 'play_effect_audio', data)
-        results = [await self.send_audio_command(room, 'play_effect_audio', data) for room in rooms]
+            return await self.send_audio_command(None, 'play_effect_audio', data, trace)
+        results = [await self.send_audio_command(room, 'play_effect_audio', data, trace) for room in rooms]
         return all(results)
 
     # --- Background music ---
@@ -0,0 +1,211 @@
+"""The DMX output frame in shared memory, for outputs in another process.
+
+The server process (the only writer) publishes every commit of the
+dmx_state_manager — the output frame plus the generation stamps sinks use
+for change detection — into one ``multiprocessing.shared_memory`` block.
+The output process (output_process.py) reads it through SharedStateReader,
+which has the reader half of DMXStateManager's interface (``snapshot``,
+``universe``, ``changes_since``, ``add_flush_listener``), so the FTDI and
+Art-Net managers run there unchanged.
+
+Torn frames are ruled out with a seqlock: the writer bumps ``seq`` to odd,
+writes the body, stores the header (generation, CRC32 of the body), then
+bumps ``seq`` to even. A reader copies the whole block and keeps the copy
+only if ``seq`` was even and unchanged across the copy AND the CRC matches —
+the Pi's ARM cores may reorder the plain stores Python makes, and the CRC
+catches what the sequence alone can't. A copy that fails is retried after
+yielding the GIL; the writer holds the state lock for a few µs per publish,
+so a retry is rare. A writer stuck mid-publish (or a corrupted block) makes
+every read give up after READ_ATTEMPTS and resend the last good frame,
+logged at most once per STUCK_LOG_INTERVAL.
+
+Block layout: header ``<QQI`` (seq, generation, crc32) padded to 24 bytes,
+then one ``Q`` per universe (its last generation), one ``Q`` per fixture
+(its stamp), then the frame.
+"""
+import logging
+import struct
+import threading
+import time
+import zlib
+from multiprocessing import resource_tracker, shared_memory
+
+from dmx_state_manager import UNIVERSE_SIZE, universe_layout
+
+logger = logging.getLogger(__name__)
+
+_SEQ = struct.Struct('<Q')
+_HEADER = struct.Struct('<QQI4x')       # seq, generation, crc32 of everything after it
+READ_ATTEMPTS = 1000                    # torn copies before a reader keeps its last good frame
+STUCK_LOG_INTERVAL = 10.0               # seconds between "no clean read" warnings
+_OWNED = set()                          # names of the blocks this process created
+
+
+def _sizes(layout):
+    return layout['universes'], layout['num_fixtures'], layout['frame_size']
+
+
+def block_size(layout):
+    universes, fixtures, frame_size = _sizes(layout)
+    return _HEADER.size + 8 * (universes + fixtures) + frame_size
+
+
+class SharedUniverse:
+    """Writer side, in the server process: owns (creates, unlinks) the block."""
+
+    def __init__(self, num_fixtures, channels_per_fixture, slots):
+        frame_size = max((offset + width for offset, width in slots), default=0)
+        self.layout = {
+            'num_fixtures': num_fixtures,
+            'channels_per_fixture': channels_per_fixture,
+            'slots': [list(slot) for slot in slots],
+            'frame_size': frame_size,
+            'universes': max(1, -(-frame_size // UNIVERSE_SIZE)),
+        }
+        self.shm = shared_memory.SharedMemory(create=True, size=block_size(self.layout))
+        self.layout['name'] = self.shm.name
+        _OWNED.add(self.shm.name)
+        self._stamps = struct.Struct(f"<{self.layout['universes'] + num_fixtures}Q")
+        self._seq = 0
+
+    @classmethod
+    def from_state(cls, dmx_state_manager):
+        return cls(dmx_state_manager.num_fixtures, dmx_state_manager.channels_per_fixture,
+                   dmx_state_manager.slots)
+
+    def publish(self, frame, generation, universe_generations, fixture_generations):
+        """One commit. Single writer: called with the state manager's lock held."""
+        body = self._stamps.pack(*universe_generations, *fixture_generations) + frame
+        buf = self.shm.buf
+        self._seq += 1                  # odd: write in progress
+        _SEQ.pack_into(buf, 0, self._seq)
+        buf[_HEADER.size:_HEADER.size + len(body)] = body
+        self._seq += 1
+        _HEADER.pack_into(buf, 0, self._seq - 1, generation, zlib.crc32(body))
+        _SEQ.pack_into(buf, 0, self._seq)
+
+    def close(self):
+        self.shm.close()
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+        _OWNED.discard(self.shm.name)
+
+
+class _Copy:
+    """One consistent read of the block."""
+    __slots__ = ('seq', 'generation', 'universe_generations', 'fixture_generations', 'frame')
+
+    def __init__(self, seq, generation, universe_generations, fixture_generations, frame):
+        self.seq = seq
+        self.generation = generation
+        self.universe_generations = universe_generations
+        self.fixture_generations = fixture_generations
+        self.frame = frame
+
+
+class SharedStateReader:
+    """Reader side, in the output process: a DMXStateManager for the sinks."""
+
+    def __init__(self, layout, sleep=time.sleep):
+        self.num_fixtures = layout['num_fixtures']
+        self.channels_per_fixture = layout['channels_per_fixture']
+        self.slots = tuple(tuple(slot) for slot in layout['slots'])
+        self.universes = layout['universes']
+        self._fixture_universes, self._universe_fixtures = universe_layout(self.slots, self.universes)
+        self.shm = _attach(layout['name'])
+        self._size = block_size(layout)
+        self._stamps = struct.Struct(f'<{self.universes + self.num_fixtures}Q')
+        self.lock = threading.Lock()        # the FTDI and Art-Net threads both read
+        self._copy = _Copy(-1, 0, [0] * self.universes, [0] * self.num_fixtures, bytes(layout['frame_size']))
+        self._universe_snapshots = [(None, b'')] * self.universes   # (generation, frame)
+        self._flush_listeners = []
+        self.torn_reads = 0
+        self.failed_reads = 0               # reads that gave up and resent the last frame
+        self._next_warning = 0.0            # monotonic
+        self._sleep = sleep                 # sleep(0) yields between read attempts
+
+    def add_flush_listener(self, callback):
+        self._flush_listeners.append(callback)
+
+    def flush_now(self):
+        for callback in self._flush_listeners:
+            callback()
+
+    def _read(self):
+        """The latest consistent copy. Lock held."""
+        buf = self.shm.buf
+        if _SEQ.unpack_from(buf, 0)[0] == self._copy.seq:
+            return self._copy
+        for _ in range(READ_ATTEMPTS):
+            seq = _SEQ.unpack_from(buf, 0)[0]
+            if seq & 1:
+                self.torn_reads += 1
+                self._sleep(0)
+                continue
+            raw = bytes(buf[:self._size])
+            header_seq, generation, crc = _HEADER.unpack_from(raw)
+            body = memoryview(raw)[_HEADER.size:]
+            if header_seq != seq or _SEQ.unpack_from(buf, 0)[0] != seq or zlib.crc32(body) != crc:
+                self.torn_reads += 1
+                self._sleep(0)
+                continue
+            stamps = self._stamps.unpack_from(body)
+            self._copy = _Copy(seq, generation, stamps[:self.universes], stamps[self.universes:],
+                               bytes(body[self._stamps.size:]))
+            return self._copy
+        self.failed_reads += 1
+        now = time.monotonic()
+        if now >= self._next_warning:   # a stuck writer would otherwise log on every 44Hz read
+            self._next_warning = now + STUCK_LOG_INTERVAL
+            logger.warning(f"Shared universe: no clean read in {READ_ATTEMPTS} attempts — resending the "
+                           f"last frame (failed reads so far: {self.failed_reads})")
+        return self._copy
+
+    @property
+    def generation(self):
+        """The writer's generation as of the latest consistent copy."""
+        with self.lock:
+            return self._read().generation
+
+    def snapshot(self):
+        with self.lock:
+            return self._read().frame
+
+    def universe(self, u):
+        with self.lock:
+            copy = self._read()
+            generation, frame = self._universe_snapshots[u]
+            if generation != copy.universe_generations[u]:
+                frame = copy.frame[u * UNIVERSE_SIZE:(u + 1) * UNIVERSE_SIZE]
+                self._universe_snapshots[u] = (copy.universe_generations[u], frame)
+            return frame
+
+    def changes_since(self, generation, universe=None):
+        with self.lock:
+            copy = self._read()
+        if universe is None:
+            current, fixture_ids = copy.generation, range(self.num_fixtures)
+        else:
+            current, fixture_ids = copy.universe_generations[universe], self._universe_fixtures[universe]
+        if current == generation:
+            return current, []
+        stamps = copy.fixture_generations
+        return current, [i for i in fixture_ids if stamps[i] > generation]
+
+    def close(self):
+        self.shm.close()
+
+
+def _attach(name):
+    """Open an existing block without this process's resource tracker
+    unlinking it at exit (the server owns it; a restarted output process
+    must find it again)."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:       # Python < 3.13: attaching registers the block too
+        shm = shared_memory.SharedMemory(name=name)
+        if name not in _OWNED:      # same process as the writer: that registration is the writer's
+            resource_tracker.unregister(shm._name, 'shared_memory')
+        return shm
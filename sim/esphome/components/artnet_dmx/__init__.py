@@ -7,6 +7,8 @@ MAX485 into the room's fixture chain. WiFi loss = hold the last frame.
 
 ESP-IDF builds get the full UART path; a host-platform build compiles to the
 UDP receiver + signal sensor only (so a sim room including it still validates).
+Either way it answers ArtPoll with its node name, which is how the server maps
+it to a room and tracks it (artnet_output_manager._Discovery).
 """
 import esphome.codegen as cg
 import esphome.config_validation as cv
@@ -21,6 +23,8 @@ CONF_UNIVERSE = "universe"
 CONF_UART_NUM = "uart_num"
 CONF_CHANNELS = "channels"
 CONF_SIGNAL = "signal"
+CONF_FIRMWARE_VERSION = "firmware_version"
+CONF_SYNC_HOLD = "sync_hold"
 
 artnet_dmx_ns = cg.esphome_ns.namespace("artnet_dmx")
 ArtnetDMX = artnet_dmx_ns.class_("ArtnetDMX", cg.Component)
@@ -36,6 +40,13 @@ CONFIG_SCHEMA = cv.Schema(
         cv.Optional(CONF_UART_NUM, default=2): cv.int_range(min=0, max=2),
         cv.Optional(CONF_CHANNELS, default=512): cv.int_range(min=24, max=512),
         cv.Optional(CONF_SIGNAL): binary_sensor.binary_sensor_schema(),
+        # Reported in ArtPollReply (VersInfo) -> /api/artnet/nodes; bump it
+        # when reflashing the fleet so stragglers stand out.
+        cv.Optional(CONF_FIRMWARE_VERSION, default=1): cv.int_range(min=0, max=65535),
+        # Buffer ArtDMX until the server's ArtSync so maze-wide changes land
+        # in every room at once ("artsync" in dmx_nodes.json). Harmless with
+        # no sync on the network: the node only holds while syncs arrive.
+        cv.Optional(CONF_SYNC_HOLD, default=False): cv.boolean,
     }
 ).extend(cv.COMPONENT_SCHEMA)
 
@@ -48,6 +59,8 @@ async def to_code(config):
     cg.add(var.set_port(config[CONF_PORT]))
     cg.add(var.set_uart_num(config[CONF_UART_NUM]))
     cg.add(var.set_channels(config[CONF_CHANNELS]))
+    cg.add(var.set_firmware_version(config[CONF_FIRMWARE_VERSION]))
+    cg.add(var.set_sync_hold(config[CONF_SYNC_HOLD]))
     if CONF_SIGNAL in config:
         sens = await binary_sensor.new_binary_sensor(config[CONF_SIGNAL])
         cg.add(var.set_signal_sensor(sens))
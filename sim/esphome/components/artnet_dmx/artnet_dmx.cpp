@@ -1,6 +1,7 @@
 #include "artnet_dmx.h"
 #include "esphome/core/log.h"
 #include "esphome/core/hal.h"
+#include "esphome/core/application.h"
 
 #include <cstring>
 
@@ -11,9 +12,11 @@
 #include <esp_rom_sys.h>
 #include <soc/soc_caps.h>
 #include <lwip/sockets.h>
+#include <unistd.h>
 #else
 #include <sys/socket.h>
 #include <netinet/in.h>
+#include <arpa/inet.h>
 #include <fcntl.h>
 #include <unistd.h>
 #include <cerrno>
@@ -31,9 +34,16 @@ static const uint32_t DMX_MAB_US = 12;
 // 250kbaud, so the wire itself caps us just under 44Hz; the task re-clocks
 // the LAST RECEIVED frame forever — WiFi loss holds the look, never blackout.
 static const uint32_t DMX_FRAME_MS = 23;
+// sync_hold: hold ArtDMX for ArtSync only while syncs are actually arriving
+// (Art-Net: 4s without one = back to latching on receipt). The server sends
+// its sync right after the fanout, so anything still pending after
+// SYNC_LATE_MS was a heartbeat or lost its sync — latch it anyway.
+static const uint32_t SYNC_MODE_MS = 4000;
+static const uint32_t SYNC_LATE_MS = 100;
 
 void ArtnetDMX::setup() {
   memset(this->frame_, 0, sizeof(this->frame_));
+  memset(this->pending_, 0, sizeof(this->pending_));
 
   this->sock_ = ::socket(AF_INET, SOCK_DGRAM, 0);
   if (this->sock_ < 0) {
@@ -90,10 +100,24 @@ void ArtnetDMX::drain_udp_() {
   // A few packets per pass: the server bursts 44Hz while effects animate.
   uint8_t buf[18 + 512];
   for (int i = 0; i < 8; i++) {
-    int n = ::recv(this->sock_, (char *) buf, sizeof(buf), 0);
-    if (n < 18)
+    struct sockaddr_in from;
+    socklen_t from_len = sizeof(from);
+    int n = ::recvfrom(this->sock_, (char *) buf, sizeof(buf), 0, (struct sockaddr *) &from, &from_len);
+    if (n < 12)
       break;
-    if (memcmp(buf, "Art-Net\0", 8) != 0 || buf[8] != 0x00 || buf[9] != 0x50)
+    if (memcmp(buf, "Art-Net\0", 8) != 0)
+      continue;
+    if (buf[8] == 0x00 && buf[9] == 0x20) {  // OpPoll: the server's discovery
+      this->send_poll_reply_(from);
+      continue;
+    }
+    if (buf[8] == 0x00 && buf[9] == 0x52) {  // OpSync: present what we hold
+      this->last_sync_ms_ = millis();
+      this->synced_ = true;
+      this->latch_pending_();
+      continue;
+    }
+    if (n < 18 || buf[8] != 0x00 || buf[9] != 0x50)
       continue;  // not ArtDMX
     uint16_t universe = buf[14] | (buf[15] << 8);
     if (universe != this->universe_)
@@ -103,10 +127,74 @@ void ArtnetDMX::drain_udp_() {
       dlen = n - 18;
     if (dlen > 512)
       dlen = 512;
-    memcpy(this->frame_ + 1, buf + 18, dlen);  // short packet = leading channels
-    this->last_packet_ms_ = millis();
+    // Short packet = leading channels only; the rest of frame_ holds. The
+    // server's windowed mode relies on this: it sends each node ch 1..its
+    // room's last address, never the full 512.
+    uint32_t now = millis();
+    if (this->sync_hold_ && this->synced_ && now - this->last_sync_ms_ < SYNC_MODE_MS) {
+      memcpy(this->pending_ + 1, buf + 18, dlen);
+      if (dlen > this->pending_len_)
+        this->pending_len_ = dlen;
+      if (this->pending_ms_ == 0)
+        this->pending_ms_ = now | 1;
+    } else {
+      this->synced_ = false;
+      memcpy(this->frame_ + 1, buf + 18, dlen);
+      memcpy(this->pending_ + 1, buf + 18, dlen);  // keep the mirror current
+    }
+    this->last_packet_ms_ = now;
     this->frames_rx_ = this->frames_rx_ + 1;
   }
+  if (this->pending_len_ > 0 && millis() - this->pending_ms_ >= SYNC_LATE_MS)
+    this->latch_pending_();
+}
+
+void ArtnetDMX::latch_pending_() {
+  if (this->pending_len_ == 0)
+    return;
+  memcpy(this->frame_ + 1, this->pending_ + 1, this->pending_len_);
+  this->pending_len_ = 0;
+  this->pending_ms_ = 0;
+}
+
+void ArtnetDMX::send_poll_reply_(const struct sockaddr_in &to) {
+  // Art-Net 4 ArtPollReply, one output port. The server maps it to a room by
+  // name (artnet_output_manager._Discovery), so the names are what matter:
+  // long = the ESPHome node name, short = it minus "lohp-node-".
+  uint8_t r[239];
+  memset(r, 0, sizeof(r));
+  memcpy(r, "Art-Net\0", 8);
+  r[9] = 0x21;  // OpPollReply, little-endian
+  struct sockaddr_in self;
+  socklen_t self_len = sizeof(self);
+  // Our own address as the poller routes to it: connect-less UDP has no
+  // source, so ask the stack which interface a reply would leave from.
+  int probe = ::socket(AF_INET, SOCK_DGRAM, 0);
+  if (probe >= 0) {
+    if (::connect(probe, (const struct sockaddr *) &to, sizeof(to)) == 0 &&
+        ::getsockname(probe, (struct sockaddr *) &self, &self_len) == 0)
+      memcpy(r + 10, &self.sin_addr.s_addr, 4);
+    ::close(probe);
+  }
+  r[14] = this->port_ & 0xFF;  // port, little-endian
+  r[15] = this->port_ >> 8;
+  r[16] = this->firmware_version_ >> 8;
+  r[17] = this->firmware_version_ & 0xFF;
+  r[18] = (this->universe_ >> 8) & 0x7F;  // NetSwitch
+  r[19] = (this->universe_ >> 4) & 0x0F;  // SubSwitch
+  const std::string &name = App.get_name();
+  std::string short_name = name.rfind("lohp-node-", 0) == 0 ? name.substr(10) : name;
+  strncpy((char *) r + 26, short_name.c_str(), 17);
+  strncpy((char *) r + 44, name.c_str(), 63);
+  uint32_t now = millis();
+  bool sig = this->frames_rx_ > 0 && (now - this->last_packet_ms_) < 5000;
+  snprintf((char *) r + 108, 64, "#0001 [%u] %s", (unsigned) this->frames_rx_,
+           sig ? "signal" : "holding");
+  r[173] = 1;                      // NumPorts
+  r[174] = 0x80;                   // port 0: DMX512 output
+  r[182] = sig ? 0x80 : 0x00;      // GoodOutput: data being transmitted
+  r[190] = this->universe_ & 0x0F;  // SwOut
+  ::sendto(this->sock_, (const char *) r, sizeof(r), 0, (const struct sockaddr *) &to, sizeof(to));
 }
 
 #ifdef USE_ESP_IDF
@@ -152,7 +240,9 @@ void ArtnetDMX::loop() {
 
 void ArtnetDMX::dump_config() {
   ESP_LOGCONFIG(TAG, "Art-Net DMX out:");
-  ESP_LOGCONFIG(TAG, "  Universe %u on UDP :%u", this->universe_, this->port_);
+  ESP_LOGCONFIG(TAG, "  Universe %u on UDP :%u (answers ArtPoll, firmware %u)", this->universe_,
+                this->port_, this->firmware_version_);
+  ESP_LOGCONFIG(TAG, "  Hold for ArtSync: %s", YESNO(this->sync_hold_));
   ESP_LOGCONFIG(TAG, "  DMX TX: GPIO%u via UART%u, %u channels%s", this->tx_pin_,
                 this->uart_num_, this->channels_, this->uart_ok_ ? "" : " (UART DISABLED)");
 }
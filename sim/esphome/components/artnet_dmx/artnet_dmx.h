@@ -20,9 +20,13 @@ class ArtnetDMX : public Component {
   void set_uart_num(uint8_t num) { this->uart_num_ = num; }
   void set_channels(uint16_t channels) { this->channels_ = channels; }
   void set_signal_sensor(binary_sensor::BinarySensor *s) { this->signal_sensor_ = s; }
+  void set_firmware_version(uint16_t version) { this->firmware_version_ = version; }
+  void set_sync_hold(bool hold) { this->sync_hold_ = hold; }
 
  protected:
   void drain_udp_();
+  void send_poll_reply_(const struct sockaddr_in &to);
+  void latch_pending_();
 
   int sock_{-1};
   uint8_t tx_pin_{6};
@@ -30,11 +34,20 @@ class ArtnetDMX : public Component {
   uint16_t universe_{0};
   uint16_t port_{6454};
   uint16_t channels_{512};
+  uint16_t firmware_version_{1};
+  bool sync_hold_{false};
   binary_sensor::BinarySensor *signal_sensor_{nullptr};
 
   // frame_[0] = DMX start code 0, then 512 slots. Written only by the task
   // that also transmits (IDF) / by loop() (host), so no cross-thread buffer.
   uint8_t frame_[513];
+  // sync_hold: ArtDMX lands here and waits for ArtSync (or SYNC_LATE_MS).
+  // Same task as frame_, so a latch is a plain memcpy.
+  uint8_t pending_[513];
+  uint16_t pending_len_{0};  // channels waiting; 0 = nothing pending
+  uint32_t pending_ms_{0};
+  uint32_t last_sync_ms_{0};
+  bool synced_{false};       // an ArtSync seen within SYNC_MODE_MS
   volatile uint32_t last_packet_ms_{0};
   volatile uint32_t frames_rx_{0};
   uint32_t frames_logged_{0};
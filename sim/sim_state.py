@@ -6,11 +6,13 @@ atomic under the GIL, and readers only ever need "the latest frame".
 """
 import time
 
-# Raw DMX channels 1..352 (44 fixtures x 8 channels: 20 maze pars/spots + the
-# 24 Camp Sign zones), exactly what the FTDI interface would put on the wire
-# after the start code. Placeholder until the first real frame is published —
-# keep the size in sync with main.py NUM_FIXTURES.
-latest_frame = bytes(352)
+# Raw DMX channels 1..N (20 maze pars/spots + the 24 Camp Sign zones, packed
+# by their light_config.json addresses and model footprints — ch 1-350 today),
+# exactly what the FTDI interface would put on the wire after the start code.
+# A patch past one universe continues flat: universe u's channel c is at
+# u*512 + c - 1 (the DMX state's layout).
+# Placeholder until the first real frame is published.
+latest_frame = bytes(350)
 frame_seq = 0
 started_at = time.time()
 
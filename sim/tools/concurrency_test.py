@@ -4,7 +4,8 @@
 Simulates many people in the maze pushing buttons and tripping sensors at
 once, and checks the invariants that used to break:
 
-  1. same-room trigger storm: every POST succeeds, and the *last* audio
+  1. same-room trigger storm: every POST succeeds, the storm is coalesced
+     into fewer takeovers (triggers.json "admission"), and the *last* audio
      command a unit receives for the room is a play (a stale stop must never
      kill the newest effect's audio)
   2. after the storm the theme animates the room's fixture again (no leaked
@@ -103,6 +104,7 @@ async def main():
 
     print("1) same-room trigger storm (6 rapid triggers, Entrance)")
     unit.messages.clear()
+    before = get('/api/trigger_admission')['counts'].get('Entrance', {})
     reqs = []
     for i in range(6):
         effect = 'Lightning' if i % 2 else 'WrongAnswer'
@@ -113,8 +115,11 @@ async def main():
           f'({[s for s, _ in results]})')
     await asyncio.sleep(0.5)  # let any straggler commands arrive
     seq = unit.for_room('Entrance')
-    check('unit got play commands', sum(1 for t, _ in seq if t == 'play_effect_audio') >= 6,
-          f'({len(seq)} audio commands)')
+    plays = sum(1 for t, _ in seq if t == 'play_effect_audio')
+    check('storm coalesced into fewer plays', 1 <= plays < 6, f'({plays} plays, {len(seq)} audio commands)')
+    after = get('/api/trigger_admission')['counts'].get('Entrance', {})
+    folded = sum(after.get(k, 0) - before.get(k, 0) for k in ('coalesced', 'throttled', 'ignored', 'extended'))
+    check('admission counted the folded triggers', folded == 6 - plays, f'({after})')
     check('last audio command is a play (newest effect keeps its audio)',
           bool(seq) and seq[-1][0] == 'play_effect_audio', f'(last={seq[-1] if seq else None})')
 
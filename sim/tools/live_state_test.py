@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""Unit test for the control panel's live state stream (live_state.py). No
+server needed:
+
+  1. merge_patch: changed keys only, a removed key as null, lists whole
+  2. three subscribers get the same snapshot, then the same delta — each
+     encoded once, not once per subscriber
+
+Run: sim/.venv/bin/python sim/tools/live_state_test.py   (from the repo root)
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from live_state import LiveState, merge_patch  # noqa: E402
+
+FAILS = []
+
+
+def check(name, ok, detail=''):
+    print(f"  {'PASS' if ok else 'FAIL'}  {name} {detail}")
+    if not ok:
+        FAILS.append(name)
+
+
+async def run():
+    patch = merge_patch({'rooms': {'A': {'effect_name': 'L'}, 'B': None}, 'theme': 'x'},
+                        {'rooms': {'A': {'effect_name': 'W'}, 'B': None}, 'clients': []})
+    check("merge patch: changed keys, removed as null, lists whole",
+          patch == {'rooms': {'A': {'effect_name': 'W'}}, 'theme': None, 'clients': []}, patch)
+
+    data = {'theme': 'x'}
+
+    async def collect():
+        return dict(data)
+
+    live = LiveState(collect, tick=0.02)
+    streams = [live.subscribe() for _ in range(3)]
+    snapshots = [await stream.__anext__() for stream in streams]
+    data['theme'] = 'y'
+    deltas = [await stream.__anext__() for stream in streams]
+    for stream in streams:
+        await stream.aclose()
+    check("every subscriber shares one snapshot and one delta",
+          all(event is snapshots[0] for event in snapshots) and all(event is deltas[0] for event in deltas))
+    check("delta is the merge patch as an SSE event",
+          deltas[0] == b'event: delta\nid: 2\ndata: {"theme":"y"}\n\n', deltas[0])
+    check("two encodes for three subscribers", live.encodes == 2, f"({live.encodes})")
+
+
+def main():
+    asyncio.run(run())
+    print(f"\n{'ALL PASS' if not FAILS else f'FAILURES: {FAILS}'}")
+    sys.exit(1 if FAILS else 0)
+
+
+if __name__ == '__main__':
+    main()
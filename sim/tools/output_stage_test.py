@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Unit test for the output stage (output_stage.py): grand master, room
+submasters, dimmer curves and channel caps between the DMX state and every
+output. No server or hardware needed:
+
+  1. an identity stage passes the frame through untouched
+  2. grand master + a cap land in the shared snapshot, and a stage change
+     re-sends every fixture
+  3. a room submaster and a model's dimmer curve apply per fixture
+  4. writers keep their raw levels (the stage is output-side only)
+  5. update() with one bad entry applies nothing
+
+Run: sim/.venv/bin/python sim/tools/output_stage_test.py   (from the repo root)
+"""
+import sys
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_DIR))
+from dmx_state_manager import DMXStateManager  # noqa: E402
+from light_config_manager import ShowModel  # noqa: E402
+from output_stage import OutputStage  # noqa: E402
+
+FAILS = []
+
+
+def check(name, ok, detail=''):
+    print(f"  {'PASS' if ok else 'FAIL'}  {name} {detail}")
+    if not ok:
+        FAILS.append(name)
+
+
+def run():
+    show = ShowModel.load(str(REPO_DIR / 'light_config.json'))
+    stage = OutputStage(show)
+    state = DMXStateManager.from_show(show, stage)
+    state.update_fixture(0, [255, 255, 0, 0, 255, 0, 0, 0])
+    frame = state.snapshot()
+    check("identity stage passes the frame through",
+          frame[:8] == bytes([255, 255, 0, 0, 255, 0, 0, 0]), list(frame[:8]))
+
+    gen, _ = state.changes_since(-1)
+    stage.set_grand_master(0.5)
+    stage.set_cap('w_dimming', 100)
+    check("grand master halves intensity, cap holds white at 100",
+          state.snapshot()[:8] == bytes([128, 255, 0, 0, 100, 0, 0, 0]), list(state.snapshot()[:8]))
+    check("a stage change re-sends every fixture",
+          state.changes_since(gen)[1] == list(range(len(show.fixtures))))
+
+    stage.set_submaster('Entrance', 0.0)
+    stage.set_curve(show.fixture_models[1], 'square')
+    state.update_fixture(1, [255] * 8)
+    check("submaster blacks its room; square curve on the next model",
+          state.snapshot()[0] == 0 and state.snapshot()[8] == 64, list(state.snapshot()[:9]))
+    check("writers keep raw levels", state.get_fixture_state(0)[:5] == [255, 255, 0, 0, 255])
+
+    before = stage.settings()
+    try:
+        stage.update(grand_master=1.0, submasters={'Nowhere': 0.5})
+        rejected = False
+    except ValueError:
+        rejected = True
+    check("update() with an unknown room raises and applies nothing",
+          rejected and stage.settings() == before)
+
+
+def main():
+    run()
+    print(f"\n{'ALL PASS' if not FAILS else f'FAILURES: {FAILS}'}")
+    sys.exit(1 if FAILS else 0)
+
+
+if __name__ == '__main__':
+    main()
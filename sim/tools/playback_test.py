@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""Offline test of effect playback: the real EffectsManager (compositor,
+runs, admission) over a stub RemoteHostManager that records audio commands
+instead of reaching clients. No server, sim or hardware needed; the
+compositor's thread isn't started — each check renders the ticks it needs.
+
+  1. compositor ownership: a takeover hands the room's fixtures to the new
+     run at the next tick; the replaced run releasing late can't undo it; a
+     released room with no theme is blacked out once, then left alone
+  2. run states: completed, superseded, stopped (audio_stop sent), failed
+     (with the error), and a cancel that lands before the task first runs;
+     an all-rooms run superseded in one room keeps running in the rest
+  3. trigger admission: ignore and extend (lights replayed, same run),
+     coalesce within the window, throttle the same effect even after it
+     completed; a trigger after stop_effect, or after an all-rooms run
+     superseded the room's run, is admitted — not folded into the ended run
+  4. theme crossfade: from dark starts at zero, blends from the old theme
+     to the new; a swap during a fade freezes the last picture instead of
+     nesting (the fading-in run is no longer advanced); a swap after the
+     fade ended blends from the live run
+
+Run: sim/.venv/bin/python sim/tools/playback_test.py   (from the repo root)
+"""
+import asyncio
+import logging
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+REPO_DIR = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_DIR))
+from dmx_state_manager import DMXStateManager  # noqa: E402
+from effects_manager import EffectsManager  # noqa: E402
+from light_config_manager import LightConfigManager  # noqa: E402
+from theme_manager import ThemeManager  # noqa: E402
+from trigger_admission import TriggerAdmission  # noqa: E402
+
+FAILS = []
+ROOM = 'Entrance'
+
+
+def check(name, ok, detail=''):
+    print(f"  {'PASS' if ok else 'FAIL'}  {name} {detail}")
+    if not ok:
+        FAILS.append(name)
+
+
+class StubRemoteHosts:
+    """The RemoteHostManager calls EffectsManager makes, recorded."""
+    def __init__(self):
+        self.commands = []      # (room or None, command[, effect name])
+        self.failing = set()    # effect names whose audio dispatch raises
+
+    async def play_effect_audio(self, effect_name, rooms=None, audio_params=None, trace=None):
+        if effect_name in self.failing:
+            raise RuntimeError(f"no audio for {effect_name}")
+        self.commands.append((rooms[0] if rooms else None, 'play', effect_name))
+        return True
+
+    async def send_audio_command(self, room, command, data=None, trace=None):
+        self.commands.append((room, command))
+        return True
+
+
+def make_manager(policy=None):
+    lights = LightConfigManager(str(REPO_DIR / 'light_config.json'))
+    hosts = StubRemoteHosts()
+    manager = EffectsManager(lights, DMXStateManager.from_show(lights.show), hosts, None,
+                             admission=TriggerAdmission(policy))
+    return manager, hosts
+
+
+def effect(level, duration):
+    """An ad-hoc effect holding total_dimming at ``level`` for ``duration`` seconds."""
+    steps = [{'time': t, 'channels': {'total_dimming': level}} for t in (0.0, duration)]
+    return {'duration': duration, 'steps': steps, 'audio': {}}
+
+
+def levels(manager, room=ROOM):
+    """total_dimming of every fixture in ``room``, as written to the state."""
+    state = manager.dmx_state_manager
+    return {state.get_fixture_state(i)[0] for i in manager.light_config_manager.show.fixture_ids(room)}
+
+
+async def started(manager, room, name, effect_data):
+    """start_effect_in_room, then let the new task reach the compositor."""
+    run, message = await manager.start_effect_in_room(room, name, effect_data)
+    await asyncio.sleep(0)
+    return run, message
+
+
+async def compositor_ownership():
+    manager, _ = make_manager()
+    compositor = manager.compositor
+    fixtures = manager.light_config_manager.show.fixture_ids(ROOM)
+    first, _ = await started(manager, ROOM, 'Low', effect(60, 30.0))
+    replaced = manager.room_timelines[ROOM]
+    compositor.render(time.monotonic())
+    check("a playing effect owns its room's fixtures",
+          levels(manager) == {60} and all(compositor.owners[i] is replaced for i in fixtures))
+
+    second, _ = await started(manager, ROOM, 'High', effect(200, 30.0))
+    timeline = manager.room_timelines[ROOM]
+    compositor.render(time.monotonic())
+    check("a takeover shows the new run at the next tick",
+          levels(manager) == {200} and all(compositor.owners[i] is timeline for i in fixtures)
+          and first.state == 'superseded', first.state)
+    compositor.release(replaced)
+    check("the replaced run releasing late leaves the takeover",
+          all(compositor.owners.get(i) is timeline for i in fixtures))
+
+    await manager.stop_effect_in_room(ROOM)
+    compositor.render(time.monotonic())
+    check("a released room with no theme is blacked out", levels(manager) == {0} and not compositor.owners)
+    generation = manager.dmx_state_manager.generation
+    compositor.render(time.monotonic())
+    check("...once, then left alone", manager.dmx_state_manager.generation == generation)
+
+
+async def run_states():
+    manager, hosts = make_manager()
+    done, _ = await started(manager, ROOM, 'Short', effect(90, 0.05))
+    check("a run that plays out is completed",
+          await done.wait(2) == 'completed' and manager.runs.get(done.run_id) is done)
+
+    old, _ = await started(manager, ROOM, 'Long', effect(90, 30.0))
+    new, _ = await started(manager, ROOM, 'Other', effect(120, 30.0))
+    check("a takeover supersedes the running run",
+          old.state == 'superseded' and old.finished is not None and new.state == 'running')
+    await manager.stop_effect_in_room(ROOM)
+    check("stop_effect ends it stopped and silences the room",
+          new.state == 'stopped' and hosts.commands[-1] == (ROOM, 'audio_stop'))
+
+    hosts.failing.add('Broken')
+    broken, _ = await started(manager, ROOM, 'Broken', effect(90, 30.0))
+    check("a crash in the run is failed, with its error",
+          await broken.wait(2) == 'failed' and broken.error == "no audio for Broken", broken.error)
+
+    hook_calls = []
+    manager.register_effect_hooks('Early', on_start=hook_calls.append)
+    early, _ = await manager.start_effect_in_room(ROOM, 'Early', effect(90, 30.0))
+    await manager.stop_effect_in_room(ROOM)      # before the task's first step
+    check("a cancel before the task runs still ends the run",
+          early.state == 'stopped' and early.done.is_set() and not hook_calls
+          and manager.runs.get(early.run_id) is early)
+
+    everywhere, _ = await manager.start_effect_in_all_rooms('Lightning')
+    await asyncio.sleep(0)
+    await started(manager, ROOM, 'Other', effect(120, 30.0))
+    others = {state for room, state in everywhere.rooms.items() if room != ROOM}
+    check("a single-room takeover supersedes an all-rooms run in that room only",
+          everywhere.rooms[ROOM] == 'superseded' and others == {'running'} and everywhere.state == 'running')
+    await manager.stop_current_effect()
+    check("...and once every room has ended, the run reads superseded",
+          everywhere.state == 'superseded' and hosts.commands[-1] == (None, 'audio_stop'), everywhere.state)
+
+
+ADMISSION = {'coalesce_window': 0.5, 'min_retrigger_interval': 5.0,
+             'effects': {'Hold': {'same_effect': 'ignore'}, 'Stretch': {'same_effect': 'extend'}},
+             'rooms': {'Cop Dodge': {'coalesce_window': 0.0}}}
+
+
+async def admission():
+    manager, hosts = make_manager(ADMISSION)
+    held, _ = await started(manager, ROOM, 'Hold', effect(90, 30.0))
+    again, message = await started(manager, ROOM, 'Hold', effect(90, 30.0))
+    check("same effect under 'ignore' keeps the running run",
+          again is held and 'ignored' in message and held.state == 'running', message)
+    other, message = await started(manager, ROOM, 'Other', effect(120, 30.0))
+    check("another effect inside the coalesce window folds into the run",
+          other is held and 'coalesced' in message and held.state == 'running', message)
+
+    stretched, _ = await started(manager, 'Gate', 'Stretch', effect(90, 30.0))
+    timeline = manager.room_timelines['Gate']
+    start = timeline.start
+    plays = len(hosts.commands)
+    again, message = await started(manager, 'Gate', 'Stretch', effect(90, 30.0))
+    check("same effect under 'extend' replays the lights in the same run, no audio",
+          again is stretched and 'extended' in message and timeline.start > start
+          and manager.room_timelines['Gate'] is timeline and len(hosts.commands) == plays, message)
+
+    short, _ = await started(manager, 'Cop Dodge', 'Short', effect(90, 0.05))
+    await short.wait(2)
+    again, message = await started(manager, 'Cop Dodge', 'Short', effect(90, 0.05))
+    check("the same effect again within min_retrigger_interval is throttled, even once completed",
+          again is short and 'throttled' in message, message)
+
+    await manager.stop_effect_in_room(ROOM)
+    after, message = await started(manager, ROOM, 'Other', effect(120, 30.0))
+    check("a trigger right after stop_effect is admitted, not folded into the stopped run",
+          after is not held and after.state == 'running' and held.state == 'stopped', message)
+
+    room = 'Sparkle Pony Room'
+    first, _ = await started(manager, room, 'First', effect(90, 30.0))
+    everywhere, _ = await manager.start_effect_in_all_rooms('Lightning')
+    await asyncio.sleep(0)
+    after, message = await started(manager, room, 'Second', effect(120, 30.0))
+    check("a trigger after an all-rooms supersede is admitted",
+          after not in (first, everywhere) and after.state == 'running' and first.state == 'superseded', message)
+    counts = manager.admission.counts
+    check("every outcome counted", counts[ROOM]['ignored'] == counts[ROOM]['coalesced'] == 1
+          and counts['Gate']['extended'] == counts['Cop Dodge']['throttled'] == 1, dict(counts))
+    await manager.stop_current_effect()
+
+
+async def theme_crossfade():
+    manager, _ = make_manager()
+    themes = ThemeManager(manager.dmx_state_manager, manager.light_config_manager)
+    first, second, third = themes.theme_list[:3]
+    await themes.set_current_theme_async(first, crossfade=2.0)
+    run_a, fade = themes._active
+    themes.render(run_a.start)
+    check("a crossfade from dark starts at zero", fade[0] is None and not themes._last_frame.any())
+
+    await themes.set_current_theme_async(first)
+    run_a = themes._active[0]
+    await themes.set_current_theme_async(second, crossfade=2.0)
+    run_b, fade = themes._active
+    layout = themes._layout
+    themes.render(run_b.start)
+    check("a swap blends from the old theme's run...",
+          fade[0] is run_a and np.array_equal(themes._last_frame, themes._run_frame(run_a, run_b.start, layout)))
+    themes.render(run_b.start + 2.0)
+    check("...to the new one once the fade is over",
+          np.array_equal(themes._last_frame, themes._run_frame(run_b, run_b.start + 2.0, layout)))
+
+    frozen = themes._last_frame
+    keyframes = run_b.keyframes
+    await themes.set_current_theme_async(third, crossfade=2.0)
+    run_c, fade = themes._active
+    themes.render(run_c.start)
+    starts_frozen = np.array_equal(themes._last_frame, frozen)
+    themes.render(run_c.start + 1.0)
+    check("a swap during a fade blends from the frozen picture, not nesting",
+          fade[0] is frozen and starts_frozen and run_b.keyframes is keyframes)
+
+    await themes.set_current_theme_async(first, crossfade=0.01)
+    run_a = themes._active[0]
+    await asyncio.sleep(0.02)
+    await themes.set_current_theme_async(second, crossfade=2.0)
+    check("a swap after the fade ended blends from the live run", themes._active[1][0] is run_a)
+
+
+async def run():
+    await compositor_ownership()
+    await run_states()
+    await admission()
+    await theme_crossfade()
+
+
+def main():
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(run())
+    print(f"\n{'ALL PASS' if not FAILS else f'FAILURES: {FAILS}'}")
+    sys.exit(1 if FAILS else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""Unit test for the shared-memory DMX frame the output process reads
+(shared_universe.py). No server or hardware needed:
+
+  1. a SharedStateReader sees what the writer's DMXStateManager commits:
+     snapshot, per-universe frames, changes_since globally and per universe
+  2. seqlock + CRC: a copy taken mid-write (odd seq) and a torn body (CRC
+     mismatch) are both rejected, and the writer's next publish — landing
+     while the reader yields — is the copy kept
+  3. a writer stuck mid-publish: the read gives up after READ_ATTEMPTS and
+     resends the last good frame
+  4. a real ArtNetOutputManager runs over the reader, as in the output
+     process: frames and changes reach a loopback node, on its own thread too
+
+Run: sim/.venv/bin/python sim/tools/shared_universe_test.py   (from the repo root)
+"""
+import logging
+import socket
+import struct
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from artnet import parse_artdmx  # noqa: E402
+from artnet_output_manager import ArtNetOutputManager, _Target  # noqa: E402
+from dmx_state_manager import DMXStateManager  # noqa: E402
+from shared_universe import SharedStateReader, SharedUniverse  # noqa: E402
+
+FAILS = []
+
+
+def check(name, ok, detail=''):
+    print(f"  {'PASS' if ok else 'FAIL'}  {name} {detail}")
+    if not ok:
+        FAILS.append(name)
+
+
+def run(state, shared):
+    reader = SharedStateReader(shared.layout)
+    try:
+        check("reader snapshot matches the writer's",
+              reader.snapshot() == state.snapshot() and reader.universes == 2)
+        gen, _ = reader.changes_since(-1)
+        state.update_fixture(2, [7, 8, 9, 10])
+        check("changes_since matches, globally and per universe",
+              reader.changes_since(gen) == state.changes_since(gen) == (gen + 1, [2])
+              and reader.changes_since(gen + 1, universe=0) == state.changes_since(gen + 1, universe=0))
+        check("universe frames match and are cached until they change",
+              reader.universe(1) == state.universe(1) and reader.universe(1) is reader.universe(1))
+    finally:
+        reader.close()
+
+    # The reader yields between attempts; here each yield lets the writer
+    # publish the next frame, as the server would while the reader waits.
+    fixture = iter([[1, 2, 3, 4], [5, 6, 7, 8]])
+    reader = SharedStateReader(shared.layout, sleep=lambda _: state.update_fixture(2, next(fixture)))
+    try:
+        reader.snapshot()
+        struct.pack_into('<Q', shared.shm.buf, 0, shared._seq + 1)       # mid-write: odd seq
+        check("a copy taken mid-write is rejected, the next publish kept",
+              reader.snapshot() == state.snapshot() and reader.torn_reads == 1)
+        shared.shm.buf[-1] ^= 0xFF                                       # a torn body: CRC mismatch
+        struct.pack_into('<Q', shared.shm.buf, 0, shared._seq + 2)
+        check("a torn body (CRC mismatch) is rejected, the next publish kept",
+              reader.snapshot() == state.snapshot() and reader.torn_reads == 2)
+        check("no read gave up", reader.snapshot()[600:604] == bytes([5, 6, 7, 8]) and not reader.failed_reads)
+    finally:
+        reader.close()
+
+    reader = SharedStateReader(shared.layout, sleep=lambda _: None)
+    try:
+        good = reader.snapshot()
+        struct.pack_into('<Q', shared.shm.buf, 0, shared._seq + 1)       # writer stuck mid-publish
+        stuck = [reader.snapshot() for _ in range(2)]
+        check("a stuck writer: reads give up and resend the last good frame",
+              stuck == [good, good] and reader.failed_reads == 2, f"({reader.torn_reads} torn reads)")
+    finally:
+        struct.pack_into('<Q', shared.shm.buf, 0, shared._seq)
+        reader.close()
+
+    # The output process's sink, unchanged, over the reader
+    reader = SharedStateReader(shared.layout)
+    node = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    node.bind(('127.0.0.1', 0))
+    node.settimeout(1.0)
+    sink = ArtNetOutputManager(reader, [_Target('node', '127.0.0.1', node.getsockname()[1],
+                                                universes={0: (None, 512), 1: (None, 92)})], universe=0)
+    try:
+        check("reader generation follows the writer", reader.generation == state.generation)
+        sink.send_frame()
+        frames = dict((p[1], p[2]) for p in (parse_artdmx(node.recv(2048)) for _ in range(2)))
+        check("Art-Net sink sends the reader's universes",
+              sorted(frames) == [0, 1] and all(frames[u][:len(state.universe(u))] == state.universe(u)
+                                               for u in frames))
+        sink.start()
+        state.update_fixture(0, [9] * 8)
+        deadline, data = time.monotonic() + 1.0, None
+        while time.monotonic() < deadline and (data is None or data[:8] != bytes([9] * 8)):
+            _, universe, data = parse_artdmx(node.recv(2048))
+        time.sleep(0.1)
+        check("Art-Net sink thread delivers a change and keeps running",
+              data is not None and data[:8] == bytes([9] * 8) and sink.is_alive())
+    finally:
+        if sink.is_alive():
+            sink.stop()
+            sink.join(timeout=2)
+        else:
+            sink.sock.close()
+        node.close()
+        reader.close()
+
+
+def main():
+    logging.basicConfig(level=logging.WARNING)
+    state = DMXStateManager(3, 8, slots=[(0, 8), (508, 8), (600, 4)])
+    shared = SharedUniverse.from_state(state)
+    try:
+        state.share(shared)
+        run(state, shared)
+    finally:
+        shared.close()
+    print(f"\n{'ALL PASS' if not FAILS else f'FAILURES: {FAILS}'}")
+    sys.exit(1 if FAILS else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Unit test for the room-node UDP trigger path (udp_triggers.py). No server
+or hardware needed:
+
+  1. wire format: a trigger and an ack round-trip, with and without an effect
+  2. HMAC: a flipped bit, an altered epoch, an unsigned datagram and a
+     truncated one are all refused
+  3. a booted node learns the server epoch from a STALE ack; a retransmission
+     is re-acked without firing again
+  4. a captured datagram replayed after the dedup window, or one from an old
+     epoch, is refused (STALE) and fires nothing
+  5. the tracked-node table stays capped under a flood of node ids
+  6. every run_effect entry in triggers.json compiles to a room and an effect
+
+Run: sim/.venv/bin/python sim/tools/udp_triggers_test.py   (from the repo root)
+"""
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_DIR))
+import udp_triggers  # noqa: E402
+from udp_triggers import (DUPLICATE, OK, STALE, UDPTriggerServer, build_ack,  # noqa: E402
+                          build_trigger, compile_index, parse_ack, parse_trigger)
+
+FAILS = []
+KEY = b'bench-key'
+
+
+def check(name, ok, detail=''):
+    print(f"  {'PASS' if ok else 'FAIL'}  {name} {detail}")
+    if not ok:
+        FAILS.append(name)
+
+
+class FakeEffects:
+    """The EffectsManager calls the server makes; every start is a new run."""
+    def __init__(self):
+        self.started = 0
+
+    def has_effect(self, name):
+        return True
+
+    async def start_effect_in_room(self, room, effect_name, trace=None):
+        self.started += 1
+        return type('Run', (), {'run_id': f'run{self.started}'})(), 'ok'
+
+
+class FakeTransport:
+    def __init__(self):
+        self.acks = []
+
+    def sendto(self, data, addr):
+        self.acks.append(parse_ack(data))
+
+
+def refused(datagram, error):
+    try:
+        parse_trigger(datagram, KEY)
+    except error:
+        return True
+    return False
+
+
+async def run():
+    datagram = build_trigger('entrance-node', 'Entrance LT', 7, key=KEY, epoch=99)
+    check("signed trigger round-trips",
+          parse_trigger(datagram, KEY) == ('entrance-node', 'Entrance LT', '', 99, 7, True))
+    check("effect name round-trips",
+          parse_trigger(build_trigger('n', 's', 1, effect='WrongAnswer'))[2] == 'WrongAnswer')
+    check("ack round-trips",
+          parse_ack(build_ack(7, DUPLICATE, 'a1b2c3d4e5f6', 99)) == (7, DUPLICATE, 'a1b2c3d4e5f6', 99))
+    check("flipped bit, altered epoch, unsigned and truncated datagrams refused",
+          refused(datagram[:-1] + bytes([datagram[-1] ^ 1]), PermissionError)
+          and refused(datagram[:4] + bytes(4) + datagram[8:], PermissionError)
+          and refused(build_trigger('n', 's', 1), PermissionError)
+          and refused(datagram[:9], ValueError))
+
+    effects, transport = FakeEffects(), FakeTransport()
+    server = UDPTriggerServer(effects, {'entrance lt': ('run_effect', 'Entrance', 'Lightning')}, key=KEY)
+    server.connection_made(transport)
+
+    async def send(seq, epoch, node='entrance-node'):
+        server.datagram_received(build_trigger(node, 'Entrance LT', seq, key=KEY, epoch=epoch), ('n', 1))
+        await asyncio.sleep(0)
+        return transport.acks[-1]
+
+    ack = await send(1, 0)
+    check("booted node gets STALE with the server epoch", ack[1:4:2] == (STALE, server.epoch), ack)
+    captured = build_trigger('entrance-node', 'Entrance LT', 1, key=KEY, epoch=server.epoch)
+    first, again = await send(1, server.epoch), await send(1, server.epoch)
+    check("trigger fires once; its retransmission is re-acked",
+          first[:2] == again[:2] == (1, OK) and effects.started == 1)
+    check("next seq fires", (await send(2, server.epoch))[:2] == (2, OK) and effects.started == 2)
+
+    udp_triggers.DEDUP_WINDOW, window = -1.0, udp_triggers.DEDUP_WINDOW  # the window has passed
+    try:
+        server.datagram_received(captured, ('n', 1))
+        await asyncio.sleep(0)
+    finally:
+        udp_triggers.DEDUP_WINDOW = window
+    check("replay after the dedup window refused",
+          transport.acks[-1][:2] == (2, STALE) and effects.started == 2, transport.acks[-1])
+    check("old epoch refused", (await send(9, server.epoch ^ 1))[1] == STALE and effects.started == 2)
+
+    for i in range(udp_triggers.MAX_NODES + 10):
+        await send(1, server.epoch, node=f'flood{i}')
+    nodes = len(server.summary()['nodes'])
+    check("node table capped under a flood", nodes == udp_triggers.MAX_NODES, f"({nodes} nodes)")
+
+    with open(REPO_DIR / 'triggers.json') as f:
+        index = compile_index(json.load(f)['triggers'])
+    check("triggers.json compiles",
+          bool(index) and all(kind != 'run_effect' or (room and effect) for kind, room, effect in index.values()),
+          f"({len(index)} triggers)")
+
+
+def main():
+    asyncio.run(run())
+    print(f"\n{'ALL PASS' if not FAILS else f'FAILURES: {FAILS}'}")
+    sys.exit(1 if FAILS else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -17,6 +17,7 @@ import time
 
 import sim_state
 from artnet import build_artdmx  # repo root — the production packet builder
+from frame_stats import FrameStats
 
 logger = logging.getLogger(__name__)
 
@@ -35,7 +36,11 @@ class DMXOutputManager(threading.Thread):
         self.dmx_state_manager = dmx_state_manager
         self.universe = universe
         self.running = True
-        self._last_frame = None
+        self._generation = -1  # dmx_state_manager generation last published
+        self._flush = threading.Event()  # flush_now(): publish without waiting for the tick
+        self.stats = FrameStats('sim', self.FREQUENCY)
+        self.tracer = None  # latency_trace.LatencyTracer, set by main.py
+        dmx_state_manager.add_flush_listener(self.flush_now)
         self._last_publish = 0.0
         self._artnet_seq = 0
         self._artnet_addr = None
@@ -53,34 +58,51 @@ class DMXOutputManager(threading.Thread):
         # Deadline-based pacing, mirroring the real dmx_interface loop.
         next_frame = time.monotonic()
         while self.running:
+            started = time.monotonic()
             self._send_frame()
+            self.stats.tick(next_frame, started, time.monotonic())
             next_frame += 1 / self.FREQUENCY
-            delay = next_frame - time.monotonic()
-            if delay > 0:
-                time.sleep(delay)
-            else:
+            if next_frame <= time.monotonic():
                 next_frame = time.monotonic()
+                continue
+            while self.running:
+                delay = next_frame - time.monotonic()
+                if delay <= 0 or not self._flush.wait(delay):
+                    break
+                self._flush.clear()
+                self._send_frame()
+
+    def flush_now(self):
+        self._flush.set()
 
     def _send_frame(self):
-        state = self.dmx_state_manager.get_full_state()
-        frame = bytes(max(0, min(255, int(v))) for v in state)
+        seen = self.dmx_state_manager.generation
+        generation, _ = self.dmx_state_manager.changes_since(self._generation)
         now = time.time()
         # Publish on change, with a 1s heartbeat so late-joining clients sync.
-        if frame != self._last_frame or now - self._last_publish >= 1.0:
+        if generation != self._generation or now - self._last_publish >= 1.0:
+            frame = self.dmx_state_manager.snapshot()
             sim_state.publish_frame(frame)
-            self._last_frame = frame
+            self.stats.sent('sim', len(frame))
+            self._generation = generation
             self._last_publish = now
             if self._artnet_sock:
                 self._send_artnet(frame)
+            if self.tracer is not None and self.tracer.pending:
+                self.tracer.frame_sent(seen, time.monotonic())
 
     def _send_artnet(self, frame: bytes):
+        # One ArtDMX per state universe, on port-address self.universe + u.
         self._artnet_seq = self._artnet_seq % 255 + 1  # 1..255, 0 means "disabled"
-        packet = build_artdmx(self._artnet_seq, self.universe, frame,
-                              pad_to=self.DMX_CHANNELS)
-        try:
-            self._artnet_sock.sendto(packet, self._artnet_addr)
-        except OSError as e:
-            logger.warning(f"Art-Net send failed: {e}")
+        for u in range(self.dmx_state_manager.universes):
+            data = frame[u * self.DMX_CHANNELS:(u + 1) * self.DMX_CHANNELS]
+            packet = build_artdmx(self._artnet_seq, self.universe + u, data, pad_to=self.DMX_CHANNELS)
+            try:
+                self._artnet_sock.sendto(packet, self._artnet_addr)
+                self.stats.sent('artnet-mirror', len(packet))
+            except OSError as e:
+                logger.warning(f"Art-Net send failed: {e}")
 
     def stop(self):
         self.running = False
+        self._flush.set()
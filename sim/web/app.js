@@ -28,7 +28,7 @@ const EYE = 1.69;
 
 const S = {
   cfg: null,
-  frame: new Uint8Array(352),
+  frame: new Uint8Array(350),
   seq: -1,
   levelHeight: 3.2,
   fixtures: [],            // {room, addr, channels, level, light, lens, cone, cell}
@@ -1462,7 +1462,8 @@ function buildCampSign(cfg) {
 
   laySide(glyphs.slice(iLogo + 1), 1);
 
-  zones.forEach((z, i) => { z.addr = lights[i] ? lights[i].start_address : null; });
+  // addr indexes the flat frame: universe u's channel c is u*512 + c
+  zones.forEach((z, i) => { z.addr = lights[i] ? (lights[i].universe || 0) * 512 + lights[i].start_address : null; });
   if (lights.length && lights.length !== zones.length) {
     log('err', `camp sign: ${zones.length} zones vs ${lights.length} lights in light_config room "${CS.room}"`);
   }
@@ -1599,11 +1600,11 @@ function buildFixtures(cfg) {
 
       const cell = document.createElement('div');
       cell.className = 'fixture-cell';
-      cell.innerHTML = `<span class="addr">@${f.start_address}</span> ${isSpot ? '🔦 ' : ''}${escapeHtml(room)}${level ? ' ▲' : ''}`;
+      cell.innerHTML = `<span class="addr">@${f.universe ? f.universe + '.' : ''}${f.start_address}</span> ${isSpot ? '🔦 ' : ''}${escapeHtml(room)}${level ? ' ▲' : ''}`;
       grid.appendChild(cell);
 
       S.fixtures.push({
-        room, addr: f.start_address, model: f.model, level, isSpot, wx: x, wz: z,
+        room, addr: (f.universe || 0) * 512 + f.start_address, model: f.model, level, isSpot, wx: x, wz: z,
         channels: cfg.light_models[f.model].channels,
         light, lens, cone, cell,
       });
@@ -3271,7 +3272,7 @@ async function boot() {
   S.cfg = cfg;
   API = `http://${HOST}:${cfg.ports.api}`;
   AUDIO_WS = `ws://${HOST}:${cfg.ports.audio_ws}`;
-  S.frame = new Uint8Array(cfg.num_channels || 352);
+  S.frame = new Uint8Array(cfg.num_channels || 350);
 
   buildMaze(cfg);
   buildFixtures(cfg);
@@ -1,29 +1,97 @@
 import logging
+import os
 import time
-import threading
 import asyncio
-from effect_utils import generate_theme_values
+import numpy as np
+from effect_utils import THEME_CHANNELS, generate_theme_matrix, room_offsets, theme_noise_table
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_KEYFRAME_RATE = 10.0
+MAX_KEYFRAME_RATE = 44.0    # the compositor's output rate: more keyframes than frames is waste
+MAX_CROSSFADE = 60.0        # seconds; longest theme crossfade /api/set_theme accepts
+
+
+def keyframe_rate():
+    """Theme keyframes per second: LOHP_THEME_KEYFRAME_RATE, held to
+    1..MAX_KEYFRAME_RATE (0 or a negative would divide by zero or run the
+    theme clock backwards), else DEFAULT_KEYFRAME_RATE."""
+    value = os.environ.get('LOHP_THEME_KEYFRAME_RATE')
+    if value is None:
+        return DEFAULT_KEYFRAME_RATE
+    try:
+        rate = float(value)
+    except ValueError:
+        logger.warning(f"LOHP_THEME_KEYFRAME_RATE={value!r} is not a number — using {DEFAULT_KEYFRAME_RATE:g}")
+        return DEFAULT_KEYFRAME_RATE
+    clamped = min(MAX_KEYFRAME_RATE, max(1.0, rate)) if rate == rate else DEFAULT_KEYFRAME_RATE  # NaN
+    if clamped != rate:
+        logger.warning(f"LOHP_THEME_KEYFRAME_RATE={value} out of range 1..{MAX_KEYFRAME_RATE:g} — using {clamped:g}")
+    else:
+        logger.info(f"Theme keyframe rate overridden: {rate:g}Hz (LOHP_THEME_KEYFRAME_RATE)")
+    return clamped
+
+
+class _ThemeLayout:
+    """A ShowModel flattened for generate_theme_matrix: the room offset
+    vector, and scatter indices so one fancy assignment maps every room's
+    THEME_CHANNELS onto every fixture's 8 slots (per its light model)."""
+
+    def __init__(self, show):
+        self.show = show
+        self.offsets = room_offsets(len(show.rooms))
+        self.noise_stride = np.arange(len(show.rooms)) * 97  # rooms read apart in the noise table
+        self.fixture_ids = [fixture_id for fixture_id, _, _ in show.fixtures]
+        rows, slots, rooms, columns = show.channel_index(THEME_CHANNELS)
+        self.scatter = (rows, slots)
+        self.gather = (rooms, columns)
+
+
+class _ThemeRun:
+    """One theme playing: its parameters, clock and keyframe state. A theme
+    change builds a new run and swaps it in whole, so the render thread sees
+    either the old theme or the new one, never half of each."""
+
+    def __init__(self, name, theme_data, start):
+        self.name = name
+        self.theme_data = theme_data
+        self.start = start  # monotonic
+        self.temporary_values = {}  # live tuning from the control panel
+        self.keyframes = None  # (index, previous, latest, _ThemeLayout): float (fixtures, 8) matrices
+        self.previous_values = None  # (rooms, 5) smoothed channels of the last keyframe
+
+
 class ThemeManager:
-    def __init__(self, dmx_state_manager, light_config_manager, interrupt_handler):
+    """Which theme is current and what it looks like at a given moment.
+
+    Has no thread of its own: frame_compositor.FrameCompositor calls render()
+    on its 44Hz clock. The theme math only runs at ``frequency`` — one
+    keyframe per 1/frequency of theme time — and every tick in between is a
+    linear blend of the last two keyframes, so colour moves smoothly at the
+    output rate. The price is latency: the output trails the theme math by
+    one keyframe period (``interpolation_latency``).
+
+    Changing theme swaps one reference — no thread to stop, no blackout —
+    so the new theme is on the fixtures at the next tick, optionally
+    crossfading from what was showing.
+    """
+
+    def __init__(self, dmx_state_manager, light_config_manager, frequency=None):
         self.dmx_state_manager = dmx_state_manager
         self.light_config_manager = light_config_manager
-        self.interrupt_handler = interrupt_handler
         self.themes = {}
         self.current_theme = None
-        self.theme_thread = None
-        self.stop_event = None  # stop Event of the current theme thread run
-        self.theme_change_lock = asyncio.Lock()
-        self.master_brightness = 1.0
-        self.frequency = 10  # Reduce update rate to 10 Hz
-        self.paused_rooms = set()
+        self._active = None  # (_ThemeRun, fade or None); fade = (outgoing, start, seconds)
+        self._last_frame = None  # the float picture render() last produced
+        # keyframes per second (read here, not at import, so the log sees the override)
+        self.frequency = frequency if frequency is not None else keyframe_rate()
         self.theme_list = []
-        self.previous_values = {}  # Store previous values for smoothing
+        self._layout = None  # _ThemeLayout of the current ShowModel, built on the first theme step
+        self._noise = theme_noise_table()
+        self._step = 0  # theme steps taken; walks the noise table
         self.smoothing_factor = 0.2  # Adjust this value to control smoothing (0.0 to 1.0)
         self.load_themes()  # Load themes when initializing
-        self.temporary_theme_values = {}  # Store temporary theme values
+        self.temporary_theme_values = {}  # the current run's temporary_values
 
     def load_themes(self):
         # Load themes with more dynamic and vibrant settings
@@ -139,67 +207,38 @@ class ThemeManager:
         }
         self.theme_list = list(self.themes.keys())
 
-    async def set_current_theme_async(self, theme_name):
+    async def set_current_theme_async(self, theme_name, crossfade=0.0):
         logger.info(f"Setting theme to: {theme_name}")
         if theme_name not in self.themes:
             logger.warning(f"Theme not found: {theme_name}")
             return False
-        async with self.theme_change_lock:
-            old_theme = self.current_theme
-            await self.stop_current_theme_async()
-            self.current_theme = theme_name
-            # Each run gets its own Event so a stop can never be un-done for a
-            # thread that outlived its join timeout (which would leave two
-            # theme threads writing to the same fixtures).
-            self.stop_event = threading.Event()
-            self.theme_thread = threading.Thread(target=self._run_theme,
-                                                 args=(theme_name, self.stop_event), daemon=True)
-            self.theme_thread.start()
-            self.temporary_theme_values = {}
+        old_theme = self.current_theme
+        self._swap(theme_name, crossfade)
         logger.info(f"Theme changed from {old_theme} to: {theme_name}")
         return True
 
     async def stop_current_theme_async(self):
         if self.current_theme:
             logger.info(f"Stopping current theme: {self.current_theme}")
-            if self.stop_event:
-                self.stop_event.set()
-            if self.theme_thread and self.theme_thread.is_alive():
-                try:
-                    await asyncio.wait_for(asyncio.to_thread(self.theme_thread.join), timeout=5.0)
-                except asyncio.TimeoutError:
-                    logger.warning("Theme thread join timed out after 5 seconds")
-            self.theme_thread = None
+            self._halt()
             self.current_theme = None
             await asyncio.to_thread(self._reset_all_lights)
             logger.info("Theme stopped and lights reset")
 
-    async def set_next_theme_async(self):
+    async def set_next_theme_async(self, crossfade=0.0):
         logger.info("Setting next theme")
         if not self.theme_list:
             logger.warning("No themes available")
             return None
-
         current_index = self.theme_list.index(self.current_theme) if self.current_theme in self.theme_list else -1
-        for i in range(len(self.theme_list)):
-            next_index = (current_index + i + 1) % len(self.theme_list)
-            next_theme = self.theme_list[next_index]
-            if next_theme != self.current_theme:
-                success = await self.set_current_theme_async(next_theme)
-                if success:
-                    logger.info(f"Successfully set next theme to: {next_theme}")
-                    return next_theme
-        
-        logger.error("Failed to set any theme after trying all available themes")
-        return None
+        next_theme = self.theme_list[(current_index + 1) % len(self.theme_list)]
+        self._swap(next_theme, crossfade)
+        logger.info(f"Successfully set next theme to: {next_theme}")
+        return next_theme
 
     def stop_current_theme(self):
         if self.current_theme:
-            if self.stop_event:
-                self.stop_event.set()
-            if self.theme_thread and self.theme_thread.is_alive():
-                self.theme_thread.join(timeout=5)
-            self.theme_thread = None
+            self._halt()
             self.current_theme = None
             self._reset_all_lights()
             logger.info("Current theme stopped and all lights reset")
@@ -208,83 +247,122 @@ class ThemeManager:
         for fixture_id in range(self.dmx_state_manager.num_fixtures):
             self.dmx_state_manager.reset_fixture(fixture_id)
 
-    def _run_theme(self, theme_name, stop_event):
-        theme_data = self.themes[theme_name]
-        logger.info(f"Starting theme: {theme_name}")
-        start_time = time.time()
-        last_update_time = 0
-        try:
-            while not stop_event.is_set():
-                current_time = time.time() - start_time
-                if current_time - last_update_time >= 1 / self.frequency:
-                    self._generate_and_apply_theme_step(theme_data, current_time)
-                    last_update_time = current_time
-                time.sleep(0.001)  # Small sleep to prevent CPU hogging
-        except Exception as e:
-            logger.error(f"Error in theme {theme_name}: {str(e)}", exc_info=True)
-        finally:
-            logger.info(f"Theme {theme_name} stopped")
-
-    def _generate_and_apply_theme_step(self, theme_data, current_time):
-        room_layout = self.light_config_manager.get_room_layout()
-        total_rooms = len(room_layout)
-        all_room_channels = {}
-        for room_index, (room, lights) in enumerate(room_layout.items()):
-            if room not in self.paused_rooms:
-                room_channels = generate_theme_values(theme_data, current_time, self.master_brightness,
-                                                      room_index, total_rooms, self.temporary_theme_values)
-                smoothed_channels = self._smooth_channels(room, room_channels)
-                all_room_channels[room] = smoothed_channels
-                logger.debug(f"Generated channels for room {room}: {smoothed_channels}")
-                self._apply_room_channels(room, lights, smoothed_channels)
+    def _swap(self, theme_name, crossfade=0.0):
+        """Make ``theme_name`` current as of the next render tick. With a
+        ``crossfade`` (seconds) the output blends from whatever was showing —
+        the old theme, a fade still in progress, or dark — to the new one.
+
+        The outgoing side is the old run, live, or — when the old run was
+        itself still fading in — the last picture rendered, frozen, so a
+        swap never nests fades and a burst of swaps costs no more per tick
+        than one."""
+        now = time.monotonic()
+        run = _ThemeRun(theme_name, self.themes[theme_name], now)
+        fade = None
+        if crossfade > 0:
+            outgoing = self._active
+            if outgoing is not None and outgoing[1] is not None:
+                if now - outgoing[1][1] >= outgoing[1][2]:
+                    outgoing = outgoing[0]  # its own fade is over
+                else:
+                    outgoing = self._last_frame
+            elif outgoing is not None:
+                outgoing = outgoing[0]
+            fade = (outgoing, now, crossfade)
+        self.temporary_theme_values = run.temporary_values
+        self.current_theme = theme_name
+        self._active = (run, fade)
+        logger.info(f"Starting theme: {theme_name} ({self.frequency:g}Hz keyframes, "
+                    f"output {self.interpolation_latency * 1000:.0f} ms behind"
+                    + (f", {crossfade:g}s crossfade)" if fade else ")"))
+
+    def _halt(self):
+        self._active = None
+        self._last_frame = None
+        logger.info(f"Theme {self.current_theme} stopped")
+
+    @property
+    def interpolation_latency(self):
+        """Seconds the output trails the theme math: the blend toward a
+        keyframe completes one keyframe period after its theme time."""
+        return 1 / self.frequency
+
+    def render(self, now, skip=()):
+        """fixture_id -> channel row for every themed fixture not in ``skip``
+        (the fixtures an effect holds). Called by the compositor each tick."""
+        active = self._active
+        if active is None:
+            return {}
+        show = self.light_config_manager.show
+        layout = self._layout
+        if layout is None or layout.show is not show:
+            layout = self._layout = _ThemeLayout(show)
+        frame = self._last_frame = self._frame(active, now, layout)
+        matrix = (frame + 0.5).astype(np.uint8)
+        rows = matrix.tobytes()
+        return {fixture_id: rows[i * 8:i * 8 + 8]
+                for i, fixture_id in enumerate(layout.fixture_ids) if fixture_id not in skip}
+
+    def _frame(self, active, now, layout):
+        """The float (fixtures, 8) picture of ``active`` at ``now``: its run,
+        blended over the outgoing picture while a crossfade lasts. The
+        outgoing side is a _ThemeRun, a frozen picture, or None (dark)."""
+        run, fade = active
+        matrix = self._run_frame(run, now, layout)
+        if fade is not None:
+            outgoing, start, seconds = fade
+            mix = (now - start) / seconds
+            if mix < 1:
+                if isinstance(outgoing, _ThemeRun):
+                    before = self._run_frame(outgoing, now, layout)
+                elif outgoing is not None and outgoing.shape == matrix.shape:
+                    before = outgoing
+                else:
+                    before = np.zeros_like(matrix)  # dark, or frozen under a since-reloaded config
+                matrix = before + (matrix - before) * max(0.0, mix)
+        return matrix
+
+    def _run_frame(self, run, now, layout):
+        """Shows theme time ``t - period``, blended from keyframes ``n - 1``
+        and ``n`` where ``n = floor(t / period)`` — keyframe ``n`` is computed
+        on the first tick past its theme time. Keyframes cover every room,
+        held or not, so a room an effect lets go of rejoins the live theme at
+        once instead of blending out of a stale frame. A reloaded light
+        config (a new ``layout``) restarts the blend from a fresh keyframe."""
+        position = max(0.0, now - run.start) * self.frequency
+        index = int(position)
+        keyframes = run.keyframes
+        if keyframes is None or index != keyframes[0] or keyframes[3] is not layout:
+            latest = self._generate_theme_step(run, index / self.frequency, layout)
+            if keyframes is not None and index == keyframes[0] + 1 and keyframes[3] is layout:
+                keyframes = (index, keyframes[2], latest, layout)
             else:
-                logger.debug(f"Room {room} is paused, skipping theme application")
-        
-        if not all_room_channels:
-            logger.warning("No room channels were generated. Check if all rooms are paused or if there's an issue with room layout.")
-        
-        return all_room_channels
-
-    def _smooth_channels(self, room, new_channels):
-        if room not in self.previous_values:
-            self.previous_values[room] = new_channels
-            return new_channels
-
-        smoothed_channels = {}
-        for channel, value in new_channels.items():
-            prev_value = self.previous_values[room].get(channel, value)
-            smoothed_value = prev_value + (value - prev_value) * self.smoothing_factor
-            smoothed_channels[channel] = int(smoothed_value)
-
-        self.previous_values[room] = smoothed_channels
-        return smoothed_channels
-
-    def pause_theme_for_room(self, room):
-        self.paused_rooms.add(room)
-        logger.info(f"Theme paused for room: {room}")
-
-    def resume_theme_for_room(self, room):
-        self.paused_rooms.discard(room)
-        logger.info(f"Theme resumed for room: {room}")
-
-    def _apply_room_channels(self, room, lights, room_channels):
-        for light in lights:
-            start_address = light['start_address']
-            light_model = self.light_config_manager.get_light_config(light['model'])
-            fixture_id = (start_address - 1) // 8
-            if self.interrupt_handler.is_interrupted(fixture_id):
-                logger.debug(f"Fixture {fixture_id} in room {room} is interrupted, skipping update")
-                continue
-            fixture_values = [0] * 8
-            for channel, value in room_channels.items():
-                if channel in light_model['channels']:
-                    channel_offset = light_model['channels'][channel]
-                    fixture_values[channel_offset] = value
-            self.dmx_state_manager.update_fixture(fixture_id, fixture_values)
-
-    def set_master_brightness(self, brightness):
-        self.master_brightness = max(0.0, min(1.0, brightness))
-        logger.info(f"Master brightness set to {self.master_brightness}")
+                keyframes = (index, latest, latest, layout)  # the first keyframe, or a stall skipped some: hold
+            run.keyframes = keyframes
+        _, previous, latest, _ = keyframes
+        return previous + (latest - previous) * (position - index)
+
+    def _generate_theme_step(self, run, current_time, layout):
+        """One keyframe for the whole maze: every room's channels from
+        generate_theme_matrix, smoothed, scattered onto the fixtures' slots.
+        Returns a float (fixtures, 8) matrix in ``layout`` order."""
+        noise = self._noise[(self._step + layout.noise_stride) % len(self._noise)]
+        self._step += 1
+        channels = generate_theme_matrix(run.theme_data, current_time, layout.offsets, noise,
+                                         run.temporary_values)
+        smoothed = self._smooth_channels(run, channels)
+        matrix = np.zeros((len(layout.fixture_ids), 8))
+        matrix[layout.scatter] = np.minimum(np.maximum(smoothed[layout.gather], 0), 255)
+        return matrix
+
+    def _smooth_channels(self, run, channels):
+        """Exponential smoothing toward ``channels``; a run's first keyframe
+        is taken as-is."""
+        previous = run.previous_values
+        if previous is not None and previous.shape == channels.shape:
+            channels = np.trunc(previous + (channels - previous) * self.smoothing_factor)
+        run.previous_values = channels
+        return channels
 
     def get_all_themes(self):
         return self.themes
@@ -3,33 +3,117 @@
 
     python3 tools/artnet_check.py --selftest
         Offline regression: spins a real DMXStateManager + ArtNetOutputManager
-        against a loopback UDP listener and asserts packet format, change-
-        detect bursting, the 1s heartbeat, and multi-target fanout. Run it
-        like sim/tools/concurrency_test.py — no hardware, no server.
+        against a loopback UDP listener and asserts packet format, state
+        clamping/snapshots, change-detect bursting, the 1s heartbeat,
+        multi-target fanout, batched sends (sendmmsg and the sendto
+        fallback), windowed per-node sends, ArtSync emission and
+        hold-until-sync nodes, and ArtPoll discovery.
+        Run it like sim/tools/concurrency_test.py — no hardware, no server.
 
-    python3 tools/artnet_check.py --listen [--port 6454]
+    python3 tools/artnet_check.py --bench
+        Loopback microbenchmark of one send_frame tick (every node dirty) at
+        16, 64 and 256 targets: µs per tick, sendmmsg vs per-node sendto.
+
+    python3 tools/artnet_check.py --listen [--port 6454] [--name lohp-node-entrance] [--sync-hold]
         Be a fake node: decode incoming ArtDMX and print universe/seq/first
         16 channels. Point a dmx_nodes.json entry at this box to verify the
         server side, or run it next to a flashed node to sniff what it sees.
+        With --name it also answers ArtPoll like the ESPHome node does, so the
+        server's discovery maps it to that room (GET /api/artnet/nodes).
+        With --sync-hold it behaves like a node flashed with sync_hold: ArtDMX
+        is buffered and printed when the ArtSync (or the late fallback) latches it.
 """
 import argparse
+import contextlib
 import os
 import socket
 import sys
 import time
 
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from artnet import (ARTNET_PORT, build_artdmx, build_artpoll, build_artpollreply,  # noqa: E402
+                    build_artsync, is_artpoll, is_artsync, parse_artdmx, parse_artpollreply)
+
+SYNC_MODE = 4.0     # mirror artnet_dmx.cpp: hold only while syncs arrive...
+SYNC_LATE = 0.1     # ...and latch an unsynced frame after this anyway
+
+
+class SyncHoldNode:
+    """The frame logic of sim/esphome's artnet_dmx with sync_hold: on — the
+    test double for ArtSync. ``receive`` returns the channel bytes that just
+    went live on the wire (or None while held); ``tick`` runs the late latch."""
+
+    def __init__(self):
+        self.frame = bytearray(512)
+        self.pending = bytearray(512)
+        self.pending_len = 0
+        self.pending_at = None
+        self.last_sync = None
+
+    def receive(self, packet, now):
+        if is_artsync(packet):
+            self.last_sync = now
+            return self._latch()
+        parsed = parse_artdmx(packet)
+        if not parsed:
+            return None
+        data = parsed[2]
+        self.pending[:len(data)] = data
+        if self.last_sync is not None and now - self.last_sync < SYNC_MODE:
+            self.pending_len = max(self.pending_len, len(data))
+            if self.pending_at is None:
+                self.pending_at = now
+            return None
+        self.last_sync = None
+        self.frame[:len(data)] = data
+        return bytes(self.frame)
 
-from artnet import ARTNET_PORT, build_artdmx, parse_artdmx  # noqa: E402
+    def tick(self, now):
+        if self.pending_len and now - self.pending_at >= SYNC_LATE:
+            return self._latch()
+        return None
 
+    def _latch(self):
+        if not self.pending_len:
+            return None
+        self.frame[:self.pending_len] = self.pending[:self.pending_len]
+        self.pending_len, self.pending_at = 0, None
+        return bytes(self.frame)
 
-def listen(port):
+
+def fake_node_reply(sock, name, peer, frames, universe=0):
+    """Answer an ArtPoll from ``peer`` the way sim/esphome's artnet_dmx does."""
+    probe = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    probe.connect(peer)                     # which of our IPs the poller sees
+    ip = probe.getsockname()[0]
+    probe.close()
+    short = name[len('lohp-node-'):] if name.startswith('lohp-node-') else name
+    sock.sendto(build_artpollreply(ip, short, name, firmware=1, universe=universe,
+                                   node_report=f"#0001 [{frames}] fake node"), peer)
+
+
+def listen(port, name=None, sync_hold=False):
     sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
     sock.bind(('0.0.0.0', port))
-    print(f"listening for ArtDMX on :{port} — ctrl-c to stop")
+    print(f"listening for ArtDMX on :{port}"
+          f"{f', answering ArtPoll as {name}' if name else ''}"
+          f"{', holding for ArtSync' if sync_hold else ''} — ctrl-c to stop")
+    if sync_hold:
+        sock.settimeout(SYNC_LATE / 2)
+        hold_node(sock, SyncHoldNode(), name)
     n = 0
     while True:
         packet, addr = sock.recvfrom(2048)
+        if is_artsync(packet):
+            print(f"{addr[0]}: ArtSync")
+            continue
+        if is_artpoll(packet):
+            if name:
+                fake_node_reply(sock, name, addr, n)
+                print(f"{addr[0]}: ArtPoll -> replied as {name}")
+            continue
         parsed = parse_artdmx(packet)
         if not parsed:
             print(f"{addr[0]}: {len(packet)}B non-ArtDMX packet ignored")
@@ -40,9 +124,107 @@ def listen(port):
               f"ch1-16: {' '.join(f'{b:3d}' for b in data[:16])}")
 
 
+def hold_node(sock, node, name=None):
+    """--listen --sync-hold: print each frame when it goes live, and how;
+    with ``name``, answer ArtPoll as listen() does."""
+    n = 0
+    while True:
+        try:
+            packet, addr = sock.recvfrom(2048)
+        except socket.timeout:
+            packet = None
+        if packet and is_artpoll(packet):
+            if name:
+                fake_node_reply(sock, name, addr, n)
+                print(f"{addr[0]}: ArtPoll -> replied as {name}")
+            continue
+        now = time.monotonic()
+        live = node.receive(packet, now) if packet else None
+        how = 'sync' if packet and is_artsync(packet) else 'direct'
+        if live is None:
+            live, how = node.tick(now), 'late'
+        if live is not None:
+            n += 1
+            print(f"#{n} live ({how}) ch1-16: {' '.join(f'{b:3d}' for b in live[:16])}")
+
+
+def drain_raw(s):
+    """Everything queued on a non-blocking socket, as (packet, addr)."""
+    got = []
+    try:
+        while True:
+            got.append(s.recvfrom(2048))
+    except BlockingIOError:
+        return got
+
+
+def bench(ticks=500):
+    from dmx_state_manager import DMXStateManager
+    from artnet_output_manager import ArtNetOutputManager, _BatchSender, _Target
+
+    with listening(1) as (sink,):
+        port = sink.getsockname()[1]
+        print(f"{'targets':>8} {'sendmmsg':>12} {'sendto':>12}   (µs per tick, all nodes dirty)")
+        for n in (16, 64, 256):
+            row = []
+            for batched in (True, False):
+                state = DMXStateManager(64, 8)
+                mgr = ArtNetOutputManager(state, [
+                    _Target(f'n{i}', '127.0.0.1', port, frozenset([i % 64]), 8) for i in range(n)
+                ], universe=0)
+                mgr.sender = _BatchSender(mgr.sock, use_sendmmsg=batched)
+                if batched and not mgr.sender.batched:
+                    row.append('n/a')
+                    mgr.sock.close()
+                    continue
+                spent = 0.0
+                for tick in range(ticks):
+                    state.update_fixtures(range(64), [[tick % 256] * 8] * 64)
+                    t0 = time.perf_counter()
+                    mgr.send_frame()
+                    spent += time.perf_counter() - t0
+                    drain_raw_fast(sink)
+                row.append(f"{spent / ticks * 1e6:.1f}")
+                mgr.sock.close()
+            print(f"{n:>8} {row[0]:>12} {row[1]:>12}")
+
+
+def drain_raw_fast(s):
+    """Empty a socket's receive queue without keeping the packets."""
+    s.setblocking(False)
+    try:
+        while True:
+            s.recv(2048)
+    except BlockingIOError:
+        pass
+
+
+def loopback_listeners(n):
+    """``n`` UDP sockets bound to loopback ports, non-blocking: fake nodes."""
+    listeners = []
+    for _ in range(n):
+        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        listeners.append(s)
+        s.bind(('127.0.0.1', 0))
+        s.setblocking(False)
+    return listeners
+
+
+@contextlib.contextmanager
+def listening(n):
+    """loopback_listeners(n), closed on the way out."""
+    listeners = loopback_listeners(n)
+    try:
+        yield listeners
+    finally:
+        for s in listeners:
+            s.close()
+
+
 def selftest():
     from dmx_state_manager import DMXStateManager
-    from artnet_output_manager import ArtNetOutputManager, _Target
+    from artnet_output_manager import (ArtNetOutputManager, NODE_TIMEOUT, _BatchSender,
+                                       _Discovery, _Target, room_windows)
 
     # -- packet format matches the parser and the documented layout ----------
     pkt = build_artdmx(7, 0, bytes([1, 2, 3]), pad_to=512)
@@ -51,64 +233,317 @@ def selftest():
     seq, universe, data = parse_artdmx(pkt)
     assert (seq, universe, data[:4]) == (7, 0, bytes([1, 2, 3, 0]))
     assert parse_artdmx(b'not artnet at all!') is None
-    print("OK  packet format")
+    reply = build_artpollreply('10.0.0.7', 'entrance', 'lohp-node-entrance', firmware=3,
+                               universe=0x21, node_report='#0001 [5] signal')
+    node = parse_artpollreply(reply)
+    assert len(reply) == 239 and is_artpoll(build_artpoll()) and not is_artpoll(reply)
+    assert (node['ip'], node['firmware'], node['short_name'], node['long_name'],
+            node['universes'], node['good_output']) == \
+        ('10.0.0.7', 3, 'entrance', 'lohp-node-entrance', [0x21], [0x80]), node
+    assert parse_artpollreply(pkt) is None
+    assert len(build_artsync()) == 14 and is_artsync(build_artsync()) and not is_artsync(pkt)
+    print("OK  packet format (ArtDMX, ArtSync, ArtPoll, ArtPollReply)")
 
-    # -- live loop against two loopback listeners ----------------------------
-    listeners = []
-    for _ in range(2):
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        s.bind(('127.0.0.1', 0))
-        s.settimeout(2.0)
-        listeners.append(s)
+    # -- state: clamped at write, one shared snapshot until the next write ---
+    state = DMXStateManager(4, 8)
+    state.update_fixture(1, [300, -5, 12.7, 40, 50, 60, 70, 80])
+    state.update_fixtures([2, 3], [[1] * 8, [2, 3]])
+    frame = state.snapshot()
+    assert frame[8:16] == bytes([255, 0, 12, 40, 50, 60, 70, 80]), list(frame[8:16])
+    assert frame[16:24] == bytes([1] * 8) and frame[24:32] == bytes([2, 3, 0, 0, 0, 0, 0, 0])
+    assert state.snapshot() is frame, "unchanged state must reuse the snapshot"
+    state.update_fixture(1, [None, 9])
+    assert state.snapshot()[8:10] == bytes([255, 9]) and state.snapshot() is not frame
+    print("OK  state clamping + shared snapshot")
 
-    state = DMXStateManager(44, 8)
-    targets = [_Target(f'test{i}', '127.0.0.1', s.getsockname()[1])
-               for i, s in enumerate(listeners)]
-    mgr = ArtNetOutputManager(state, targets, universe=0)
-    mgr.start()
-    try:
-        # first frame reaches every target
+    # -- generation tracking: only real byte changes count -------------------
+    gen, dirty = state.changes_since(-1)
+    assert state.changes_since(gen) == (gen, [])
+    state.update_fixture(1, [None, 9])                  # same bytes again
+    state.update_fixtures([0, 2], [[1] * 8, [1] * 8])   # fixture 2 unchanged
+    assert state.changes_since(gen) == (gen + 1, [0]), state.changes_since(gen)
+    state.reset_all_fixtures()
+    assert state.changes_since(gen + 1) == (gen + 2, [0, 1, 2, 3])
+    print("OK  generation-counted dirty fixtures")
+
+    # -- live loop against two loopback listeners ----------------------------
+    with listening(2) as listeners:
         for s in listeners:
-            seq, universe, data = parse_artdmx(s.recvfrom(2048)[0])
-            assert universe == 0 and data == bytes(512)
-        print("OK  initial frame to all targets")
-
-        # a state change shows up promptly with the new bytes
-        state.update_fixture(2, [10, 20, 30, 40, 50, 60, 70, 80])
-        deadline = time.monotonic() + 1.0
-        got = None
-        while time.monotonic() < deadline:
-            _, _, data = parse_artdmx(listeners[0].recvfrom(2048)[0])
-            if data[16:24] == bytes([10, 20, 30, 40, 50, 60, 70, 80]):
-                got = time.monotonic()
-                break
-        assert got, "changed frame never arrived"
-        print("OK  change propagates (fixture 2 -> ch17-24)")
-
-        # static state throttles to the ~1s heartbeat, not 44Hz
-        for s in listeners:  # drain anything queued
-            s.setblocking(False)
-            try:
-                while True:
-                    s.recvfrom(2048)
-            except BlockingIOError:
-                pass
-            s.settimeout(3.0)
-        t0 = time.monotonic()
-        count = 0
-        while time.monotonic() - t0 < 2.2:
+            s.settimeout(2.0)
+        state = DMXStateManager(44, 8)
+        targets = [_Target(f'test{i}', '127.0.0.1', s.getsockname()[1])
+                   for i, s in enumerate(listeners)]
+        mgr = ArtNetOutputManager(state, targets, universe=0)
+        mgr.start()
+        try:
+            # first frame reaches every target
+            for s in listeners:
+                seq, universe, data = parse_artdmx(s.recvfrom(2048)[0])
+                assert universe == 0 and data == bytes(512)
+            print("OK  initial frame to all targets")
+
+            # a state change shows up promptly with the new bytes
+            state.update_fixture(2, [10, 20, 30, 40, 50, 60, 70, 80])
+            deadline = time.monotonic() + 1.0
+            got = None
+            while time.monotonic() < deadline:
+                _, _, data = parse_artdmx(listeners[0].recvfrom(2048)[0])
+                if data[16:24] == bytes([10, 20, 30, 40, 50, 60, 70, 80]):
+                    got = time.monotonic()
+                    break
+            assert got, "changed frame never arrived"
+            print("OK  change propagates (fixture 2 -> ch17-24)")
+
+            # static state throttles to the ~1s heartbeat, not 44Hz
+            for s in listeners:  # drain anything queued
+                drain_raw_fast(s)
+                s.settimeout(3.0)
+            t0 = time.monotonic()
+            count = 0
+            while time.monotonic() - t0 < 2.2:
+                try:
+                    listeners[0].recvfrom(2048)
+                    count += 1
+                except socket.timeout:
+                    break
+            assert 1 <= count <= 4, f"heartbeat rate wrong: {count} packets in 2.2s"
+            print(f"OK  static heartbeat ({count} packets in 2.2s)")
+        finally:
+            mgr.stop()
+            mgr.join(timeout=2)
+
+    # -- batched fanout: one call, a bad message doesn't stop the rest -------
+    with listening(2) as listeners:
+        addrs = [s.getsockname() for s in listeners]
+        oversize = bytearray(70000)              # > a UDP datagram: EMSGSIZE
+        modes = []
+        for batched in (True, False):
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sender = _BatchSender(sock, use_sendmmsg=batched)
             try:
-                listeners[0].recvfrom(2048)
-                count += 1
-            except socket.timeout:
-                break
-        assert 1 <= count <= 4, f"heartbeat rate wrong: {count} packets in 2.2s"
-        print(f"OK  static heartbeat ({count} packets in 2.2s)")
-    finally:
-        mgr.stop()
-        mgr.join(timeout=2)
-        for s in listeners:
-            s.close()
+                packets = [bytearray(b'one'), oversize, b'three']
+                failed = sender.send([(packets[0], addrs[0]), (packets[1], addrs[0]),
+                                      (packets[2], addrs[1])])
+                packets[0][:] = b'ONE'           # patched in place, as ArtDmxBuffer does
+                failed += sender.send([(packets[0], addrs[1])])
+                time.sleep(0.05)
+                assert [i for i, _ in failed] == [1], failed
+                assert [[p for p, _ in drain_raw(s)] for s in listeners] == \
+                    [[b'one'], [b'three', b'ONE']]
+                modes.append('sendmmsg' if sender.batched else 'sendto')
+            finally:
+                sock.close()
+    print(f"OK  batched fanout ({' + '.join(modes)}; per-message errors, batch continues)")
+
+    # -- windowed mode: per-node channel windows, sends only to dirty nodes --
+    windows = room_windows(os.path.join(REPO_DIR, 'light_config.json'), 8)
+    assert windows['Entrance'] == {0: (frozenset([0]), 8)}, windows['Entrance']
+    assert windows['Photo Bomb Room'] == {0: (frozenset([10, 11]), 94)}  # 6ch U'King last
+    assert windows['Camp Sign'][0][1] == 350    # last zone @345, 6 channels used
+
+    def drain(s):
+        return [parse_artdmx(packet) for packet, _ in drain_raw(s)]
+
+    with listening(3) as listeners:
+        state = DMXStateManager(44, 8)
+        port = [s.getsockname()[1] for s in listeners]
+        mgr = ArtNetOutputManager(state, [
+            _Target('entrance', '127.0.0.1', port[0], frozenset([0]), 8),
+            _Target('pair', '127.0.0.1', port[1], frozenset([2, 3]), 31),
+            _Target('full', '127.0.0.1', port[2]),
+        ], universe=0)
+        try:
+            mgr.send_frame()                 # first frame: everyone, own window
+            time.sleep(0.05)
+            lengths = [[len(p[2]) for p in drain(s)] for s in listeners]
+            assert lengths == [[8], [32], [512]], lengths
+            state.update_fixture(3, [9] * 8)
+            mgr.send_frame()
+            time.sleep(0.05)
+            got = [drain(s) for s in listeners]
+            assert got[0] == [], "clean window must stay silent"
+            assert [p[2][24:32] for p in got[1]] == [bytes([9] * 8)]
+            assert [p[2][24:32] for p in got[2]] == [bytes([9] * 8)]
+            mgr.send_frame()                 # nothing changed, no heartbeat due
+            time.sleep(0.05)
+            assert not any(drain(s) for s in listeners)
+            for t in mgr.targets:
+                for stream in t.streams:
+                    stream.last_sent -= ArtNetOutputManager.HEARTBEAT
+            mgr.send_frame()                 # heartbeat: every node, own window
+            time.sleep(0.05)
+            lengths = [[len(p[2]) for p in drain(s)] for s in listeners]
+            assert lengths == [[8], [32], [512]], lengths
+            print("OK  windowed sends (dirty nodes only, per-node length, heartbeat)")
+        finally:
+            mgr.sock.close()
+
+    # -- multiple universes: own sequence + change detection per universe ----
+    # fixture 0 @u0 ch1, fixture 1 @u1 ch5, fixture 2 spans u0 ch509 -> u1 ch4
+    state = DMXStateManager(3, 8, slots=[(0, 8), (516, 8), (508, 8)])
+    assert state.universes == 2 and len(state.universe(1)) == 12
+    state.update_fixture(2, [1, 2, 3, 4, 5, 6, 7, 8])
+    assert state.universe(0)[508:] == bytes([1, 2, 3, 4]) and state.universe(1)[:4] == bytes([5, 6, 7, 8])
+    gen0, _ = state.changes_since(-1, universe=0)
+    gen1, _ = state.changes_since(-1, universe=1)
+    state.update_fixture(1, [9] * 8)
+    assert state.changes_since(gen0, universe=0) == (gen0, [])
+    assert state.changes_since(gen1, universe=1)[1] == [1]
+    with listening(2) as listeners:
+        port = [s.getsockname()[1] for s in listeners]
+        mgr = ArtNetOutputManager(state, [
+            _Target('zero', '127.0.0.1', port[0], frozenset([0, 2]), 512),
+            _Target('both', '127.0.0.1', port[1], universes={0: (frozenset([0, 2]), 512),
+                                                             1: (frozenset([1, 2]), 12)}),
+        ], universe=4)
+        try:
+            mgr.send_frame()
+            time.sleep(0.05)
+            got = [sorted((p[1], p[0], len(p[2])) for p in drain(s)) for s in listeners]
+            assert got == [[(4, 1, 512)], [(4, 1, 512), (5, 1, 12)]], got
+            state.update_fixture(1, [7] * 8)           # universe 1 only
+            mgr.send_frame()
+            time.sleep(0.05)
+            got = [drain(s) for s in listeners]
+            assert got[0] == [] and [(p[1], p[0], p[2]) for p in got[1]] == [(5, 2, bytes([5, 6, 7, 8] + [7] * 8))], got
+            assert mgr.sequences == {0: 1, 1: 2}
+            assert mgr.node_table()['nodes'][1]['universes'] == {4: 512, 5: 12}
+            print("OK  multiple universes (per-universe sequence, change detection, subscriptions)")
+        finally:
+            mgr.sock.close()
+
+    # -- ArtSync: one sync after a changed fanout, none on heartbeats --------
+    with listening(3) as listeners:  # two nodes + the sync "broadcast"
+        state = DMXStateManager(44, 8)
+        port = [s.getsockname()[1] for s in listeners]
+        mgr = ArtNetOutputManager(state, [
+            _Target('a', '127.0.0.1', port[0], frozenset([0]), 8),
+            _Target('b', '127.0.0.1', port[1], frozenset([1]), 16),
+        ], universe=0, sync_addr=('127.0.0.1', port[2]))
+        try:
+            mgr.send_frame()                     # initial frame counts as a change
+            state.update_fixtures([0, 1], [[200] * 8, [100] * 8])
+            mgr.send_frame()
+            time.sleep(0.05)
+            syncs = [p for p, _ in drain_raw(listeners[2])]
+            assert len(syncs) == 2 and all(is_artsync(p) for p in syncs), syncs
+            # hold-until-sync nodes: nothing live until the sync, then both at once
+            nodes = [SyncHoldNode(), SyncHoldNode()]
+            now = time.monotonic()
+            for node in nodes:
+                node.receive(build_artsync(), now)          # in sync mode
+            got = [[p for p, _ in drain_raw(s)] for s in listeners[:2]]
+            for node, packets in zip(nodes, got):
+                assert [node.receive(p, now) for p in packets] == [None, None]
+            live = [node.receive(syncs[-1], now) for node in nodes]
+            assert live[0][:8] == bytes([200] * 8) and live[1][8:16] == bytes([100] * 8), live
+            for t in mgr.targets:                 # heartbeat-only tick: no sync
+                for stream in t.streams:
+                    stream.last_sent -= ArtNetOutputManager.HEARTBEAT
+            mgr.send_frame()
+            time.sleep(0.05)
+            assert [len(drain_raw(s)) for s in listeners] == [1, 1, 0]
+            # a held frame whose sync never comes still goes live (late latch)
+            nodes[0].receive(build_artdmx(1, 0, bytes([5] * 8), pad_to=8), now)
+            assert nodes[0].tick(now) is None
+            assert nodes[0].tick(now + SYNC_LATE + 0.01)[:8] == bytes([5] * 8)
+            # and a node that stops hearing syncs goes back to latching on receipt
+            later = now + SYNC_MODE + 1
+            assert nodes[1].receive(build_artdmx(1, 0, bytes([6] * 8), pad_to=8), later)[:8] == bytes([6] * 8)
+            print("OK  ArtSync (one per changed fanout, none on heartbeats; hold/latch node)")
+        finally:
+            mgr.sock.close()
+
+    # -- resolution is off the frame loop: a 2s lookup stalls no tick --------
+    real_getaddrinfo = socket.getaddrinfo
+
+    def slow_getaddrinfo(host, *args, **kwargs):
+        if host.endswith('.invalid'):
+            time.sleep(2.0)                      # a dead .local name in docker
+            raise socket.gaierror(f"{host}: simulated resolver timeout")
+        return real_getaddrinfo(host, *args, **kwargs)
+
+    with listening(1) as (listener,):
+        listener.settimeout(0.5)
+        state = DMXStateManager(44, 8)
+        mgr = ArtNetOutputManager(state, [
+            _Target('gone', 'lohp-node-gone.invalid', ARTNET_PORT),
+            _Target('named', 'localhost', listener.getsockname()[1]),
+        ], universe=0)
+        socket.getaddrinfo = slow_getaddrinfo
+        mgr.start()
+        try:
+            received = 0
+            t0 = time.monotonic()
+            while time.monotonic() - t0 < 1.5:
+                state.update_fixture(0, [int((time.monotonic() - t0) * 100) % 256] * 8)
+                try:
+                    listener.recvfrom(2048)
+                    received += 1
+                except socket.timeout:
+                    pass
+            assert received >= 20, f"named target starved: {received} packets in 1.5s"
+            assert mgr.stalls == 0, f"frame loop stalled {mgr.stalls}x ({mgr.stall_seconds:.3f}s)"
+            print(f"OK  off-loop resolver ({received} packets past a 2s lookup, 0 stalls)")
+        finally:
+            socket.getaddrinfo = real_getaddrinfo
+            mgr.stop()
+            mgr.join(timeout=2)
+
+    # -- ArtPoll discovery: fake nodes on loopback answer, get mapped by name -
+    with listening(2) as nodes:
+        state = DMXStateManager(44, 8)
+        targets = [
+            _Target('Entrance', 'lohp-node-entrance.invalid', nodes[0].getsockname()[1]),
+            _Target('Porto Room', 'lohp-node-porto.invalid', nodes[1].getsockname()[1]),
+        ]
+        discovery = _Discovery(targets, '127.0.0.1', port=nodes[0].getsockname()[1],
+                               bind=('127.0.0.1', 0))
+        mgr = ArtNetOutputManager(state, targets, universe=0, discovery=discovery)
+        try:
+            # Unresolvable hosts: nothing goes out until a node answers a poll.
+            mgr.send_frame()
+            assert targets[0].addr is None
+            discovery.sock.sendto(build_artpoll(), nodes[0].getsockname())
+            time.sleep(0.05)
+            peer = None
+            for packet, peer in drain_raw(nodes[0]):
+                assert is_artpoll(packet)
+            fake_node_reply(nodes[0], 'lohp-node-entrance', peer, 0)
+            # ...and an unknown node plus Porto by short name (explicit IP body)
+            nodes[1].sendto(build_artpollreply('127.0.0.1', 'porto', 'Porto-Bench'), peer)
+            nodes[1].sendto(build_artpollreply('127.0.0.1', 'mystery', 'lohp-node-mystery'), peer)
+            discovery.sock.settimeout(0.2)
+            for _ in range(3):
+                packet, addr = discovery.sock.recvfrom(1024)
+                discovery.handle_reply(parse_artpollreply(packet), addr[0])
+            assert targets[0].addr == ('127.0.0.1', nodes[0].getsockname()[1]), targets[0].addr
+            assert targets[1].addr == ('127.0.0.1', nodes[1].getsockname()[1]), targets[1].addr
+            table = mgr.node_table()
+            assert [n['alive'] for n in table['nodes']] == [True, True], table
+            assert table['nodes'][0]['node']['node_report'] == '#0001 [0] fake node'
+            assert [n['long_name'] for n in table['unmatched']] == ['lohp-node-mystery']
+            mgr.send_frame()
+            time.sleep(0.05)
+            assert [len(drain(s)) for s in nodes] == [1, 1], "discovered nodes get the frame"
+
+            # Porto goes quiet past NODE_TIMEOUT: skipped, even on a change
+            targets[1].last_reply -= NODE_TIMEOUT + 1
+            state.update_fixture(0, [7] * 8)
+            mgr.send_frame()
+            time.sleep(0.05)
+            assert [len(drain(s)) for s in nodes] == [1, 0], "silent node must be skipped"
+            assert not mgr.node_table()['nodes'][1]['alive']
+            # ...and gets a frame on the very next tick after it answers again
+            discovery.handle_reply(parse_artpollreply(
+                build_artpollreply('127.0.0.1', 'porto', 'Porto-Bench')), '127.0.0.1')
+            mgr.send_frame()
+            time.sleep(0.05)
+            assert [len(drain(s)) for s in nodes] == [0, 1], "revived node gets a frame at once"
+            print("OK  ArtPoll discovery (name mapping, learned address, dead node skipped)")
+        finally:
+            mgr.sock.close()
+            discovery.stop()
     print("SELFTEST PASS")
 
 
@@ -117,9 +552,15 @@ if __name__ == '__main__':
     mode = ap.add_mutually_exclusive_group(required=True)
     mode.add_argument('--selftest', action='store_true')
     mode.add_argument('--listen', action='store_true')
+    mode.add_argument('--bench', action='store_true')
     ap.add_argument('--port', type=int, default=ARTNET_PORT)
+    ap.add_argument('--name', help="answer ArtPoll as this node (e.g. lohp-node-entrance)")
+    ap.add_argument('--sync-hold', action='store_true',
+                    help="buffer ArtDMX until ArtSync, like a sync_hold node")
     args = ap.parse_args()
     if args.selftest:
         selftest()
+    elif args.bench:
+        bench()
     else:
-        listen(args.port)
+        listen(args.port, args.name, args.sync_hold)
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""Effect representation benchmark: dict steps vs compiled frame tables.
+
+    python3 tools/effect_bench.py [--fixtures 4]
+    python3 tools/effect_bench.py --startup
+    python3 tools/effect_bench.py --themes
+
+For every effect registered in effects/ it reports the memory held by the
+step dicts against effect_utils.CompiledEffect (times float32 + uint8 value
+matrix + the 44Hz frame table), the CPU per 44Hz tick of the old playback
+(one cursor-scanning interpolator per fixture, as InterruptHandler ran it)
+against the compiled one (one frame_at() shared by the run), and the largest
+channel difference between the two over the whole effect. No server needed.
+
+--startup times server-side effect setup instead: EffectsManager
+construction (what /api/health waits behind), and building every effect
+with a cold and then a warm on-disk cache (a scratch directory).
+
+--themes times one whole-maze theme step per theme: ThemeManager's
+vectorized keyframe against the per-room generate_theme_values loop it
+replaced, and the per-tick cost of blending keyframes at the 44Hz output rate.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+import effects  # noqa: E402
+from effect_utils import EFFECT_CHANNELS, FRAME_RATE, CompiledEffect  # noqa: E402
+
+
+def legacy_step_values(effect_data):
+    """The pre-compile playback (effect_utils.get_effect_step_values as it
+    was), kept verbatim as the baseline."""
+    times = [step['time'] for step in effect_data['steps']]
+    values = [[step['channels'].get(channel, 0) for channel in EFFECT_CHANNELS]
+              for step in effect_data['steps']]
+    cursor = 0
+
+    def get_values(elapsed_time):
+        nonlocal cursor
+        if not times:
+            return [0] * 8
+        if cursor > 0 and elapsed_time < times[cursor - 1]:
+            cursor = 0  # Another fixture is slightly behind; rewind
+        while cursor < len(times) and times[cursor] < elapsed_time:
+            cursor += 1
+        if cursor >= len(times):
+            return [0] * 8  # Beyond the last step
+        if cursor == 0:
+            return list(values[0])
+        t0, t1 = times[cursor - 1], times[cursor]
+        t = (elapsed_time - t0) / (t1 - t0) if t1 > t0 else 1.0
+        v0, v1 = values[cursor - 1], values[cursor]
+        return [int(a + t * (b - a)) for a, b in zip(v0, v1)]
+
+    return get_values
+
+
+def deep_size(obj, seen=None):
+    """Bytes held by ``obj`` and everything it references (dict/list/tuple)."""
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_size(k, seen) + deep_size(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple)):
+        size += sum(deep_size(v, seen) for v in obj)
+    return size
+
+
+def compiled_size(compiled):
+    return (sys.getsizeof(compiled) + sys.getsizeof(compiled.times)
+            + sys.getsizeof(compiled.values) + sys.getsizeof(compiled.frames))
+
+
+def effect_factories():
+    return sorted((name[len('create_'):-len('_effect')], getattr(effects, name))
+                  for name in dir(effects) if name.startswith('create_'))
+
+
+def main(fixtures):
+    print(f"{'effect':<20} {'steps':>6} {'dicts KB':>9} {'compiled KB':>12} "
+          f"{'legacy µs/tick':>15} {'compiled µs/tick':>17} {'compile ms':>11} {'max diff':>9}")
+    totals = [0, 0, 0.0, 0.0]
+    for name, factory in effect_factories():
+        effect_data = factory()
+        t0 = time.perf_counter()
+        compiled = CompiledEffect(effect_data)
+        compile_ms = (time.perf_counter() - t0) * 1e3
+        ticks = [k / FRAME_RATE for k in range(int(effect_data['duration'] * FRAME_RATE))]
+
+        interpolators = [legacy_step_values(effect_data) for _ in range(fixtures)]
+        t0 = time.perf_counter()
+        for elapsed in ticks:
+            for get_values in interpolators:
+                get_values(elapsed)
+        legacy_us = (time.perf_counter() - t0) / max(1, len(ticks)) * 1e6
+
+        t0 = time.perf_counter()
+        for elapsed in ticks:
+            compiled.frame_at(elapsed)
+        compiled_us = (time.perf_counter() - t0) / max(1, len(ticks)) * 1e6
+
+        # Same picture, after the DMX state's 0..255 clamp? Two expected
+        # outliers: LightningStorm's steps aren't in time order (the legacy
+        # cursor reaches its flash steps late, the compiled table sorts them),
+        # and SparkPony's sparkle steps say 65025 — legacy ramps toward those
+        # saturate at once, compiled ones ramp to the clamped 255.
+        reference = legacy_step_values(effect_data)
+        diff = max((max(abs(max(0, min(255, a)) - b) for a, b in zip(reference(t), compiled.frame_at(t)))
+                    for t in ticks), default=0)
+
+        dict_bytes, table_bytes = deep_size(effect_data['steps']), compiled_size(compiled)
+        totals[0] += dict_bytes
+        totals[1] += table_bytes
+        totals[2] += legacy_us
+        totals[3] += compiled_us
+        print(f"{name:<20} {len(effect_data['steps']):>6} {dict_bytes / 1024:>9.1f} "
+              f"{table_bytes / 1024:>12.1f} {legacy_us:>15.2f} {compiled_us:>17.2f} "
+              f"{compile_ms:>11.1f} {diff:>9}")
+    print(f"{'TOTAL':<20} {'':>6} {totals[0] / 1024:>9.1f} {totals[1] / 1024:>12.1f} "
+          f"{totals[2]:>15.2f} {totals[3]:>17.2f}")
+    print(f"(per-tick CPU for one run on {fixtures} fixtures; compiled is shared by all of them)")
+
+
+def startup():
+    from dmx_state_manager import DMXStateManager
+    from effect_cache import EffectCache
+    from effects_manager import EffectsManager
+    from light_config_manager import LightConfigManager
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for label in ('cold cache', 'warm cache'):
+            t0 = time.perf_counter()
+            manager = EffectsManager(LightConfigManager(), DMXStateManager(44, 8), None, None)
+            init_ms = (time.perf_counter() - t0) * 1e3
+            manager.effect_cache = EffectCache(cache_dir)
+            t0 = time.perf_counter()
+            asyncio.run(manager.warm())
+            warm_ms = (time.perf_counter() - t0) * 1e3
+            print(f"{label}: EffectsManager() {init_ms:7.1f} ms, warm() {warm_ms:7.1f} ms "
+                  f"({manager.cache_hits}/{len(manager.effects)} from cache)")
+
+
+def legacy_theme_step(manager, theme_data, current_time, previous_values):
+    """ThemeManager's per-room theme step as it was before the vectorized one
+    (generate_theme_values, dict smoothing, row building), as the baseline."""
+    from effect_utils import generate_theme_values
+
+    room_layout = manager.light_config_manager.get_room_layout()
+    rows = {}
+    for room_index, (room, lights) in enumerate(room_layout.items()):
+        channels = generate_theme_values(theme_data, current_time, 1.0,
+                                         room_index, len(room_layout), manager.temporary_theme_values)
+        if room in previous_values:
+            channels = {channel: int(previous_values[room].get(channel, value)
+                                     + (value - previous_values[room].get(channel, value)) * manager.smoothing_factor)
+                        for channel, value in channels.items()}
+        previous_values[room] = channels
+        for light in lights:
+            light_model = manager.light_config_manager.get_light_config(light['model'])
+            fixture_values = [0] * 8
+            for channel, value in channels.items():
+                if channel in light_model['channels']:
+                    fixture_values[light_model['channels'][channel]] = value
+            rows[(light['start_address'] - 1) // 8] = fixture_values
+    return rows
+
+
+def themes(steps=200):
+    from dmx_state_manager import DMXStateManager
+    from light_config_manager import LightConfigManager
+    from theme_manager import ThemeManager
+
+    manager = ThemeManager(DMXStateManager(44, 8), LightConfigManager())
+    rooms = len(manager.light_config_manager.get_room_layout())
+    print(f"{'theme':<20} {'per-room µs/step':>17} {'vectorized µs/step':>19} {'44Hz blend µs/tick':>19}")
+    for name, theme_data in manager.themes.items():
+        previous_values = {}
+        t0 = time.perf_counter()
+        for k in range(steps):
+            legacy_theme_step(manager, theme_data, k / 10, previous_values)
+        legacy_us = (time.perf_counter() - t0) / steps * 1e6
+        manager._swap(name)
+        run = manager._active[0]
+        t0 = time.perf_counter()
+        start = run.start
+        manager.render(start)   # builds the layout
+        for k in range(steps):
+            manager._generate_theme_step(run, k / 10, manager._layout)
+        vector_us = (time.perf_counter() - t0) / steps * 1e6
+        ticks = [start + k / 44 for k in range(steps)]
+        t0 = time.perf_counter()
+        for now in ticks:
+            manager.render(now)
+        render_us = (time.perf_counter() - t0) / steps * 1e6    # includes the keyframes it computes
+        print(f"{name:<20} {legacy_us:>17.0f} {vector_us:>19.0f} {render_us:>19.0f}")
+    print(f"(one step covers all {rooms} rooms; keyframes at {manager.frequency:g}Hz, "
+          f"output {manager.interpolation_latency * 1000:.0f} ms behind the theme math)")
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument('--fixtures', type=int, default=4, help="fixtures per run (legacy cost scales with it)")
+    ap.add_argument('--startup', action='store_true', help="time effect setup and the on-disk cache")
+    ap.add_argument('--themes', action='store_true', help="time one whole-maze theme step per theme")
+    args = ap.parse_args()
+    if args.startup:
+        startup()
+    elif args.themes:
+        themes()
+    else:
+        main(args.fixtures)
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""Output timing under API load: Art-Net in the server process vs in its own.
+
+    python3 tools/output_process_bench.py [--seconds 10] [--load 4] [--cpus 3] [--priority 50]
+
+Drives a DMXStateManager the way the compositor does (a full-frame write
+at 44Hz) and sends it as Art-Net to 16 nodes on loopback, in three runs:
+the sink in-process with no load, in-process while ``--load`` threads do
+what request handlers do (JSON encode/decode, pure Python holding the GIL),
+and under the same load with output_process.OutputProcess running the sink
+in a child process (``--cpus`` / ``--priority`` passed through as in
+dmx_nodes.json). It reports the sink's FrameStats for each: achieved fps,
+lateness (jitter) p50/p99/max, tick p99 and missed deadlines. No network
+or hardware needed.
+"""
+import argparse
+import json
+import os
+import random
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from artnet_output_manager import ArtNetOutputManager  # noqa: E402
+from dmx_state_manager import DMXStateManager  # noqa: E402
+from output_process import OutputProcess  # noqa: E402
+
+FIXTURES = 44
+CHANNELS = 8
+NODES = 16
+FREQUENCY = 44
+
+
+def write_config(directory, port):
+    path = os.path.join(directory, 'dmx_nodes.json')
+    nodes = {f'Room {i}': {'host': '127.0.0.1', 'enabled': True} for i in range(NODES)}
+    with open(path, 'w') as f:
+        json.dump({'ftdi': False, 'windowed': False, 'port': port, 'nodes': nodes}, f)
+    return path
+
+
+def writer(state, stop):
+    """The compositor's side: one bulk write per 44Hz frame."""
+    ids = list(range(FIXTURES))
+    next_frame = time.monotonic()
+    while not stop.is_set():
+        state.update_fixtures(ids, [[random.randrange(256) for _ in range(CHANNELS)] for _ in ids])
+        next_frame += 1 / FREQUENCY
+        stop.wait(max(0.0, next_frame - time.monotonic()))
+
+
+def api_load(stop):
+    """A request handler's worth of pure-Python work, back to back."""
+    payload = {'rooms': {f'Room {i}': {'fixtures': list(range(40)), 'effect': 'Lightning'}
+                         for i in range(20)}}
+    while not stop.is_set():
+        json.loads(json.dumps(payload))
+
+
+def run(label, state, config_path, seconds, load, separate, options):
+    stop = threading.Event()
+    threads = [threading.Thread(target=writer, args=(state, stop), daemon=True)]
+    threads += [threading.Thread(target=api_load, args=(stop,), daemon=True) for _ in range(load)]
+    if separate:
+        sink = OutputProcess(state, options, ftdi=False, artnet_config=config_path)
+    else:
+        sink = ArtNetOutputManager.from_config(state, config_path)
+    for thread in threads:
+        thread.start()
+    sink.start()
+    time.sleep(seconds)
+    stats = sink.frame_stats().get('artnet', {}) if separate else sink.stats.summary()
+    sink.stop()
+    stop.set()
+    for thread in threads:
+        thread.join()
+    jitter, tick = stats.get('jitter_ms', {}), stats.get('tick_ms', {})
+    print(f"{label:<28} {stats.get('fps')!s:>6} fps  late p50 {jitter.get('p50')!s:>6} "
+          f"p99 {jitter.get('p99')!s:>6} max {jitter.get('max')!s:>7} ms  "
+          f"tick p99 {tick.get('p99')!s:>6} ms  {stats.get('missed_deadlines')} missed")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--seconds', type=float, default=10.0)
+    parser.add_argument('--load', type=int, default=4, help='API load threads')
+    parser.add_argument('--cpus', type=int, nargs='*', help='pin the output process to these CPUs')
+    parser.add_argument('--priority', type=int, help='output process SCHED_FIFO priority')
+    args = parser.parse_args()
+    options = {'cpus': args.cpus, 'realtime_priority': args.priority, 'nice': -10 if args.priority else None}
+
+    receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)   # never read: the kernel drops the overflow
+    receiver.bind(('127.0.0.1', 0))
+    with tempfile.TemporaryDirectory() as directory:
+        config_path = write_config(directory, receiver.getsockname()[1])
+        print(f"{FIXTURES} fixtures, {NODES} Art-Net nodes on loopback, {args.seconds:.0f}s per run")
+        run('in-process, idle', DMXStateManager(FIXTURES, CHANNELS), config_path,
+            args.seconds, 0, False, options)
+        run(f'in-process, {args.load} load threads', DMXStateManager(FIXTURES, CHANNELS), config_path,
+            args.seconds, args.load, False, options)
+        run(f'output process, {args.load} load', DMXStateManager(FIXTURES, CHANNELS), config_path,
+            args.seconds, args.load, True, options)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""Stand-in room node: trigger-to-first-DMX-frame latency, UDP vs HTTP.
+
+    python3 tools/udp_trigger_node.py --sensor "Entrance LT" [--server 127.0.0.1]
+        [--trials 20] [--artnet-port 6454] [--node bench-node] [--only udp|http]
+
+Fires the triggers.json trigger ``--sensor`` the two ways a room node can:
+one UDP datagram to :8766 (udp_triggers.py, resent every 100ms until acked,
+signed when LOHP_TRIGGER_KEY is set; it learns the server's epoch and its
+next seq from the first STALE ack, as a freshly booted node would) and an HTTP POST to
+/api/run_effect?wait=0 on a fresh connection, as ESPHome's http_request
+does. Between trials it stops the room's effect and waits for the room to go
+dark, then measures from the send to the first ArtDMX frame in which the
+room's channels light up — the lights actually moving — plus the ack / HTTP
+response time.
+
+It receives the frames as an Art-Net node would, so the server must be
+sending to this box: a dmx_nodes.json entry pointed here, or in the sim
+``SIM_ARTNET=127.0.0.1:6455`` with ``--artnet-port 6455``. Bench use only:
+run it with the theme off (the room must be able to go dark).
+"""
+import argparse
+import json
+import os
+import select
+import socket
+import sys
+import threading
+import time
+import urllib.request
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from artnet import ARTNET_PORT, parse_artdmx  # noqa: E402
+from light_config_manager import ShowModel  # noqa: E402
+from udp_triggers import (OK, STALE, STATUS_NAMES, TRIGGER_PORT, build_trigger,  # noqa: E402
+                          compile_index, parse_ack)
+from dmx_state_manager import UNIVERSE_SIZE  # noqa: E402
+
+RESEND = 0.1        # seconds between UDP retransmissions
+ATTEMPTS = 10
+DARK_TIMEOUT = 5.0
+LIGHT_TIMEOUT = 2.0
+
+
+class Frames:
+    """The Art-Net side: the latest frame per universe, off one socket."""
+
+    def __init__(self, port, channels):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind(('0.0.0.0', port))
+        self.channels = channels        # [(universe, index)] of the room
+        self.frames = {}
+
+    def lit(self):
+        return any(self.frames.get(u, b'')[i:i + 1] not in (b'', b'\x00') for u, i in self.channels)
+
+    def wait_for(self, lit, timeout):
+        """Read frames until the room is (not) lit; the monotonic time it
+        happened, or None on timeout."""
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            if select.select([self.sock], [], [], remaining)[0]:
+                packet = self.sock.recv(1024)
+                arrived = time.monotonic()
+                parsed = parse_artdmx(packet)
+                if parsed is None:
+                    continue
+                _, universe, data = parsed
+                self.frames[universe] = data
+                if self.lit() == lit:
+                    return arrived
+
+
+def send_udp(args, session, result):
+    """One trigger; ``session`` is the node's {'epoch', 'seq'}, updated in
+    place (the seq is taken here, and a STALE ack resets both)."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.settimeout(RESEND)
+    key = os.environ.get('LOHP_TRIGGER_KEY')
+    key = key.encode() if key else None
+    session['seq'] += 1
+    for _ in range(ATTEMPTS):
+        seq = session['seq']
+        datagram = build_trigger(args.node, args.sensor, seq, key=key, epoch=session['epoch'])
+        sock.sendto(datagram, (args.server, args.udp_port))
+        try:
+            while True:
+                ack = parse_ack(sock.recv(64))
+                if ack and ack[1] == STALE:
+                    session['epoch'], session['seq'] = ack[3], ack[0] + 1
+                    result['stale'] = result.get('stale', 0) + 1
+                    break               # resend at once with the server's epoch
+                if ack and ack[0] == seq:
+                    result['answered'] = time.monotonic()
+                    result['status'] = STATUS_NAMES[ack[1]]
+                    result['run_id'] = ack[2]
+                    return
+        except socket.timeout:
+            continue
+    result['status'] = 'no ack'
+
+
+def send_http(args, room, effect, result):
+    request = urllib.request.Request(
+        f'http://{args.server}:{args.http_port}/api/run_effect?wait=0',
+        data=json.dumps({'room': room, 'effect_name': effect}).encode(),
+        headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            body = json.loads(response.read())
+        result['answered'] = time.monotonic()
+        result['status'] = 'ok' if response.status in (200, 202) else str(response.status)
+        result['run_id'] = body.get('run_id', '')
+    except OSError as e:
+        result['status'] = str(e)
+
+
+def stop_room(args, room):
+    request = urllib.request.Request(f'http://{args.server}:{args.http_port}/api/stop_effect',
+                                     data=json.dumps({'room': room}).encode(),
+                                     headers={'Content-Type': 'application/json'})
+    urllib.request.urlopen(request, timeout=5).read()
+
+
+def percentiles(samples):
+    if not samples:
+        return 'no samples'
+    samples = sorted(samples)
+    pick = lambda q: samples[min(len(samples) - 1, int(q * len(samples)))] * 1000  # noqa: E731
+    return f"p50 {pick(0.5):6.1f}  p95 {pick(0.95):6.1f}  max {samples[-1] * 1000:6.1f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--sensor', required=True, help='a trigger name from triggers.json')
+    parser.add_argument('--server', default='127.0.0.1')
+    parser.add_argument('--http-port', type=int, default=5000)
+    parser.add_argument('--udp-port', type=int, default=TRIGGER_PORT)
+    parser.add_argument('--artnet-port', type=int, default=ARTNET_PORT)
+    parser.add_argument('--node', default='bench-node')
+    parser.add_argument('--trials', type=int, default=20)
+    parser.add_argument('--only', choices=('udp', 'http'))
+    args = parser.parse_args()
+
+    with open(os.path.join(REPO_DIR, 'triggers.json')) as f:
+        index = compile_index(json.load(f)['triggers'])
+    entry = index.get(args.sensor.lower())
+    if entry is None or entry[0] != 'run_effect':
+        sys.exit(f"{args.sensor!r} is not a single-room run_effect trigger in triggers.json")
+    _, room, effect = entry
+    show = ShowModel.load(os.path.join(REPO_DIR, 'light_config.json'))
+    channels = [((offset + i) // UNIVERSE_SIZE, (offset + i) % UNIVERSE_SIZE)
+                for fixture_id in show.fixture_ids(room)
+                for offset, width in [show.slots[fixture_id]] for i in range(width)]
+    frames = Frames(args.artnet_port, channels)
+    print(f"{args.sensor}: {effect} in {room} ({len(channels)} channels), "
+          f"{args.trials} trials per path, frames on :{args.artnet_port}")
+
+    results = {'udp': ([], []), 'http': ([], [])}
+    session = {'epoch': 0, 'seq': 0}    # as booted: the first trigger learns the epoch
+    for trial in range(args.trials):
+        for path in ('udp', 'http'):
+            if args.only and path != args.only:
+                continue
+            stop_room(args, room)
+            if frames.wait_for(False, DARK_TIMEOUT) is None:
+                sys.exit(f"{room} never went dark — turn the theme off (POST /api/set_theme notheme)")
+            time.sleep(0.3)             # let the stop's audio and output settle
+            result = {}
+            sender = threading.Thread(target=send_udp if path == 'udp' else send_http,
+                                      args=(args, session, result) if path == 'udp' else (args, room, effect, result))
+            sent = time.monotonic()
+            sender.start()
+            lit = frames.wait_for(True, LIGHT_TIMEOUT)
+            sender.join()
+            if lit is None or 'answered' not in result:
+                print(f"  {path} trial {trial}: {result.get('status')}, "
+                      f"{'no light' if lit is None else 'lit'}")
+                continue
+            if path == 'udp' and (result['status'] != STATUS_NAMES[OK] or result.get('stale')):
+                print(f"  udp trial {trial}: {result['status']}"
+                      + (f" after {result['stale']} stale ack(s)" if result.get('stale') else ''))
+            results[path][0].append(lit - sent)
+            results[path][1].append(result['answered'] - sent)
+    for path, (light, answer) in results.items():
+        if light:
+            print(f"{path:>4}  first lit frame {percentiles(light)}   ack/response {percentiles(answer)}")
+
+
+if __name__ == '__main__':
+    main()
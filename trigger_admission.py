@@ -0,0 +1,121 @@
+"""Per-room admission control for effect triggers.
+
+Every admitted trigger is a full takeover: the running effect is cancelled,
+an audio_stop goes to every unit and node claiming the room, and a fresh
+play follows. A chattering mmWave or piezo sensor firing ten times a second
+turns that into a storm of stop/play commands over the WiFi. Before a room
+is taken over, EffectsManager asks ``decide()``:
+
+- ``same_effect`` — the trigger is for the effect already running in the
+  room: ``"restart"`` takes over as before, ``"ignore"`` keeps the running
+  run, ``"extend"`` keeps it and replays its lights from the top (its end
+  moves out; no audio stop/play)
+- ``coalesce_window`` — seconds after an admitted trigger during which any
+  further trigger for the room folds into that run
+- ``min_retrigger_interval`` — seconds before the same effect may start
+  again in the room; sooner triggers are throttled
+
+A trigger that isn't admitted gets the run it folded into, so callers
+still have a run id to follow. Only a live or completed run is folded
+into: EffectsManager calls ``forget()`` when a run is stopped, superseded
+or fails in a room, so the next trigger there is admitted. Settings come from the ``"admission"``
+section of triggers.json: top-level defaults, then per-room
+(``"rooms"``), per-effect (``"effects"``) and per-room-per-effect
+(``"rooms": {"<room>": {"effects": ...}}``) overrides, most specific
+winning. Every outcome is counted per room (/api/trigger_admission).
+All-rooms triggers are operator actions and bypass the policy.
+"""
+import json
+import logging
+import os
+from collections import Counter, defaultdict
+
+logger = logging.getLogger(__name__)
+
+CONFIG_FILE = 'triggers.json'
+SAME_EFFECT_RULES = ('restart', 'ignore', 'extend')
+DEFAULTS = {'coalesce_window': 0.0, 'min_retrigger_interval': 0.0, 'same_effect': 'restart'}
+OUTCOMES = ('admitted', 'coalesced', 'throttled', 'ignored', 'extended')
+
+
+def _settings(section, where):
+    """The policy keys of one config section, validated."""
+    settings = {key: section[key] for key in DEFAULTS if key in section}
+    for key in ('coalesce_window', 'min_retrigger_interval'):
+        if key in settings:
+            settings[key] = float(settings[key])
+            if settings[key] < 0:
+                raise ValueError(f"admission {where}: {key} must be >= 0")
+    if settings.get('same_effect', 'restart') not in SAME_EFFECT_RULES:
+        raise ValueError(f"admission {where}: same_effect must be one of {SAME_EFFECT_RULES}")
+    return settings
+
+
+class TriggerAdmission:
+    def __init__(self, policy=None):
+        policy = policy or {}
+        self.defaults = dict(DEFAULTS, **_settings(policy, 'defaults'))
+        self.effects = {name: _settings(section, name) for name, section in policy.get('effects', {}).items()}
+        self.rooms = {}     # lower-case room -> (room settings, {effect: settings})
+        for room, section in policy.get('rooms', {}).items():
+            self.rooms[room.lower()] = (_settings(section, room),
+                                        {name: _settings(effect, f"{room}/{name}")
+                                         for name, effect in section.get('effects', {}).items()})
+        self.counts = defaultdict(Counter)  # room -> outcome -> triggers
+        self._last_admitted = {}            # room -> (monotonic, EffectRun)
+        self._last_started = {}             # (room, effect name) -> (monotonic, EffectRun)
+
+    @classmethod
+    def from_config(cls, path=CONFIG_FILE):
+        """From triggers.json's "admission" section; every trigger admitted
+        (the old behaviour) when the file or section is absent."""
+        if not os.path.exists(path):
+            return cls()
+        with open(path) as f:
+            return cls(json.load(f).get('admission'))
+
+    def policy(self, room, effect_name):
+        room_settings, room_effects = self.rooms.get(room.lower(), ({}, {}))
+        return dict(self.defaults, **self.effects.get(effect_name, {}), **room_settings,
+                    **room_effects.get(effect_name, {}))
+
+    def decide(self, room, effect_name, current, now):
+        """``(outcome, run)`` for a trigger of ``effect_name`` in ``room`` at
+        ``now`` (monotonic); ``current`` is the room's running EffectRun or
+        None. ``run`` is the run a non-admitted trigger folds into. Call
+        with the room's lock held, and admitted() once the run starts."""
+        policy = self.policy(room, effect_name)
+        outcome, run = 'admitted', None
+        last = self._last_admitted.get(room)
+        last_same = self._last_started.get((room, effect_name))
+        if current is not None and current.effect_name == effect_name and policy['same_effect'] != 'restart':
+            outcome, run = ('ignored' if policy['same_effect'] == 'ignore' else 'extended'), current
+        elif last is not None and now - last[0] < policy['coalesce_window']:
+            outcome, run = 'coalesced', last[1]
+        elif last_same is not None and now - last_same[0] < policy['min_retrigger_interval']:
+            outcome, run = 'throttled', last_same[1]
+        self.counts[room][outcome] += 1
+        if outcome != 'admitted':
+            logger.info(f"Trigger {effect_name} in {room} {outcome} (run {run.run_id})")
+        return outcome, run
+
+    def admitted(self, room, effect_name, run, now):
+        self._last_admitted[room] = (now, run)
+        self._last_started[(room, effect_name)] = (now, run)
+
+    def forget(self, room, run):
+        """Drop ``room``'s entries for ``run``, which ended there without
+        completing; newer entries for the room are left alone."""
+        if self._last_admitted.get(room, (None, None))[1] is run:
+            del self._last_admitted[room]
+        for key in [key for key, (_, last) in self._last_started.items() if key[0] == room and last is run]:
+            del self._last_started[key]
+
+    def summary(self):
+        return {
+            'defaults': self.defaults,
+            'effects': self.effects,
+            'rooms': {room: dict(settings, effects=effects) for room, (settings, effects) in self.rooms.items()},
+            'counts': {room: {outcome: counts[outcome] for outcome in OUTCOMES}
+                       for room, counts in self.counts.items()},
+        }
@@ -0,0 +1,290 @@
+"""Compact UDP trigger ingestion for the room nodes.
+
+An HTTP trigger pays a TCP handshake, Quart's request parsing and a JSON
+body before the lights move, and ESPHome's http_request retries slowly on a
+lossy AP. This is the same trigger in one datagram to UDP port 8766, served
+next to the 8765 WebSocket server, answered with an equally small ack:
+
+    trigger  "LT" | version u8 | flags u8 | epoch u32 | seq u32 | node | sensor | effect [| mac]
+    ack      "LA" | version u8 | status u8 | seq u32 | epoch u32 | run id (12 bytes, ASCII)
+
+Big-endian; node, sensor and effect are u8-length-prefixed UTF-8. ``sensor``
+is a trigger ``name`` from triggers.json (case-insensitive), which maps it
+to its room and action through an index compiled at startup; ``effect``
+(usually empty) overrides the mapped effect for the room games, whose node
+decides WrongAnswer or CorrectAnswer — the room still comes from the index.
+With flag 0x01 the datagram ends in the first 8 bytes of an HMAC-SHA256 of
+everything before it; when the server has a key (``LOHP_TRIGGER_KEY``)
+unsigned or mis-signed triggers are refused.
+
+A node resends a trigger (same ``seq``) until it sees the ack; a ``seq``
+the server has seen from that node within DEDUP_WINDOW gets its first ack
+again without firing twice. Against replay, ``epoch`` — inside the signed
+body — is a random number the server picks at startup and puts in every
+ack, and a new trigger must carry the current epoch and a ``seq`` above the
+highest the node has fired in it. Anything else (a node that just booted
+and sends epoch 0, a server restart, a captured datagram played back later)
+fires nothing and gets a STALE ack carrying the epoch and, in its ``seq``,
+the node's highest seq so far: the node adopts both and resends as
+``seq + 1`` — one extra round trip after either side restarts. At most
+MAX_NODES node ids are tracked, least recently heard evicted first, so
+random node ids can't grow the tables; with a key only key holders can add
+one. Effects start fire-and-forget, like
+/api/run_effect?wait=0 — the ack carries the run id as soon as the room is
+taken over (or the trigger folded by trigger admission).
+``tools/udp_trigger_node.py`` is a stand-in node that measures
+trigger-to-first-DMX-frame latency over this path and over HTTP.
+"""
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import os
+import struct
+import time
+from collections import Counter, OrderedDict
+
+logger = logging.getLogger(__name__)
+
+TRIGGER_PORT = 8766
+CONFIG_FILE = 'triggers.json'
+MAGIC = b'LT'
+ACK_MAGIC = b'LA'
+VERSION = 2
+FLAG_MAC = 0x01
+MAC_SIZE = 8
+DEDUP_WINDOW = 10.0         # seconds a (node, seq) counts as a retransmission
+DEDUP_MAX = 64              # seqs remembered per node
+MAX_NODES = 64              # node ids tracked (replay state and counts)
+RUN_ID_SIZE = 12
+
+OK, DUPLICATE, UNKNOWN, UNAUTHORIZED, FAILED, STALE = range(6)
+STATUS_NAMES = ('ok', 'duplicate', 'unknown', 'unauthorized', 'failed', 'stale')
+
+_HEAD = struct.Struct('!2sBBII')        # magic, version, flags, epoch, seq
+_ACK = struct.Struct(f'!2sBBII{RUN_ID_SIZE}s')
+
+
+def _mac(key, body):
+    return hmac.new(key, body, hashlib.sha256).digest()[:MAC_SIZE]
+
+
+def _field(text):
+    raw = text.encode()
+    if len(raw) > 255:
+        raise ValueError(f"field too long: {text[:20]!r}...")
+    return bytes([len(raw)]) + raw
+
+
+def build_trigger(node, sensor, seq, effect='', key=None, epoch=0):
+    flags = FLAG_MAC if key else 0
+    body = (_HEAD.pack(MAGIC, VERSION, flags, epoch, seq & 0xFFFFFFFF)
+            + _field(node) + _field(sensor) + _field(effect))
+    return body + _mac(key, body) if key else body
+
+
+def parse_trigger(data, key=None):
+    """Datagram -> (node, sensor, effect, epoch, seq, signed); ValueError if
+    it isn't a trigger, PermissionError if ``key`` is set and the MAC is
+    missing or wrong."""
+    if len(data) < _HEAD.size + 3:
+        raise ValueError("short datagram")
+    magic, version, flags, epoch, seq = _HEAD.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"not a v{VERSION} trigger")
+    end = len(data) - MAC_SIZE if flags & FLAG_MAC else len(data)
+    fields, at = [], _HEAD.size
+    for _ in range(3):
+        if at >= end or at + 1 + data[at] > end:
+            raise ValueError("truncated field")
+        fields.append(data[at + 1:at + 1 + data[at]].decode())
+        at += 1 + data[at]
+    if at != end:
+        raise ValueError("trailing bytes")
+    signed = bool(flags & FLAG_MAC)
+    if key and (not signed or not hmac.compare_digest(data[end:], _mac(key, data[:end]))):
+        raise PermissionError("bad or missing MAC")
+    node, sensor, effect = fields
+    return node, sensor, effect, epoch, seq, signed
+
+
+def build_ack(seq, status, run_id='', epoch=0):
+    return _ACK.pack(ACK_MAGIC, VERSION, status, seq, epoch, run_id.encode()[:RUN_ID_SIZE])
+
+
+def parse_ack(data):
+    """Ack datagram -> (seq, status, run id, epoch), or None. For a STALE
+    ack ``seq`` is the node's highest seq in ``epoch``."""
+    if len(data) != _ACK.size:
+        return None
+    magic, version, status, seq, epoch, run_id = _ACK.unpack(data)
+    if magic != ACK_MAGIC or version != VERSION:
+        return None
+    return seq, status, run_id.rstrip(b'\x00').decode(), epoch
+
+
+def compile_index(triggers):
+    """triggers.json "triggers" -> {lower-case name: (kind, room, effect)}.
+    Kinds are the API paths a trigger's action can take; others are
+    skipped with a warning."""
+    index = {}
+    for trigger in triggers:
+        action = trigger.get('action', {})
+        path, data = action.get('path'), action.get('data', {})
+        if path == '/api/run_effect':
+            entry = ('run_effect', data.get('room') or trigger.get('room'), data.get('effect_name'))
+        elif path == '/api/run_effect_all_rooms':
+            entry = ('run_effect_all_rooms', None, data.get('effect_name'))
+        elif path == '/api/set_theme' and data.get('next_theme'):
+            entry = ('next_theme', None, None)
+        elif path in ('/api/start_music', '/api/stop_music'):
+            entry = (path.rsplit('/', 1)[1], None, None)
+        else:
+            logger.warning(f"UDP triggers: {trigger.get('name')}: action {path} {data} not supported — skipped")
+            continue
+        index[trigger['name'].lower()] = entry
+    return index
+
+
+class _Node:
+    """What the server remembers about one node id."""
+
+    def __init__(self):
+        self.highest = 0            # highest seq fired in the current epoch
+        self.seen = OrderedDict()   # seq -> (monotonic, ack bytes or None while firing)
+        self.counts = Counter()     # outcome -> datagrams
+
+
+class UDPTriggerServer(asyncio.DatagramProtocol):
+    def __init__(self, effects_manager, index, key=None, port=TRIGGER_PORT, tracer=None):
+        self.effects_manager = effects_manager
+        self.tracer = tracer    # latency_trace.LatencyTracer: each trigger traced from arrival
+        self.index = index
+        self.key = key
+        self.port = port
+        self.epoch = int.from_bytes(os.urandom(4), 'big') or 1  # 0 is what a freshly booted node sends
+        self.transport = None
+        self.malformed = 0
+        self.unauthorized = 0
+        self._nodes = OrderedDict()     # node id -> _Node, least recently heard first
+        self._tasks = set()             # fire tasks in flight (held: a bare task can be collected)
+
+    @classmethod
+    def from_config(cls, effects_manager, path=CONFIG_FILE, tracer=None):
+        """Index from triggers.json; its optional "udp" section sets the
+        port. The HMAC key comes from the LOHP_TRIGGER_KEY environment
+        variable (unset = unsigned triggers accepted)."""
+        with open(path) as f:
+            cfg = json.load(f)
+        key = os.environ.get('LOHP_TRIGGER_KEY')
+        return cls(effects_manager, compile_index(cfg.get('triggers', [])),
+                   key=key.encode() if key else None,
+                   port=cfg.get('udp', {}).get('port', TRIGGER_PORT), tracer=tracer)
+
+    async def serve(self, host='0.0.0.0'):
+        loop = asyncio.get_running_loop()
+        await loop.create_datagram_endpoint(lambda: self, local_addr=(host, self.port))
+        logger.info(f"UDP triggers on :{self.port} ({len(self.index)} triggers, "
+                    f"{'HMAC required' if self.key else 'unsigned accepted'})")
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        trace = self.tracer.begin('udp') if self.tracer else None
+        try:
+            node, sensor, effect, epoch, seq, _ = parse_trigger(data, self.key)
+        except PermissionError:
+            self.unauthorized += 1
+            if len(data) >= _HEAD.size:
+                self.transport.sendto(build_ack(_HEAD.unpack_from(data)[4], UNAUTHORIZED,
+                                                epoch=self.epoch), addr)
+            return
+        except (ValueError, UnicodeDecodeError):
+            self.malformed += 1
+            return
+        state = self._node(node)
+        now = time.monotonic()
+        seen = state.seen
+        while seen and (now - next(iter(seen.values()))[0] > DEDUP_WINDOW or len(seen) > DEDUP_MAX):
+            seen.popitem(last=False)
+        if epoch == self.epoch and seq in seen:
+            state.counts['duplicate'] += 1
+            ack = seen[seq][1]
+            if ack is not None:     # still firing: the ack goes out when it's done
+                self.transport.sendto(ack, addr)
+            return
+        if epoch != self.epoch or seq <= state.highest:
+            state.counts['stale'] += 1
+            self.transport.sendto(build_ack(state.highest, STALE, epoch=self.epoch), addr)
+            return
+        state.highest = seq
+        seen[seq] = (now, None)
+        state.counts['received'] += 1
+        task = asyncio.ensure_future(self._fire(node, sensor, effect, seq, addr, trace))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _node(self, node):
+        """The _Node for ``node``, made most recently heard; past MAX_NODES
+        the least recently heard is forgotten."""
+        state = self._nodes.get(node)
+        if state is None:
+            state = self._nodes[node] = _Node()
+            while len(self._nodes) > MAX_NODES:
+                self._nodes.popitem(last=False)
+        else:
+            self._nodes.move_to_end(node)
+        return state
+
+    async def _fire(self, node, sensor, effect, seq, addr, trace=None):
+        entry = self.index.get(sensor.lower())
+        status, run_id = OK, ''
+        if entry is None:
+            status = UNKNOWN
+            logger.warning(f"UDP trigger from {node}: unknown sensor {sensor!r}")
+        else:
+            kind, room, mapped_effect = entry
+            try:
+                status, run_id = await self._run(kind, room, effect or mapped_effect, trace)
+            except Exception as e:
+                logger.error(f"UDP trigger {sensor} from {node} failed: {e}", exc_info=True)
+                status = FAILED
+        ack = build_ack(seq, status, run_id, epoch=self.epoch)
+        state = self._nodes.get(node)
+        if state is not None:       # None if evicted meanwhile
+            state.counts[STATUS_NAMES[status]] += 1
+            if seq in state.seen:
+                state.seen[seq] = (state.seen[seq][0], ack)
+        self.transport.sendto(ack, addr)
+
+    async def _run(self, kind, room, effect_name, trace=None):
+        """(status, run id) for one mapped action."""
+        manager = self.effects_manager
+        if kind in ('run_effect', 'run_effect_all_rooms'):
+            if not manager.has_effect(effect_name):
+                return UNKNOWN, ''
+            if kind == 'run_effect':
+                run, message = await manager.start_effect_in_room(room, effect_name, trace=trace)
+            else:
+                run, message = await manager.start_effect_in_all_rooms(effect_name, trace=trace)
+            if run is None:
+                logger.error(f"UDP trigger {effect_name}: {message}")
+                return FAILED, ''
+            return OK, run.run_id
+        if kind == 'next_theme':
+            ok = await manager.set_next_theme_async()
+        else:
+            ok = await getattr(manager, kind)()
+        return (OK if ok else FAILED), ''
+
+    def summary(self):
+        return {
+            'port': self.port,
+            'hmac_required': self.key is not None,
+            'triggers': len(self.index),
+            'malformed': self.malformed,
+            'unauthorized': self.unauthorized,
+            'nodes': {node: dict(state.counts, highest_seq=state.highest) for node, state in self._nodes.items()},
+        }